@@ -24,8 +24,8 @@ hiddenimports = [
     'barcode.writer.base', 'barcode.writer.svg', 'barcode.writer.image', 'barcode.writer.pdf',
     'barcode.errors', 'barcode.base', 'barcode.codex.base',
     'PIL', 'PIL.Image', 'PIL.ImageDraw', 'PIL.ImageFont', 'PIL.ImageTk', 
-    'pytesseract', 'fitz', 'reportlab', 'reportlab.pdfgen', 'reportlab.lib.pagesizes', 'reportlab.lib.colors', 
-    'pandas', 'numpy', 'openpyxl', 'supabase', 'supabase_config', 'requests', 
+    'pytesseract', 'tesserocr', 'fitz', 'reportlab', 'reportlab.pdfgen', 'reportlab.lib.pagesizes', 'reportlab.lib.colors', 
+    'pandas', 'numpy', 'openpyxl', 'supabase', 'supabase_config', 'bulk_writer', 'event_outbox', 'requests', 
     'PySide6', 'PySide6.QtWidgets', 'PySide6.QtCore', 'PySide6.QtGui',
     # Printer communication libraries
     'serial', 'pyserial', 'win32print', 'win32api', 'win32con', 'win32gui', 'win32ui',
@@ -0,0 +1,24 @@
+"""
+Location of the per-installation app_data folder shared by the apps.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+
+def app_data_dir() -> Path:
+    """app_data folder next to the executable/script, falling back to the working directory"""
+    if getattr(sys, 'frozen', False):
+        # Running as compiled executable
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    app_data = Path(base_path) / "app_data"
+    try:
+        app_data.mkdir(parents=True, exist_ok=True)
+    except Exception:
+        app_data = Path.cwd() / "app_data"
+        app_data.mkdir(parents=True, exist_ok=True)
+    return app_data
@@ -0,0 +1,156 @@
+"""
+Persistent on-disk cache of rendered barcodes.
+
+Dispatch reruns of a night, and main.py and the dispatch app stamping the
+same dockets, used to render every order's barcode from scratch. The cache
+stores each rendered barcode under app_data/barcode_cache, content-addressed
+by (order ID, symbology, size), and is shared by the picking-docket
+stampers and the label preview. Files are evicted least recently used
+first once the cache grows past its size limit; the modification time of
+a file is its last use.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from app_paths import app_data_dir
+
+# Cache size limit, oldest entries are evicted beyond it
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Suffix of files being written; older ones are left over from a crashed write
+TEMP_SUFFIX = ".tmp"
+STALE_TEMP_SECONDS = 60 * 60
+
+
+class BarcodeCache:
+    """Size-bounded LRU file cache of rendered barcodes"""
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else app_data_dir() / "barcode_cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._remove_stale_temp_files()
+        self._total_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        """Cache files, without temporary files another writer may still be filling"""
+        return [entry for entry in self.cache_dir.glob("*/*")
+                if entry.suffix != TEMP_SUFFIX and entry.is_file()]
+
+    def _remove_stale_temp_files(self):
+        cutoff = time.time() - STALE_TEMP_SECONDS
+        for entry in self.cache_dir.glob(f"*/*{TEMP_SUFFIX}"):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    entry.unlink()
+            except OSError:
+                continue
+
+    def path_for(self, order_id: str, symbology: str, size: str, extension: str) -> Path:
+        """Cache file for one rendered barcode"""
+        digest = hashlib.sha256(f"{symbology}\0{size}\0{order_id}".encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.{extension}"
+
+    def get(self, order_id: str, symbology: str, size: str, extension: str) -> Optional[bytes]:
+        """Cached barcode bytes, or None on a miss"""
+        path = self.path_for(order_id, symbology, size, extension)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, order_id: str, symbology: str, size: str, extension: str, data: bytes):
+        """Store rendered barcode bytes, evicting old entries if the cache is full"""
+        path = self.path_for(order_id, symbology, size, extension)
+        temp_path = None
+        try:
+            path.parent.mkdir(exist_ok=True)
+            # Write to a temporary file first so other processes never read a partial file
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=TEMP_SUFFIX)
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            try:
+                replaced_bytes = path.stat().st_size
+            except OSError:
+                replaced_bytes = 0
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing barcode cache entry for {order_id}: {e}")
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            return
+
+        with self._lock:
+            # Overwriting an entry only adds the difference
+            self._total_bytes += len(data) - replaced_bytes
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def get_or_create(self, order_id: str, symbology: str, size: str, extension: str,
+                      create: Callable[[], bytes]) -> bytes:
+        """Cached barcode bytes, rendering and storing them with create() on a miss"""
+        data = self.get(order_id, symbology, size, extension)
+        if data is None:
+            data = create()
+            self.put(order_id, symbology, size, extension, data)
+        return data
+
+    def evict(self):
+        """Delete least recently used entries until the cache is back under 90% of its limit"""
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+            entries.sort(key=lambda item: item[0])
+
+            total_bytes = sum(size for _, size, _ in entries)
+            target_bytes = self.max_bytes * 0.9
+            for _, size, entry in entries:
+                if total_bytes <= target_bytes:
+                    break
+                try:
+                    entry.unlink()
+                    total_bytes -= size
+                except OSError:
+                    continue
+            self._total_bytes = total_bytes
+
+
+_default_cache: Optional[BarcodeCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_barcode_cache() -> Optional[BarcodeCache]:
+    """The app-wide barcode cache, or None if app_data is not writable"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = BarcodeCache()
+            except Exception as e:
+                print(f"Barcode cache unavailable: {e}")
+                return None
+        return _default_cache
@@ -0,0 +1,214 @@
+"""
+Barcode stamping for picking-docket output PDFs.
+
+Barcodes used to be rendered by python-barcode's ImageWriter (PIL render,
+PNG encode) and inserted as images, which PyMuPDF then had to decode
+again. Now the Code128 module pattern is drawn as vector bars: every
+order gets one page in a BarcodeTemplates document shared by the run,
+and stamping shows that page on the output page. PyMuPDF turns a shown page into a
+Form XObject once per output document and reuses it for every later page
+of the same order, so a multi-page order still embeds its barcode once.
+Rendered barcode pages can come from the on-disk BarcodeCache.
+"""
+
+import os
+import re
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import fitz  # PyMuPDF
+from barcode import Code128
+
+from barcode_cache import BarcodeCache
+
+# Barcode placement at the top centre of each page (PDF points)
+BARCODE_WIDTH = 700
+BARCODE_HEIGHT = 70
+BARCODE_TOP_MARGIN = 20
+
+# Barcode geometry, same as python-barcode's ImageWriter defaults (mm) so the
+# stamped barcode keeps the size and proportions of the old PNG barcodes
+MM = 72 / 25.4
+MODULE_WIDTH_MM = 0.2
+MODULE_HEIGHT_MM = 15.0
+QUIET_ZONE_MM = 6.5
+MARGIN_MM = 1.0
+TEXT_DISTANCE_MM = 5.0
+FONT_SIZE = 10
+FONT_NAME = "cour"  # Monospaced like ImageWriter's DejaVu Sans Mono
+
+# Barcode cache key parts for the vector barcode pages
+SYMBOLOGY = "code128"
+TEMPLATE_SIZE = f"{MODULE_WIDTH_MM}x{MODULE_HEIGHT_MM}mm"
+
+
+def barcode_rect(page) -> fitz.Rect:
+    """Rectangle for the barcode at the top centre of the page"""
+    barcode_x = (page.rect.width - BARCODE_WIDTH) / 2
+    return fitz.Rect(barcode_x, BARCODE_TOP_MARGIN,
+                     barcode_x + BARCODE_WIDTH, BARCODE_TOP_MARGIN + BARCODE_HEIGHT)
+
+
+def code128_pattern(data: str) -> str:
+    """Code128 module pattern for data ('1' = bar, '0' = space), checksum included"""
+    return Code128(data).build()[0]
+
+
+def bar_runs(pattern: str) -> List[Tuple[int, int]]:
+    """(first module, width in modules) of every bar in a module pattern"""
+    return [(bar.start(), bar.end() - bar.start()) for bar in re.finditer("1+", pattern)]
+
+
+def draw_barcode(page, pattern: str, text: str):
+    """
+    Draw a barcode filling a new, empty page: white background, bars, and
+    the human-readable text centred underneath, laid out like ImageWriter.
+    """
+    module_width = MODULE_WIDTH_MM * MM
+    bars_left = QUIET_ZONE_MM * MM
+    bars_top = MARGIN_MM * MM
+    bars_height = MODULE_HEIGHT_MM * MM
+
+    # The bars are written as raw content stream operators (PDF y axis points
+    # up): one "re" per bar is far cheaper than a Shape.draw_rect call each
+    page_width, page_height = page.rect.width, page.rect.height
+    bars_y = page_height - bars_top - bars_height
+    operators = [f"q 1 g 0 0 {page_width:.3f} {page_height:.3f} re f 0 g"]
+    for first_module, modules in bar_runs(pattern):
+        operators.append(f"{bars_left + first_module * module_width:.3f} {bars_y:.3f} "
+                         f"{modules * module_width:.3f} {bars_height:.3f} re")
+    operators.append("f Q")
+
+    document = page.parent
+    contents_xref = document.get_new_xref()
+    document.update_object(contents_xref, "<<>>")
+    document.update_stream(contents_xref, "\n".join(operators).encode())
+    document.xref_set_key(page.xref, "Contents", f"{contents_xref} 0 R")
+
+    if text:
+        text_width = fitz.get_text_length(text, fontname=FONT_NAME, fontsize=FONT_SIZE)
+        bars_centre = bars_left + len(pattern) * module_width / 2
+        page.insert_text(fitz.Point(bars_centre - text_width / 2, bars_top + bars_height + TEXT_DISTANCE_MM * MM),
+                         text, fontname=FONT_NAME, fontsize=FONT_SIZE, color=(0, 0, 0))
+
+
+def barcode_page_size(pattern: str) -> Tuple[float, float]:
+    """Width and height (points) of a barcode page for a module pattern"""
+    width = 2 * QUIET_ZONE_MM + len(pattern) * MODULE_WIDTH_MM
+    height = 2 * MARGIN_MM + MODULE_HEIGHT_MM + TEXT_DISTANCE_MM + FONT_SIZE / MM / 2
+    return width * MM, height * MM
+
+
+def render_barcode_pdf(order_id: str, pattern: Optional[str] = None) -> bytes:
+    """Single-page PDF holding the vector barcode for order_id"""
+    document = fitz.open()
+    try:
+        pattern = pattern or code128_pattern(order_id)
+        width, height = barcode_page_size(pattern)
+        draw_barcode(document.new_page(width=width, height=height), pattern, order_id)
+        return document.tobytes()
+    finally:
+        document.close()
+
+
+def barcode_png(order_id: str, dpi: int = 200, cache: Optional[BarcodeCache] = None) -> bytes:
+    """PNG of the barcode for order_id (e.g. for the label preview), through the cache if given"""
+    def render():
+        document = fitz.open("pdf", render_barcode_pdf(order_id))
+        try:
+            return document[0].get_pixmap(dpi=dpi).tobytes("png")
+        finally:
+            document.close()
+
+    if cache is None:
+        return render()
+    return cache.get_or_create(order_id, SYMBOLOGY, f"{dpi}dpi", "png", render)
+
+
+class BarcodeTemplates:
+    """
+    One vector barcode page per order, shared by every output document of
+    a run. Call close() when the run is finished.
+    """
+
+    def __init__(self, patterns: Dict[str, str], cache: Optional[BarcodeCache] = None):
+        """
+        Args:
+            patterns: Order ID -> Code128 module pattern (see code128_pattern)
+            cache: On-disk cache of rendered barcode pages, None to always draw
+        """
+        # All pages are added up front: PyMuPDF caches the object mapping of
+        # a source document per output document, so it must not grow later
+        self.document = fitz.open()
+        self._page_numbers: Dict[str, int] = {}
+        for order_id, pattern in patterns.items():
+            if cache is None:
+                width, height = barcode_page_size(pattern)
+                draw_barcode(self.document.new_page(width=width, height=height), pattern, order_id)
+            else:
+                barcode_pdf = cache.get_or_create(order_id, SYMBOLOGY, TEMPLATE_SIZE, "pdf",
+                                                  lambda: render_barcode_pdf(order_id, pattern))
+                source = fitz.open("pdf", barcode_pdf)
+                self.document.insert_pdf(source)
+                source.close()
+            self._page_numbers[order_id] = self.document.page_count - 1
+
+    def page_number(self, order_id: str) -> Optional[int]:
+        """Template page for order_id, or None if the order has no barcode"""
+        return self._page_numbers.get(order_id)
+
+    def close(self):
+        self.document.close()
+
+
+class BarcodeStamper:
+    """
+    Stamps order barcodes onto the pages of one output document; each
+    order's barcode is embedded at most once per document.
+    """
+
+    def __init__(self, templates: BarcodeTemplates):
+        self.templates = templates
+        self._embedded = set()
+        self.pages_stamped = 0
+
+    @property
+    def barcodes_embedded(self) -> int:
+        return len(self._embedded)
+
+    def stamp(self, page, order_id: str) -> bool:
+        """
+        Stamp the barcode for order_id onto page.
+
+        Returns:
+            False if there is no barcode for the order, True once stamped
+        """
+        page_num = self.templates.page_number(order_id)
+        if page_num is None:
+            return False
+
+        page.show_pdf_page(barcode_rect(page), self.templates.document, page_num)
+        self._embedded.add(order_id)
+        self.pages_stamped += 1
+        return True
+
+
+class SaveStats(NamedTuple):
+    """Size and save time of one output PDF"""
+    file_size: int      # bytes
+    save_seconds: float
+
+
+def save_document(document: fitz.Document, output_path) -> SaveStats:
+    """Save document to output_path and report its size and how long the save took"""
+    start_time = time.perf_counter()
+    document.save(str(output_path))
+    save_seconds = time.perf_counter() - start_time
+    return SaveStats(os.path.getsize(output_path), save_seconds)
+
+
+def format_file_size(file_size: int) -> str:
+    """Human-readable file size"""
+    if file_size >= 1024 * 1024:
+        return f"{file_size / (1024 * 1024):.1f} MB"
+    return f"{file_size / 1024:.1f} KB"
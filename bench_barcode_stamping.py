@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark barcode stamping on synthetic driver PDFs.
+
+Compares the old path (Code128 + ImageWriter -> PNG -> insert_image on
+every page) with the vector stamper (Code128 module pattern drawn as bars,
+shown as a shared Form XObject). Prints generation time per order, stamped
+pages/sec and output size for each.
+Run with: python bench_barcode_stamping.py [orders] [pages per order]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from barcode import Code128
+from barcode.writer import ImageWriter
+
+from barcode_stamping import (
+    BarcodeTemplates, BarcodeStamper, barcode_rect, code128_pattern, format_file_size
+)
+from bench_order_matching import make_order_ids
+
+
+def stamp_pages(order_ids, pages_per_order, stamp):
+    """Build an A4-landscape document with pages_per_order pages per order"""
+    document = fitz.open()
+    for order_id in order_ids:
+        for _ in range(pages_per_order):
+            page = document.new_page(width=842, height=595)
+            page.insert_text((72, 150), f"Picking Docket - Our Order No: {order_id}")
+            stamp(page, order_id)
+    return document
+
+
+def saved_size(document):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "bench.pdf")
+        document.save(output_path)
+        return os.path.getsize(output_path)
+
+
+def run(order_count=200, pages_per_order=3):
+    order_ids = make_order_ids(order_count)
+    page_count = order_count * pages_per_order
+
+    print(f"Orders: {order_count}, pages: {page_count}")
+    print("=" * 50)
+
+    # Old path: PNG per order, image inserted on every page
+    start = time.perf_counter()
+    png_barcodes = {}
+    for order_id in order_ids:
+        barcode_buffer = io.BytesIO()
+        Code128(order_id, writer=ImageWriter()).write(barcode_buffer)
+        png_barcodes[order_id] = barcode_buffer.getvalue()
+    old_generate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    old_document = stamp_pages(order_ids, pages_per_order,
+                               lambda page, order_id: page.insert_image(barcode_rect(page),
+                                                                        stream=png_barcodes[order_id]))
+    old_stamp = time.perf_counter() - start
+    old_size = saved_size(old_document)
+    old_document.close()
+
+    # Vector path
+    start = time.perf_counter()
+    patterns = {order_id: code128_pattern(order_id) for order_id in order_ids}
+    templates = BarcodeTemplates(patterns)
+    new_generate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stamper = BarcodeStamper(templates)
+    new_document = stamp_pages(order_ids, pages_per_order, stamper.stamp)
+    new_stamp = time.perf_counter() - start
+    new_size = saved_size(new_document)
+    new_document.close()
+    templates.close()
+
+    print(f"PNG + insert_image: {old_generate / order_count * 1000:7.2f} ms/order, "
+          f"{page_count / old_stamp:8.1f} pages/sec, {format_file_size(old_size)}")
+    print(f"Vector stamper:     {new_generate / order_count * 1000:7.2f} ms/order, "
+          f"{page_count / new_stamp:8.1f} pages/sec, {format_file_size(new_size)}")
+    print(f"Speed-up:           {(old_generate + old_stamp) / (new_generate + new_stamp):7.1f}x overall")
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
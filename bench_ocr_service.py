@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark OCR calls/sec: one pytesseract.image_to_string subprocess per
+call (the old region OCR path) against the OcrService worker pool.
+Needs Tesseract installed. Run with: python bench_ocr_service.py [calls] [workers]
+"""
+
+import sys
+import time
+
+import pytesseract
+from PIL import Image, ImageDraw
+
+from ocr_service import OcrService, DEFAULT_OCR_WORKERS, get_engine
+
+
+def make_region_images(count):
+    """Region-sized images like a 3x render of an order number or route box"""
+    images = []
+    for i in range(count):
+        image = Image.new("L", (900, 90), 255)
+        ImageDraw.Draw(image).text((20, 30), f"Our Order No: SO-{i:07d}", fill=0)
+        images.append(image.resize((1800, 180)))
+    return images
+
+
+def run(call_count=60, workers=DEFAULT_OCR_WORKERS):
+    try:
+        version = pytesseract.get_tesseract_version()
+    except Exception as e:
+        print(f"Tesseract is not available ({e}) - nothing to benchmark")
+        return
+
+    images = make_region_images(call_count)
+    print(f"Tesseract {version}, calls: {call_count}, workers: {workers}, "
+          f"engine: {'tesserocr API' if get_engine().uses_api else 'pytesseract'}")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    old_texts = [pytesseract.image_to_string(image, config='--psm 7') for image in images]
+    old_seconds = time.perf_counter() - start
+    print(f"Subprocess per call: {call_count / old_seconds:8.1f} calls/sec")
+
+    service = OcrService(workers=workers)
+    # Start the workers (and load the traineddata) before timing
+    service.submit(images[0], [7]).result()
+
+    start = time.perf_counter()
+    futures = [service.submit(image, [7]) for image in images]
+    new_texts = [future.result().text for future in futures]
+    new_seconds = time.perf_counter() - start
+    service.shutdown()
+    print(f"OcrService:          {call_count / new_seconds:8.1f} calls/sec")
+    print(f"Speed-up:            {old_seconds / new_seconds:8.1f}x")
+
+    mismatches = sum(1 for old, new in zip(old_texts, new_texts) if old.strip() != new.strip())
+    print(f"Result mismatches:   {mismatches}")
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
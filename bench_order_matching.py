@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark order-ID matching on synthetic picking-docket pages.
+
+Compares the per-order `order_id.upper() in page_text.upper()` loop used by
+the processors before OrderMatcher with the shared matcher, and the old
+generate_ocr_variants fallback with EditDistanceIndex on OCR-damaged pages.
+Prints pages/sec for each. Run with: python bench_order_matching.py [orders] [pages]
+"""
+
+import random
+import string
+import sys
+import time
+
+from order_matching import OrderMatcher, EditDistanceIndex
+
+
+def make_order_ids(count, seed=7):
+    """Order IDs shaped like the ones in the Excel exports (e.g. SO-0012345)"""
+    rng = random.Random(seed)
+    order_ids = set()
+    while len(order_ids) < count:
+        order_ids.add(f"SO-{rng.randint(0, 9999999):07d}")
+    return list(order_ids)
+
+
+def make_pages(order_ids, count, seed=11):
+    """Page text of roughly picking-docket size with one order ID per page"""
+    rng = random.Random(seed)
+    words = ["Qty", "Item", "Description", "Crate", "Total", "Items", "Delivered:",
+             "Route", "Store", "Our", "Order", "No", "Picked", "By", "Checked"]
+    pages = []
+    for i in range(count):
+        body = " ".join(rng.choice(words) for _ in range(300))
+        filler = "".join(rng.choice(string.digits) for _ in range(40))
+        order_id = order_ids[i % len(order_ids)] if i % 10 else "NO-MATCH"
+        pages.append(f"Picking Docket\nOur Order No: {order_id}\n{body}\n{filler}\n")
+    return pages
+
+
+def old_loop(order_ids, page_text):
+    """The matching loop the processors used before OrderMatcher"""
+    for order_id in order_ids:
+        if order_id.upper() in page_text.upper():
+            return order_id
+    return None
+
+
+def damage(order_id, rng):
+    """Drop one character of the order ID, as OCR often does"""
+    position = rng.randrange(len(order_id))
+    return order_id[:position] + order_id[position + 1:]
+
+
+def old_missing_extra_variants(order_id):
+    """The dropped/extra character variants generate_ocr_variants produced"""
+    variants = [order_id]
+    for i in range(len(order_id)):
+        variant = order_id[:i] + order_id[i + 1:]
+        if variant not in variants:
+            variants.append(variant)
+    for i in range(len(order_id) + 1):
+        for char in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789':
+            variant = order_id[:i] + char + order_id[i:]
+            if variant not in variants:
+                variants.append(variant)
+    return variants
+
+
+def old_fuzzy_loop(order_ids, page_text):
+    """The fuzzy fallback loop dispatch used before EditDistanceIndex"""
+    for order_id in order_ids:
+        for variant in old_missing_extra_variants(order_id):
+            if variant.upper() in page_text.upper():
+                return order_id
+    return None
+
+
+def run_fuzzy(order_count=1500, page_count=300, old_page_count=3):
+    rng = random.Random(5)
+    order_ids = make_order_ids(order_count)
+    pages = make_pages([damage(order_id, rng) for order_id in order_ids], page_count)
+
+    print(f"\nOCR-damaged pages (one dropped character), orders: {order_count}")
+    print("=" * 50)
+
+    # The old loop is far too slow for a full batch, so time a few pages
+    start = time.perf_counter()
+    for page in pages[1:old_page_count + 1]:
+        old_fuzzy_loop(order_ids, page)
+    old_seconds = (time.perf_counter() - start) / old_page_count
+    print(f"Variant loop:      {1 / old_seconds:10.2f} pages/sec ({old_page_count} pages timed)")
+
+    start = time.perf_counter()
+    index = EditDistanceIndex(order_ids)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # As dispatch uses it: a page close to several orders is reported, not assigned
+    results = [index.unique_match(page)[0] for page in pages]
+    new_seconds = (time.perf_counter() - start) / page_count
+    print(f"EditDistanceIndex: {1 / new_seconds:10.1f} pages/sec "
+          f"(build {build_seconds * 1000:.1f} ms)")
+    print(f"Speed-up:          {old_seconds / new_seconds:10.1f}x")
+
+    expected = [order_ids[i % len(order_ids)] if i % 10 else None for i in range(page_count)]
+    found = [match.order_id if match else None for match in results]
+    print(f"Wrong orders:      {sum(1 for a, b in zip(expected, found) if b is not None and a != b)}")
+    print(f"Left unmatched:    {sum(1 for a, b in zip(expected, found) if a is not None and b is None)}")
+
+
+def run(order_count=1500, page_count=300):
+    order_ids = make_order_ids(order_count)
+    pages = make_pages(order_ids, page_count)
+
+    print(f"Orders: {order_count}, pages: {page_count}")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    old_results = [old_loop(order_ids, page) for page in pages]
+    old_seconds = time.perf_counter() - start
+    print(f"Per-order loop:   {page_count / old_seconds:10.1f} pages/sec")
+
+    start = time.perf_counter()
+    matcher = OrderMatcher(order_ids)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_results = [matcher.first_match(page) for page in pages]
+    new_seconds = time.perf_counter() - start
+    print(f"OrderMatcher:     {page_count / new_seconds:10.1f} pages/sec "
+          f"(build {build_seconds * 1000:.1f} ms)")
+    print(f"Speed-up:         {old_seconds / (new_seconds + build_seconds):10.1f}x")
+
+    mismatches = sum(1 for old, new in zip(old_results, new_results) if old != new)
+    print(f"Result mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
+    run_fuzzy(*args)
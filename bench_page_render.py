@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark the OCR render path: pixmap -> PNG -> PIL (the old path) against
+pix.samples wrapped directly (page_render), in RGB and grayscale.
+Run with: python bench_page_render.py [pages] [dpi]
+"""
+
+import io
+import sys
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from page_render import DEFAULT_OCR_DPI, render_page_image
+
+
+def make_document(page_count):
+    """Picking-docket-like pages: a header, an address block and item lines"""
+    document = fitz.open()
+    for page_num in range(page_count):
+        page = document.new_page()
+        page.insert_text((432, 58), f"Our Order No: SO-{page_num:07d}", fontsize=11)
+        page.insert_text((28, 85), "Unit 4, Main Street Business Park, Dublin", fontsize=10)
+        for line in range(40):
+            page.insert_text((40, 120 + line * 16), f"{line + 1:3d}  Item {line:05d}  x{line % 7 + 1}", fontsize=9)
+    return document
+
+
+def png_round_trip(page, dpi):
+    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72))
+    png_data = pix.tobytes("png")
+    image = Image.open(io.BytesIO(png_data))
+    image.load()
+    # Peak: pixmap samples + PNG bytes + decoded image, all alive at once
+    return image, len(pix.samples) + len(png_data) + len(image.tobytes())
+
+
+def direct(page, dpi, grayscale):
+    image = render_page_image(page, dpi=dpi, grayscale=grayscale)
+    # The image shares the pixmap's sample bytes
+    return image, len(image.tobytes())
+
+
+def time_path(name, pages, render):
+    start = time.perf_counter()
+    peak_bytes = 0
+    for page in pages:
+        _, held_bytes = render(page)
+        peak_bytes = max(peak_bytes, held_bytes)
+    milliseconds = (time.perf_counter() - start) * 1000 / len(pages)
+    print(f"{name:22s} {milliseconds:8.1f} ms/page {peak_bytes / 1024 / 1024:8.1f} MB peak image memory")
+    return milliseconds
+
+
+def run(page_count=20, dpi=DEFAULT_OCR_DPI):
+    document = make_document(page_count)
+    pages = list(document)
+    print(f"Pages: {page_count}, DPI: {dpi}")
+    print("=" * 70)
+
+    old = time_path("PNG round trip (RGB)", pages, lambda page: png_round_trip(page, dpi))
+    time_path("Samples (RGB)", pages, lambda page: direct(page, dpi, False))
+    new = time_path("Samples (grayscale)", pages, lambda page: direct(page, dpi, True))
+    print(f"Saving per page:       {old - new:8.1f} ms ({old / new:.1f}x)")
+    document.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:3]
+    run(int(args[0]) if args else 20, int(args[1]) if len(args) > 1 else DEFAULT_OCR_DPI)
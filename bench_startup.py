@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark what Supabase costs at app startup: importing supabase_config
+(lazy client) against importing the supabase package and creating the
+client at import (the old behaviour), then the background warm-up.
+Each measurement runs in a fresh interpreter.
+Run with: python bench_startup.py [runs]
+Run it once online and once with the network disconnected.
+"""
+
+import subprocess
+import sys
+
+SNIPPETS = {
+    "import supabase_config": (
+        "import time; t = time.perf_counter(); import supabase_config; "
+        "print(time.perf_counter() - t)"
+    ),
+    "eager client (old)": (
+        "import time; t = time.perf_counter(); from supabase import create_client; "
+        "import supabase_config; create_client(supabase_config.SUPABASE_URL, supabase_config.SUPABASE_KEY); "
+        "print(time.perf_counter() - t)"
+    ),
+    "warm-up (background)": (
+        "import time, supabase_config; t = time.perf_counter(); "
+        "supabase_config.warm_up_supabase().join(); print(time.perf_counter() - t)"
+    ),
+}
+
+
+def time_snippet(code):
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def run(runs=5):
+    print(f"Runs: {runs}")
+    print("=" * 60)
+    for name, code in SNIPPETS.items():
+        try:
+            seconds = sorted(time_snippet(code) for _ in range(runs))
+        except subprocess.CalledProcessError as e:
+            print(f"{name:24s} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:24s} {seconds[len(seconds) // 2] * 1000:8.1f} ms median")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
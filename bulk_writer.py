@@ -0,0 +1,168 @@
+"""
+Chunked, retrying, parallel bulk writes.
+
+The Supabase uploads sent every row in one insert or upsert call, so a
+6,000-row night either timed out or failed as a whole with nothing
+written. write_in_chunks splits the records into chunks bounded by row
+count and JSON size, sends a few chunks at a time and retries only the
+chunks that failed, with exponential backoff. It knows nothing about
+Supabase: supabase_config.bulk_write passes a function that sends one
+chunk over the shared client, whose HTTP connection pool the worker
+threads reuse.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+# Chunk limits: well under PostgREST's request size and statement timeouts
+DEFAULT_CHUNK_ROWS = 500
+DEFAULT_CHUNK_BYTES = 512 * 1024
+
+# Chunks in flight at once
+DEFAULT_WORKERS = 4
+
+# Retry rounds for failed chunks; round n waits backoff * 2 ** n seconds first
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+
+class BulkWriteResult(NamedTuple):
+    """Outcome of one bulk write"""
+    rows_written: int
+    rows_failed: int
+    chunks: int
+    retries: int
+    seconds: float
+    written_records: List[Dict]
+    failed_records: List[Dict]
+    errors: List[str]                   # Last error of every chunk that still failed
+    rows_queued: int = 0                # Failed rows the caller parked for a later retry (e.g. the outbox)
+
+    @property
+    def ok(self) -> bool:
+        return self.rows_failed == 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_written / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        line = (f"{self.rows_written} rows in {self.chunks} chunks, {self.seconds:.1f}s "
+                f"({self.rows_per_second:.0f} rows/s)")
+        if self.retries:
+            line += f", {self.retries} chunk retries"
+        if self.rows_failed:
+            line += f", {self.rows_failed} rows failed"
+        if self.rows_queued:
+            line += f" ({self.rows_queued} queued)"
+        return line
+
+
+def chunk_records(records: Sequence[Dict], max_rows: int = DEFAULT_CHUNK_ROWS,
+                  max_bytes: int = DEFAULT_CHUNK_BYTES) -> List[List[Dict]]:
+    """
+    Split records into chunks of at most max_rows rows and about max_bytes
+    of JSON, keeping their order. A single record larger than max_bytes
+    gets a chunk of its own.
+    """
+    chunks = []
+    chunk = []
+    chunk_bytes = 2
+    for record in records:
+        record_bytes = len(json.dumps(record, default=str)) + 1
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + record_bytes > max_bytes):
+            chunks.append(chunk)
+            chunk = []
+            chunk_bytes = 2
+        chunk.append(record)
+        chunk_bytes += record_bytes
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def dedupe_records(records: Sequence[Dict], key: str) -> List[Dict]:
+    """
+    One record per key value: the last one wins, at the position of the
+    first. Postgres rejects an upsert that touches the same row twice.
+    """
+    latest: Dict[object, Dict] = {}
+    for record in records:
+        latest[record.get(key)] = record
+    return list(latest.values())
+
+
+def write_in_chunks(send_chunk: Callable[[List[Dict]], object], records: Sequence[Dict],
+                    max_rows: int = DEFAULT_CHUNK_ROWS, max_bytes: int = DEFAULT_CHUNK_BYTES,
+                    workers: int = DEFAULT_WORKERS, retries: int = DEFAULT_RETRIES,
+                    backoff: float = DEFAULT_BACKOFF, label: str = "rows",
+                    sleep: Callable[[float], None] = time.sleep) -> BulkWriteResult:
+    """
+    Send records in chunks, a few at a time, retrying failed chunks.
+
+    Chunks may land in any order; callers that need the file order store
+    it in the rows (e.g. excel_row_sequence). A chunk whose request timed
+    out after the server committed it is sent again, so plain inserts can
+    duplicate rows in that case - upserts cannot.
+
+    Args:
+        send_chunk: Writes one chunk, raises on failure
+        records: Rows to write
+        max_rows, max_bytes: Chunk limits
+        workers: Chunks in flight at once
+        retries: Retry rounds for failed chunks
+        backoff: Seconds before the first retry round, doubled every round
+        label: Name for progress messages
+        sleep: Waits between retry rounds
+
+    Returns:
+        BulkWriteResult
+    """
+    started = time.perf_counter()
+    chunks = chunk_records(records, max_rows, max_bytes)
+    pending = list(range(len(chunks)))
+    errors: Dict[int, str] = {}
+    retried = 0
+
+    def send(index: int) -> Tuple[int, str]:
+        try:
+            send_chunk(chunks[index])
+            return index, ""
+        except Exception as e:
+            return index, f"{type(e).__name__}: {e}"
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks) or 1))) as executor:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                delay = backoff * 2 ** (attempt - 1)
+                print(f"🔁 {label}: retrying {len(pending)} failed chunks in {delay:.1f}s")
+                sleep(delay)
+                retried += len(pending)
+            failed = []
+            for index, error in executor.map(send, pending):
+                if error:
+                    errors[index] = error
+                    failed.append(index)
+                else:
+                    errors.pop(index, None)
+            pending = failed
+
+    failed_chunks = set(pending)
+    written_records = [record for index, chunk in enumerate(chunks) if index not in failed_chunks for record in chunk]
+    failed_records = [record for index in pending for record in chunks[index]]
+    for index in pending:
+        print(f"❌ {label}: chunk {index + 1}/{len(chunks)} ({len(chunks[index])} rows) failed: {errors[index]}")
+    return BulkWriteResult(
+        rows_written=len(written_records),
+        rows_failed=len(failed_records),
+        chunks=len(chunks),
+        retries=retried,
+        seconds=time.perf_counter() - started,
+        written_records=written_records,
+        failed_records=failed_records,
+        errors=[errors[index] for index in pending],
+    )
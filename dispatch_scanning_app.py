@@ -1,3 +1,6 @@
+import time
+# Startup is measured from here: the imports below are part of it
+STARTUP_STARTED = time.perf_counter()
 import sys
 import os
 import json
@@ -8,6 +11,8 @@ import pytesseract
 from PIL import Image
 import io
 import re
+import multiprocessing
+from concurrent.futures import Future
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 
@@ -41,9 +46,10 @@ import hashlib
 import requests
 from datetime import datetime, timedelta
 import serial
-import time
 import subprocess
 import tempfile
+import threading
+from typing import NamedTuple, Optional
 import win32print
 import win32api
 
@@ -52,17 +58,32 @@ from PySide6.QtWidgets import (
     QGridLayout, QLabel, QPushButton, QTextEdit, QLineEdit, 
     QFileDialog, QMessageBox, QProgressBar, QStatusBar, QFrame,
     QScrollArea, QGroupBox, QSplitter, QComboBox, QDialog, 
-    QDialogButtonBox, QListWidget, QTableWidget, QTableWidgetItem,
+    QDialogButtonBox, QListWidget, QTableWidget, QTableWidgetItem, QTableView,
     QHeaderView, QPlainTextEdit, QCheckBox, QTabWidget, QDateEdit,
     QStyledItemDelegate, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
     QGraphicsRectItem
 )
-from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSize, QDate, QRectF, QPointF
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSize, QDate, QRectF, QPointF, QAbstractTableModel, QModelIndex
 from PySide6.QtGui import QFont, QPalette, QColor, QIcon, QPixmap, QPen, QBrush, QPainter
 
+from order_matching import OrderMatcher, TokenOrderIndex, OcrConfusionIndex, EditDistanceIndex
+from pdf_text_extraction import extract_pdf_texts
+from extraction_cache import default_extraction_cache, file_sha256, clip_key, FULL_PAGE
+from ocr_service import default_ocr_service, PageWords, PAGE_PSM_MODE, words_from_json, words_to_json
+from page_render import render_page_image, render_scale, DEFAULT_OCR_DPI
+from ocr_strategy import OcrStats, strategy_for
+from text_layer import TEXT_LAYER_GOOD, document_text_layer
+from page_layout import PageLayout
+from region_calibration import default_region_calibrator
+from order_cache import PRELOAD_HOURS, LatencyHistogram, OrderLookupCache
+from barcode_stamping import BarcodeTemplates, BarcodeStamper, code128_pattern, barcode_png, save_document, format_file_size
+from barcode_cache import default_barcode_cache
+
 # Import Supabase configuration
 try:
-    from supabase_config import save_generated_barcodes, upload_store_orders_from_excel, get_supabase_client
+    from supabase_config import (save_generated_barcodes, upload_store_orders_from_excel, get_supabase_client,
+                                 warm_up_supabase, queue_rows, outbox_depth, outbox_dead_count,
+                                 start_outbox_flusher, fetch_order, fetch_recent_orders, fetch_orders_page)
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
@@ -87,6 +108,200 @@ class ProcessingThread(QThread):
             self.finished_signal.emit(False, {"error": str(e)})
 
 
+class PageProgress:
+    """Pages done, throughput and ETA of a long page-by-page job"""
+    
+    def __init__(self, total_pages):
+        self.total_pages = total_pages
+        self.pages_done = 0
+        self.start_time = time.perf_counter()
+    
+    def page_done(self):
+        """Count one page; returns self for the progress signal"""
+        self.pages_done += 1
+        return self
+    
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+    
+    @property
+    def fraction(self):
+        return self.pages_done / self.total_pages if self.total_pages else 1.0
+    
+    @property
+    def pages_per_second(self):
+        elapsed = self.elapsed()
+        return self.pages_done / elapsed if elapsed > 0 else 0.0
+    
+    @property
+    def eta_seconds(self):
+        rate = self.pages_per_second
+        return (self.total_pages - self.pages_done) / rate if rate > 0 else None
+    
+    def status_text(self):
+        eta = self.eta_seconds
+        eta_text = f"{int(eta // 60)}:{int(eta % 60):02d}" if eta is not None else "--:--"
+        return (f"Extracting regions: page {self.pages_done}/{self.total_pages} "
+                f"({self.pages_per_second:.1f} pages/sec, ETA {eta_text})")
+
+
+class UnifiedExtractionResult(NamedTuple):
+    """What the unified extraction worker hands back to the UI"""
+    excel_data: list                # Internal Excel rows, one per order
+    debug_results: list             # Per-region extraction results
+    pages_processed: int
+    total_pages: int
+    seconds: float
+    cancelled: bool = False
+    error: Optional[str] = None
+    skipped_region_extractions: int = 0     # Regions not extracted on pages without the trigger text
+    
+    @property
+    def pages_per_second(self):
+        return self.pages_processed / self.seconds if self.seconds > 0 else 0.0
+
+
+class UnifiedExtractionThread(QThread):
+    """Background thread for the region extraction part of the unified flow"""
+    progress_signal = Signal(str)
+    page_progress_signal = Signal(object)   # PageProgress
+    finished_signal = Signal(object)        # UnifiedExtractionResult
+    
+    def __init__(self, app_instance):
+        super().__init__()
+        self.app = app_instance
+        self._cancelled = threading.Event()
+    
+    def cancel(self):
+        self._cancelled.set()
+    
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+    
+    def run(self):
+        try:
+            result = self.app.extract_unified_data(self)
+        except Exception as e:
+            self.progress_signal.emit(f"Error: {str(e)}")
+            result = UnifiedExtractionResult([], [], 0, 0, 0.0, error=str(e))
+        self.finished_signal.emit(result)
+
+
+def format_order_cell(column, value):
+    """Display text of one Order Management cell"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if column == 'created_at' and isinstance(value, str) and value:
+        # Format date for better readability
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%d/%m/%Y')
+        except ValueError:
+            return value
+    return str(value)
+
+
+class OrderTableModel(QAbstractTableModel):
+    """
+    Order Management rows, fetched a page at a time as the view scrolls.
+    
+    Only the displayed columns are selected, pages are keyset-paginated on
+    (created_at, id) and fetched on a worker thread; the cells are kept as
+    display strings, not one QTableWidgetItem and QFont per cell.
+    """
+    COLUMNS = ['ordernumber', 'customer_type', 'created_at', 'sitename', 'route', 'pdf_file_name']
+    HEADERS = ['Order Number', 'Customer Type', 'Picking Date', 'Site Name', 'Route', 'PDF File Name']
+    CENTERED_COLUMNS = {0, 2}
+    PAGE_ROWS = 200
+    page_loaded = Signal(int, object, str)  # generation, rows, error
+    
+    def __init__(self, fetch_page, parent=None):
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.rows = []
+        self.after = None
+        self.exhausted = False
+        self.loading = False
+        self.failed = False
+        self.generation = 0
+        self.order_font = QFont("Consolas", 11, QFont.Weight.Bold)  # Make order numbers more prominent
+        self.page_loaded.connect(self.on_page_loaded)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.rows[index.row()][index.column()]
+        if role == Qt.TextAlignmentRole and index.column() in self.CENTERED_COLUMNS:
+            return Qt.AlignCenter
+        if role == Qt.FontRole and index.column() == 0:
+            return self.order_font
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not (self.exhausted or self.loading or self.failed)
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.loading = True
+        generation, after = self.generation, self.after
+        threading.Thread(target=self._load_page, args=(generation, after), daemon=True).start()
+    
+    def _load_page(self, generation, after):
+        try:
+            rows = self.fetch_page(after, self.PAGE_ROWS)
+        except Exception as e:
+            self.page_loaded.emit(generation, None, str(e))
+            return
+        self.page_loaded.emit(generation, rows, "")
+    
+    def on_page_loaded(self, generation, rows, error):
+        """Append a fetched page (runs on the UI thread); pages of an earlier reload are dropped"""
+        if generation != self.generation:
+            return
+        self.loading = False
+        if error:
+            # Stop fetching until the next reload instead of retrying on every scroll
+            self.failed = True
+            print(f"Error loading order data: {error}")
+            return
+        if len(rows) < self.PAGE_ROWS:
+            self.exhausted = True
+        if not rows:
+            return
+        self.after = (rows[-1]['created_at'], rows[-1]['id'])
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(tuple(format_order_cell(column, record.get(column)) for column in self.COLUMNS)
+                         for record in rows)
+        self.endInsertRows()
+    
+    def reload(self):
+        """Drop the loaded rows and fetch the first page again"""
+        self.beginResetModel()
+        self.generation += 1
+        self.rows = []
+        self.after = None
+        self.exhausted = False
+        self.loading = False
+        self.failed = False
+        self.endResetModel()
+        self.fetchMore()
+
+
 
 
 
@@ -1333,26 +1548,23 @@ class MultiRegionCoordinateSelectorDialog(QDialog):
             pdf_document = fitz.open(self.pdf_path)
             page = pdf_document[0]
             
-            # Convert to image with same settings as main processing
-            mat = fitz.Matrix(1.0, 1.0)  # 1.0x zoom to match coordinate selector
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-            
-            # Convert to PIL Image
-            image = Image.open(io.BytesIO(img_data))
-            
-            # Crop to selected coordinates
-            cropped_image = image.crop(region['coordinates'])
+            # Render just the selected coordinates at 1.0x to match the coordinate selector
+            cropped_image = render_page_image(page, dpi=72, clip=fitz.Rect(region['coordinates']))
             
             # Test OCR with multiple configurations
             results = []
             psm_modes = [3, 6, 7, 8, 13]
             
-            for psm_mode in psm_modes:
+            # All modes run side by side on the OCR workers
+            ocr_service = default_ocr_service(pytesseract.pytesseract.tesseract_cmd)
+            ocr_futures = [(psm_mode, ocr_service.submit(cropped_image, [psm_mode])) for psm_mode in psm_modes]
+            for psm_mode, ocr_future in ocr_futures:
                 try:
-                    text = pytesseract.image_to_string(cropped_image, config=f'--psm {psm_mode}')
-                    if text.strip():
-                        results.append(f"PSM {psm_mode}: '{text.strip()}'")
+                    ocr_result = ocr_future.result()
+                    if ocr_result.error:
+                        results.append(f"PSM {psm_mode}: Error - {ocr_result.error}")
+                    elif ocr_result.text.strip():
+                        results.append(f"PSM {psm_mode}: '{ocr_result.text.strip()}'")
                 except Exception as e:
                     results.append(f"PSM {psm_mode}: Error - {str(e)}")
             
@@ -1468,7 +1680,9 @@ class MultiRegionCoordinateSelectorDialog(QDialog):
             'ocr_regions': self.regions,
             'setup_completed': True,
             'setup_date': datetime.now().isoformat(),
-            'region_5_save_location': self.region_5_save_location.text()
+            'region_5_save_location': self.region_5_save_location.text(),
+            'region_ocr_mode': getattr(self.parent(), 'region_ocr_mode', 'page'),
+            'region_calibration': getattr(self.parent(), 'region_calibration', True)
         }
         
         config_path = Path("app_data") / "ocr_config.json"
@@ -1591,26 +1805,23 @@ class MultiRegionCoordinateSelectorDialog(QDialog):
             pdf_document = fitz.open(self.pdf_path)
             page = pdf_document[0]
             
-            # Convert to image with same settings as main processing
-            mat = fitz.Matrix(1.0, 1.0)  # 1.0x zoom to match coordinate selector
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-            
-            # Convert to PIL Image
-            image = Image.open(io.BytesIO(img_data))
-            
-            # Crop to selected coordinates
-            cropped_image = image.crop(self.coordinates)
+            # Render just the selected coordinates at 1.0x to match the coordinate selector
+            cropped_image = render_page_image(page, dpi=72, clip=fitz.Rect(self.coordinates))
             
             # Test OCR with multiple configurations
             results = []
             psm_modes = [3, 6, 7, 8, 13]
             
-            for psm_mode in psm_modes:
+            # All modes run side by side on the OCR workers
+            ocr_service = default_ocr_service(pytesseract.pytesseract.tesseract_cmd)
+            ocr_futures = [(psm_mode, ocr_service.submit(cropped_image, [psm_mode])) for psm_mode in psm_modes]
+            for psm_mode, ocr_future in ocr_futures:
                 try:
-                    text = pytesseract.image_to_string(cropped_image, config=f'--psm {psm_mode}')
-                    if text.strip():
-                        results.append(f"PSM {psm_mode}: '{text.strip()}'")
+                    ocr_result = ocr_future.result()
+                    if ocr_result.error:
+                        results.append(f"PSM {psm_mode}: Error - {ocr_result.error}")
+                    elif ocr_result.text.strip():
+                        results.append(f"PSM {psm_mode}: '{ocr_result.text.strip()}'")
                 except Exception as e:
                     results.append(f"PSM {psm_mode}: Error - {str(e)}")
             
@@ -1663,6 +1874,39 @@ class MultiRegionCoordinateSelectorDialog(QDialog):
             self.accept()
 
 
+# Extraction cache mode for unified-flow region text (3x render, PSM cascade)
+# Picking sheet pages are only used when this region contains this text
+TRIGGER_REGION = 'Region 4'
+TRIGGER_TEXT = 'Total Items Delivered:'
+
+# Page OCR mode: one word-level Tesseract pass per page, regions answered from the word boxes
+PAGE_WORDS_MODE = f"ocr-words:dpi={DEFAULT_OCR_DPI}:gray:psm={PAGE_PSM_MODE}"
+
+
+def region_text_mode(region_name, page_ocr):
+    """Extraction cache mode of one region: names the OCR path and the region's strategy"""
+    strategy = strategy_for(region_name)
+    psm_modes = ",".join(str(psm_mode) for psm_mode in strategy.psm_modes)
+    if page_ocr:
+        return (f"region-text:page-ocr-dpi={DEFAULT_OCR_DPI}:gray:psm={PAGE_PSM_MODE}"
+                f":retry={psm_modes}@{strategy.min_confidence:g}")
+    return f"region-text:ocr-dpi={DEFAULT_OCR_DPI}:gray:psm={psm_modes}@{strategy.min_confidence:g}"
+
+
+def create_barcode_label(order_number, max_width):
+    """QLabel showing the real Code128 barcode, or a placeholder if it cannot be rendered"""
+    barcode_label = QLabel()
+    barcode_label.setAlignment(Qt.AlignCenter)
+    try:
+        pixmap = QPixmap()
+        pixmap.loadFromData(barcode_png(str(order_number), cache=default_barcode_cache()))
+        barcode_label.setPixmap(pixmap.scaledToWidth(min(max_width, pixmap.width()), Qt.SmoothTransformation))
+    except Exception:
+        barcode_label.setText("████████████████████████████████")
+        barcode_label.setStyleSheet("font-size: 8px; color: black; font-family: monospace;")
+    return barcode_label
+
+
 class CrateCountDialog(QDialog):
     """Dialog for selecting number of crates to print"""
     
@@ -1998,10 +2242,8 @@ class LabelPreviewDialog(QDialog):
         line4.setStyleSheet("color: #333;")
         label_widget.layout().addWidget(line4)
         
-        # Barcode representation (center aligned)
-        barcode_label = QLabel("████████████████████████████████")
-        barcode_label.setStyleSheet("font-size: 8px; color: black; font-family: monospace;")
-        barcode_label.setAlignment(Qt.AlignCenter)
+        # Barcode (center aligned), rendered through the shared barcode cache
+        barcode_label = create_barcode_label(order_number, label_width - 20)
         label_widget.layout().addWidget(barcode_label)
         
         barcode_text_label = QLabel(order_number)
@@ -2190,10 +2432,8 @@ class LabelPreviewDialog(QDialog):
         line3.setStyleSheet("color: #333;")
         layout.addWidget(line3)
         
-        # Add barcode representation (text-based)
-        barcode_label = QLabel(f"Barcode: {order_number}")
-        barcode_label.setAlignment(Qt.AlignCenter)
-        barcode_label.setStyleSheet("font-size: 14px; font-weight: bold; color: black; background-color: #f0f0f0; padding: 5px;")
+        # Add barcode, rendered through the shared barcode cache
+        barcode_label = create_barcode_label(order_number, 240)
         layout.addWidget(barcode_label)
         
         # Add separator line
@@ -3276,6 +3516,10 @@ class DispatchScanningApp(QMainWindow):
             'region_5': {'coordinates': [28, 72, 328, 92], 'color': 'purple', 'name': 'Region 5'}  # Hardcoded to address line location
         }
         self.region_5_save_location = 'Column K (Region 5 Data)'  # Default save location
+        # 'page': OCR each page once and look regions up in the word boxes; 'region': OCR each region separately
+        self.region_ocr_mode = 'page'
+        # Shift the regions per document to follow the anchor labels (region_calibration)
+        self.region_calibration = True
         self.ocr_setup_completed = True  # Mark as completed since coordinates are hardcoded
         
         # Print hardcoded OCR configuration
@@ -3294,6 +3538,13 @@ class DispatchScanningApp(QMainWindow):
         # Load OCR configuration
         self.load_ocr_config()
         
+        # Scanner lookups come from memory; the orders are preloaded once the window is shown
+        self.order_lookup = None
+        self.scan_latency = LatencyHistogram()
+        if SUPABASE_AVAILABLE:
+            self.order_lookup = OrderLookupCache(lambda: fetch_recent_orders(PRELOAD_HOURS), fetch_order)
+            QTimer.singleShot(0, self.order_lookup.start)
+        
         self.update_status("Ready")
     
     def init_ui(self):
@@ -3327,6 +3578,27 @@ class DispatchScanningApp(QMainWindow):
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         self.status_bar.addPermanentWidget(self.progress_bar)
+        
+        # Print, scan and upload rows waiting in the local outbox for Supabase
+        self.outbox_label = QLabel()
+        self.status_bar.addPermanentWidget(self.outbox_label)
+        self.outbox_timer = QTimer(self)
+        self.outbox_timer.timeout.connect(self.update_outbox_depth)
+        self.outbox_timer.start(2000)
+        self.update_outbox_depth()
+    
+    def update_outbox_depth(self):
+        """Show how many rows the outbox still has to send"""
+        if not SUPABASE_AVAILABLE:
+            self.outbox_label.setText("")
+            return
+        depth = outbox_depth()
+        text = f"📤 Outbox: {depth} waiting" if depth else "📤 Outbox: all sent"
+        dead = outbox_dead_count()
+        if dead:
+            # Rejected by Supabase too often; kept in the outbox file for inspection
+            text += f" ⚠️ {dead} failed"
+        self.outbox_label.setText(text)
     
     def create_header(self):
         """Create modern application header"""
@@ -3465,16 +3737,16 @@ class DispatchScanningApp(QMainWindow):
         table_layout = QVBoxLayout(table_frame)
         table_layout.setContentsMargins(0, 0, 0, 0)
         
-        # Create table widget
-        self.order_table = QTableWidget()
+        # Virtual table: rows are fetched page by page as the user scrolls
+        self.order_model = OrderTableModel(fetch_orders_page, self)
+        self.order_table = QTableView()
         self.order_table.setObjectName("orderTable")
+        self.order_table.setModel(self.order_model)
         self.order_table.setAlternatingRowColors(True)
-        self.order_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.order_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.order_table.setSortingEnabled(True)
+        self.order_table.setSelectionBehavior(QTableView.SelectRows)
+        self.order_table.setSelectionMode(QTableView.SingleSelection)
         
         # Set table properties
-        self.order_table.horizontalHeader().setStretchLastSection(True)
         self.order_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.order_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)  # Order Number
         self.order_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Fixed)  # Customer Type
@@ -3484,122 +3756,35 @@ class DispatchScanningApp(QMainWindow):
         self.order_table.horizontalHeader().setSectionResizeMode(5, QHeaderView.Fixed)  # PDF File Name
         self.order_table.verticalHeader().setVisible(False)
         
+        # Set appropriate column widths for better readability
+        column_widths = [
+            200,    # Order Number - increased width for better visibility
+            150,    # Customer Type - wider for text content
+            140,    # Picking Date - needs space for date/time format
+            400,    # Site Name - increased width to show all text
+            120,    # Route - similar to order number
+            500     # PDF File Name - much wider for full file names
+        ]
+        for col, width in enumerate(column_widths):
+            self.order_table.setColumnWidth(col, width)
+        
+        # Ensure the table stretches to fill available space
+        self.order_table.horizontalHeader().setStretchLastSection(True)
+        
         table_layout.addWidget(self.order_table)
         layout.addWidget(table_frame)
         
-        # Load initial data
-        self.load_order_data()
+        # Load initial data once the window is on screen, so a slow network does not hold it back
+        QTimer.singleShot(0, self.load_order_data)
         
         return tab_widget
     
     def load_order_data(self):
-        """Load order data from Supabase dispatch_orders table"""
+        """Load the first page of dispatch_orders; later pages load as the table scrolls"""
         if not SUPABASE_AVAILABLE:
             return
         
-        try:
-            # Get Supabase client
-            supabase_client = get_supabase_client()
-            
-            # Fetch all data from dispatch_orders table
-            result = supabase_client.table('dispatch_orders').select("*").order('created_at', desc=True).execute()
-            
-            if result.data:
-                self.populate_order_table(result.data)
-            else:
-                self.order_table.setRowCount(0)
-                self.order_table.setColumnCount(0)
-                
-        except Exception as e:
-            print(f"Error loading order data: {e}")
-    
-    def populate_order_table(self, data):
-        """Populate the order table with data from Supabase"""
-        if not data:
-            return
-        
-        # Define column mapping - only show requested columns
-        columns = [
-            'ordernumber', 'customer_type', 'created_at', 'sitename', 'route', 'pdf_file_name'
-        ]
-        
-        # User-friendly column headers
-        column_headers = [
-            'Order Number', 'Customer Type', 'Picking Date', 'Site Name', 'Route', 'PDF File Name'
-        ]
-        
-        # Set table dimensions
-        self.order_table.setRowCount(len(data))
-        self.order_table.setColumnCount(len(columns))
-        self.order_table.setHorizontalHeaderLabels(column_headers)
-        
-        # Populate table with data
-        for row_idx, record in enumerate(data):
-            for col_idx, column in enumerate(columns):
-                value = record.get(column, '')
-                
-                # Format the value for display
-                if value is None:
-                    display_value = ''
-                elif isinstance(value, bool):
-                    display_value = 'Yes' if value else 'No'
-                elif isinstance(value, (dict, list)):
-                    display_value = str(value)
-                elif column == 'created_at' and value:
-                    # Format date for better readability
-                    try:
-                        from datetime import datetime
-                        if isinstance(value, str):
-                            # Parse ISO format date
-                            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                            display_value = dt.strftime('%d/%m/%Y')
-                        else:
-                            display_value = str(value)
-                    except:
-                        display_value = str(value)
-                else:
-                    display_value = str(value)
-                
-                # Create table item
-                item = QTableWidgetItem(display_value)
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Make read-only
-                
-                # Set special formatting for certain columns
-                if column in ['created_at']:
-                    item.setTextAlignment(Qt.AlignCenter)
-                elif column in ['ordernumber', 'dispatchcode']:
-                    item.setTextAlignment(Qt.AlignCenter)
-                    if column == 'ordernumber':
-                        item.setFont(QFont("Consolas", 11, QFont.Weight.Bold))  # Make order numbers more prominent
-                    else:
-                        item.setFont(QFont("Consolas", 10, QFont.Weight.Normal))  # Dispatch code in monospace
-                
-                self.order_table.setItem(row_idx, col_idx, item)
-        
-        # Resize columns to content
-        self.order_table.resizeColumnsToContents()
-        
-        # Set appropriate column widths for better readability
-        column_widths = {
-            'ordernumber': 200,      # Order Number - increased width for better visibility
-            'customer_type': 150,    # Customer Type - wider for text content
-            'created_at': 140,       # Picking Date - needs space for date/time format
-            'sitename': 400,         # Site Name - increased width to show all text
-            'route': 120,            # Route - similar to order number
-            'pdf_file_name': 500     # PDF File Name - much wider for full file names
-        }
-        
-        for col in range(self.order_table.columnCount()):
-            column_name = columns[col]
-            if column_name in column_widths:
-                self.order_table.setColumnWidth(col, column_widths[column_name])
-            else:
-                # Fallback minimum width
-                current_width = self.order_table.columnWidth(col)
-                self.order_table.setColumnWidth(col, max(current_width, 120))
-        
-        # Ensure the table stretches to fill available space
-        self.order_table.horizontalHeader().setStretchLastSection(True)
+        self.order_model.reload()
     
     def refresh_order_data(self):
         """Refresh the order data from Supabase"""
@@ -4075,9 +4260,6 @@ class DispatchScanningApp(QMainWindow):
         try:
             from datetime import datetime
             
-            # Get Supabase client
-            supabase_client = get_supabase_client()
-            
             # Prepare the record data
             record_data = {
                 'order_number': order_number,
@@ -4088,13 +4270,10 @@ class DispatchScanningApp(QMainWindow):
                 'printed_at': datetime.now().isoformat()
             }
             
-            # Insert the record
-            response = supabase_client.table('print_history').insert(record_data).execute()
-            
-            if response.data:
-                print(f"Print event recorded: {order_number} - {crate_quantity} crates")
-            else:
-                print("Failed to record print event")
+            # Commit locally; the outbox flusher sends it, so a dropped network never stalls printing
+            queue_rows('print_history', [record_data])
+            print(f"Print event recorded: {order_number} - {crate_quantity} crates")
+            self.update_outbox_depth()
                 
         except Exception as e:
             print(f"Error recording print event: {e}")
@@ -4292,28 +4471,23 @@ class DispatchScanningApp(QMainWindow):
         self.fetch_order_data(order_number)
     
     def fetch_order_data(self, order_number):
-        """Fetch order data from Supabase using order number"""
+        """Fetch order data using order number: from the order cache, or Supabase on a miss"""
         if not SUPABASE_AVAILABLE:
             self.order_info_label.setText("Error: Supabase not available")
             self.log_print_message("Error: Supabase not available")
             return
         
+        # Scan-to-dialog latency starts here (after the scanner input has settled)
+        scan_started = time.perf_counter()
+        
         try:
-            # Get Supabase client
-            supabase_client = get_supabase_client()
-            
             # Store original case for display
             original_order_number = order_number
-            # Convert to uppercase for database search (database likely stores in uppercase)
-            search_order_number = order_number.upper()
             
-            # Query for the specific order
-            result = supabase_client.table('dispatch_orders').select(
-                "ordernumber, sitename, route, customer_type, created_at, dispatchcode"
-            ).eq('ordernumber', search_order_number).execute()
+            # Preloaded orders are answered from memory; others are fetched and cached
+            order_data, source = self.order_lookup.get(order_number)
             
-            if result.data and len(result.data) > 0:
-                order_data = result.data[0]
+            if order_data:
                 # Store the original case order number for display and printing
                 order_data['ordernumber'] = original_order_number
                 self.current_order_data = order_data
@@ -4347,6 +4521,8 @@ Date: {created_at}"""
                 # Reset visual feedback
                 self.highlight_order_input(False)
                 
+                self.record_scan_latency(scan_started, source)
+                
                 # Show crate count dialog immediately after scanning
                 self.show_crate_count_dialog()
                 
@@ -4366,6 +4542,17 @@ Date: {created_at}"""
             # Reset visual feedback
             self.highlight_order_input(False)
     
+    def record_scan_latency(self, scan_started, source):
+        """Add one scan-to-dialog time to the histogram; print the histogram every 20 scans"""
+        milliseconds = (time.perf_counter() - scan_started) * 1000
+        self.scan_latency.record(milliseconds)
+        print(f"⏱️ Scan to dialog: {milliseconds:.0f} ms ({source})")
+        if len(self.scan_latency) % 20 == 0:
+            print(f"📊 Scan-to-dialog latency (order cache: {self.order_lookup.hits} hits, "
+                  f"{self.order_lookup.misses} misses):")
+            for line in self.scan_latency.summary_lines():
+                print(f"  {line}")
+    
     def connect_printer(self):
         """Connect to Zebra ZT411 printer"""
         try:
@@ -5119,6 +5306,13 @@ Date: {created_at}"""
         self.unified_progress_bar.setVisible(False)
         layout.addWidget(self.unified_progress_bar)
         
+        # Cancel button for the region extraction (shown while it runs)
+        self.unified_cancel_btn = QPushButton("Cancel")
+        self.unified_cancel_btn.setObjectName("secondaryButton")
+        self.unified_cancel_btn.clicked.connect(self.cancel_unified_flow)
+        self.unified_cancel_btn.setVisible(False)
+        layout.addWidget(self.unified_cancel_btn)
+        
         return section
     
     def create_unified_processing_column(self):
@@ -5734,100 +5928,201 @@ Date: {created_at}"""
             
             # Update status and show progress bar
             self.unified_process_btn.setEnabled(False)
+            self.unified_cancel_btn.setEnabled(True)
+            self.unified_cancel_btn.setVisible(True)
             self.unified_progress_bar.setVisible(True)
             self.unified_progress_bar.setValue(0)
             self.update_status("Starting unified processing...")
             
-            # Step 1: Extract data from picking sheets (same as Excel generation)
-            debug_results = []
-            configured_regions = [region for region in self.ocr_regions.values() if region['coordinates']]
-            
-            # Debug: Print OCR region information
-            print("="*80)
-            print("🔍 OCR REGIONS DEBUG INFORMATION")
-            print("="*80)
-            print(f"Total OCR regions configured: {len(configured_regions)}")
-            for region_id, region_data in self.ocr_regions.items():
-                if region_data.get('coordinates'):
-                    print(f"  ✅ {region_data['name']} ({region_data['color']}): {region_data['coordinates']}")
-                    # Special debug for Region 5
-                    if region_data['name'] == 'Region 5':
-                        print(f"      🟣 REGION 5 COORDINATES: {region_data['coordinates']}")
-                else:
-                    print(f"  ❌ {region_data['name']} ({region_data['color']}): Not configured")
-            print("="*80)
-            
-            # Calculate total work
-            total_pdfs = len(self.picking_sheet_files)
-            total_work = 0
-            pdf_page_counts = []
+            # Steps 1-2.5 (region extraction, internal Excel data, backup file) run on a worker
+            # so the window stays responsive; on_unified_extraction_finished takes over from there
+            self.unified_thread = UnifiedExtractionThread(self)
+            self.unified_thread.progress_signal.connect(self.update_status)
+            self.unified_thread.page_progress_signal.connect(self.on_unified_page_progress)
+            self.unified_thread.finished_signal.connect(self.on_unified_extraction_finished)
+            self.unified_thread.start()
             
-            for pdf_path in self.picking_sheet_files:
-                try:
-                    pdf_document = fitz.open(pdf_path)
-                    page_count = len(pdf_document)
-                    pdf_page_counts.append(page_count)
-                    total_work += page_count * len(configured_regions)
-                    pdf_document.close()
-                except Exception as e:
-                    pdf_page_counts.append(0)
-                    print(f"Error counting pages in {pdf_path}: {e}")
-            
-            current_work = 0
+        except Exception as e:
+            QMessageBox.critical(self, "Unified Processing Error", f"An error occurred during unified processing:\n{str(e)}")
+            self.unified_process_btn.setEnabled(True)
+            self.unified_cancel_btn.setVisible(False)
+            self.unified_progress_bar.setVisible(False)
+            self.update_status(f"Unified processing failed: {str(e)}")
+    
+    def cancel_unified_flow(self):
+        """Ask the unified extraction worker to stop after the current page"""
+        if getattr(self, 'unified_thread', None) is not None and self.unified_thread.isRunning():
+            self.unified_thread.cancel()
+            self.unified_cancel_btn.setEnabled(False)
+            self.update_status("Cancelling after the current page...")
+    
+    def on_unified_page_progress(self, progress):
+        """Show extraction progress (a PageProgress) from the worker"""
+        self.unified_progress_bar.setValue(int(progress.fraction * 50))  # First half for data extraction
+        self.update_status(progress.status_text())
+    
+    def extract_unified_data(self, worker):
+        """
+        Steps 1-2.5 of the unified flow, run on a UnifiedExtractionThread:
+        extract every OCR region of every picking sheet page, build the
+        internal Excel data and write the Excel backup file.
+        
+        Args:
+            worker: The UnifiedExtractionThread (status and page progress signals, cancel flag)
+        
+        Returns:
+            UnifiedExtractionResult
+        """
+        report = worker.progress_signal.emit
+        
+        # Step 1: Extract data from picking sheets (same as Excel generation)
+        debug_results = []
+        configured_regions = [region for region in self.ocr_regions.values() if region['coordinates']]
+        
+        # Debug: Print OCR region information
+        print("="*80)
+        print("🔍 OCR REGIONS DEBUG INFORMATION")
+        print("="*80)
+        print(f"Total OCR regions configured: {len(configured_regions)}")
+        for region_id, region_data in self.ocr_regions.items():
+            if region_data.get('coordinates'):
+                print(f"  ✅ {region_data['name']} ({region_data['color']}): {region_data['coordinates']}")
+                # Special debug for Region 5
+                if region_data['name'] == 'Region 5':
+                    print(f"      🟣 REGION 5 COORDINATES: {region_data['coordinates']}")
+            else:
+                print(f"  ❌ {region_data['name']} ({region_data['color']}): Not configured")
+        print("="*80)
+        
+        # Calculate total work
+        total_pages = 0
+        
+        for pdf_path in self.picking_sheet_files:
+            try:
+                pdf_document = fitz.open(pdf_path)
+                total_pages += len(pdf_document)
+                pdf_document.close()
+            except Exception as e:
+                print(f"Error counting pages in {pdf_path}: {e}")
+        
+        progress = PageProgress(total_pages)
+        extraction_cache = default_extraction_cache()
+        ocr_service = default_ocr_service(pytesseract.pytesseract.tesseract_cmd)
+        page_ocr = self.region_ocr_mode == 'page'
+        ocr_stats = OcrStats()
+        print(f"Region OCR mode: {'one pass per page' if page_ocr else 'per region'}")
+        
+        calibrator = default_region_calibrator() if self.region_calibration else None
+        skipped_pages = 0
+        skipped_region_extractions = 0
+        
+        for pdf_index, pdf_path in enumerate(self.picking_sheet_files):
+            if worker.is_cancelled():
+                break
+            report(f"Processing: {Path(pdf_path).name}")
             
-            for pdf_index, pdf_path in enumerate(self.picking_sheet_files):
-                self.update_status(f"Processing: {Path(pdf_path).name}")
+            try:
+                pdf_document = fitz.open(pdf_path)
+                file_hash = file_sha256(pdf_path) if extraction_cache else None
                 
-                try:
-                    pdf_document = fitz.open(pdf_path)
+                # Empty or junk text layers (broken fonts) go straight to OCR for every region
+                text_layer = document_text_layer(pdf_document, file_hash, extraction_cache)
+                use_text_layer = text_layer == TEXT_LAYER_GOOD
+                if not use_text_layer:
+                    print(f"  🔎 Text layer of {Path(pdf_path).name} is {text_layer} - using OCR for every region")
+                
+                # Follow small ERP layout shifts: regions move with the anchor labels found in this document
+                document_regions = configured_regions
+                if calibrator is not None and use_text_layer:
+                    calibration = calibrator.calibrate(pdf_document, configured_regions)
+                    document_regions = calibration.regions
+                    if calibration.shifted:
+                        print(f"  📐 Layout of {Path(pdf_path).name} is shifted - regions moved by {calibration.offsets}"
+                              f"{' (cached)' if calibration.from_cache else ''}")
+                
+                # (index, region) groups in extraction order: the trigger region alone first, if configured
+                indexed_regions = list(enumerate(document_regions))
+                trigger_group = [item for item in indexed_regions if item[1]['name'] == TRIGGER_REGION]
+                if trigger_group:
+                    region_groups = [trigger_group, [item for item in indexed_regions if item[1]['name'] != TRIGGER_REGION]]
+                else:
+                    region_groups = [indexed_regions]
+                region_rects = [fitz.Rect(region['coordinates']) for region in document_regions]
+                
+                for page_num in range(len(pdf_document)):
+                    if worker.is_cancelled():
+                        break
+                    page = pdf_document[page_num]
                     
-                    for page_num in range(len(pdf_document)):
-                        page = pdf_document[page_num]
-                        
-                        # Debug: Print page processing info
-                        print(f"  📄 Processing page {page_num + 1} of {Path(pdf_path).name}")
+                    # Debug: Print page processing info
+                    print(f"  📄 Processing page {page_num + 1} of {Path(pdf_path).name}")
+                    
+                    # Page OCR runs at most once, when the first region without a text layer needs it
+                    page_words = None
+                    if page_ocr:
+                        page_words = self.create_page_words(page, ocr_service, extraction_cache, file_hash, page_num)
+                    
+                    # The page's text layer is parsed once, when the first uncached region needs it,
+                    # and every region is cut from it in one vectorized pass
+                    layer_texts = None
+                    
+                    # The trigger region goes first: pages without "Total Items Delivered:" are
+                    # dropped by create_internal_excel_data, so their other regions are not extracted
+                    new_cache_rows = []
+                    is_trigger_page = True
+                    for group_index, region_group in enumerate(region_groups):
+                        if group_index > 0 and not is_trigger_page:
+                            skipped_pages += 1
+                            skipped_region_extractions += len(region_group)
+                            print(f"    ⏭️ No '{TRIGGER_TEXT}' in {TRIGGER_REGION} - skipping the other regions")
+                            break
                         
-                        for region in configured_regions:
+                        # First pass: text layer (or cache) for every region; empty
+                        # regions are queued on the OCR workers all at once
+                        page_regions = []
+                        for region_index, region in region_group:
                             coordinates = region['coordinates']
-                            rect = fitz.Rect(coordinates[0], coordinates[1], coordinates[2], coordinates[3])
+                            rect = region_rects[region_index]
                             
                             # Debug: Print region processing info
                             print(f"    🔍 Extracting from {region['name']} ({region['color']}) at {coordinates}")
                             
-                            extracted_text = self.extract_text_from_exact_coordinates(page, rect)
+                            # Regions extracted by an earlier run come from the extraction cache
+                            region_clip = clip_key(rect)
+                            region_mode = region_text_mode(region['name'], page_ocr)
+                            cached_region = None
+                            if file_hash:
+                                cached_region = extraction_cache.get(file_hash, page_num, region_clip, region_mode)
                             
-                            # Debug: Print extraction results
-                            if extracted_text.strip():
-                                print(f"      ✅ Extracted: '{extracted_text.strip()}'")
-                                # Special debug for Region 5
-                                if region['name'] == 'Region 5':
-                                    print(f"      🟣 REGION 5 DEBUG: Raw text = '{extracted_text}'")
-                                    print(f"      🟣 REGION 5 DEBUG: Cleaned text = '{self.clean_extracted_text(extracted_text)}'")
+                            if cached_region is not None:
+                                print(f"      ♻️ Cached: '{cached_region.text.strip()}'")
+                                ocr_stats.record_cached(region['name'])
+                                page_regions.append((region, rect, region_clip, region_mode, cached_region.text, None, True))
                             else:
-                                print(f"      ❌ No text extracted from {region['name']}")
-                            
-                            if not extracted_text.strip():
-                                print(f"      🔄 Trying OCR fallback for {region['name']}...")
-                                try:
-                                    mat = fitz.Matrix(3.0, 3.0)
-                                    pix = page.get_pixmap(matrix=mat, clip=rect)
-                                    img_data = pix.tobytes("png")
-                                    image = Image.open(io.BytesIO(img_data))
-                                    
-                                    psm_modes = [6, 3, 7, 8, 13]
-                                    for psm_mode in psm_modes:
-                                        try:
-                                            ocr_text = pytesseract.image_to_string(image, config=f'--psm {psm_mode}')
-                                            if ocr_text.strip():
-                                                extracted_text = ocr_text
-                                                print(f"      ✅ OCR extracted: '{ocr_text.strip()}' (PSM {psm_mode})")
-                                                break
-                                        except Exception:
-                                            continue
-                                    else:
-                                        print(f"      ❌ OCR failed for {region['name']} - no text detected")
-                                except Exception as ocr_error:
-                                    print(f"      ❌ OCR error for {region['name']}: {str(ocr_error)}")
+                                if use_text_layer and layer_texts is None:
+                                    layer_texts = PageLayout.from_page(page).texts_in_rects(region_rects)
+                                extracted_text, ocr_future = self.extract_region_text(
+                                    page, rect, region, ocr_service, page_words, use_text_layer,
+                                    layer_texts[region_index] if layer_texts is not None else None)
+                                if ocr_future is None:
+                                    ocr_stats.record_text_layer(region['name'])
+                                page_regions.append((region, rect, region_clip, region_mode, extracted_text, ocr_future, False))
+                        
+                        # Second pass: collect OCR results in region order
+                        for region, rect, region_clip, region_mode, extracted_text, ocr_future, from_cache in page_regions:
+                            coordinates = region['coordinates']
+                            ocr_used = False
+                            ocr_failed = False
+                            if ocr_future is not None:
+                                # Low-confidence page OCR is retried on the region with its own strategy
+                                retry = None
+                                if page_words is not None:
+                                    retry = lambda: self.ocr_region(page, rect, region, ocr_service)
+                                extracted_text, ocr_used, ocr_failed = self.resolve_region_ocr(
+                                    region, extracted_text, ocr_future, ocr_stats, retry)
+                            if file_hash and not from_cache and not ocr_failed:
+                                new_cache_rows.append((file_hash, page_num, region_clip, region_mode,
+                                                       extracted_text, ocr_used))
                             
                             cleaned_text = self.clean_extracted_text(extracted_text)
                             
@@ -5841,81 +6136,116 @@ Date: {created_at}"""
                                 'raw_text': extracted_text
                             }
                             debug_results.append(result)
-                            
-                            current_work += 1
-                            if total_work > 0:
-                                progress = int((current_work / total_work) * 50)  # First half for data extraction
-                                self.unified_progress_bar.setValue(progress)
-                            
-                            self.update_status(f"Page {page_num + 1}, {region['name']}: '{cleaned_text}'")
-                    
-                    pdf_document.close()
+                            if region['name'] == TRIGGER_REGION:
+                                is_trigger_page = TRIGGER_TEXT in cleaned_text.strip()
                         
-                except Exception as e:
-                    error_result = {
-                        'file': Path(pdf_path).name,
-                        'error': str(e),
-                        'coordinates': coordinates
-                    }
-                    debug_results.append(error_result)
-                    self.update_status(f"Error processing {Path(pdf_path).name}: {str(e)}")
-            
-            # Step 2: Create internal Excel data structure (instead of generating Excel file)
-            self.unified_progress_bar.setValue(60)
-            
-            self.internal_excel_data = self.create_internal_excel_data(debug_results)
-            
-            if not self.internal_excel_data:
-                QMessageBox.warning(self, "No Data", "No valid data found in the picking sheets. Please check the PDF files and try again.")
-                self.unified_process_btn.setEnabled(True)
-                self.unified_progress_bar.setVisible(False)
-                return
-            
+                    # Keep the page's word boxes too, so changed regions can be answered without OCR
+                    if page_words is not None and page_words.started and not page_words.from_cache:
+                        words_future = page_words.words_future()
+                        ocr_stats.record_page_ocr(page_words.seconds)
+                        if file_hash and words_future.done() and words_future.exception() is None:
+                            new_cache_rows.append((file_hash, page_num, FULL_PAGE, PAGE_WORDS_MODE,
+                                                   words_to_json(words_future.result()), True))
+                    
+                    if new_cache_rows:
+                        extraction_cache.put_many(new_cache_rows)
+                    
+                    worker.page_progress_signal.emit(progress.page_done())
+                
+                pdf_document.close()
+                    
+            except Exception as e:
+                error_result = {
+                    'file': Path(pdf_path).name,
+                    'error': str(e),
+                    'coordinates': coordinates
+                }
+                debug_results.append(error_result)
+                report(f"Error processing {Path(pdf_path).name}: {str(e)}")
+        
+        if skipped_pages:
+            report(f"⏭️ {skipped_pages} pages without '{TRIGGER_TEXT}': "
+                   f"{skipped_region_extractions} page-region extractions avoided")
+        
+        # Per-region hit rates and OCR time, accumulated for tuning ocr_strategy
+        print("📊 OCR statistics:")
+        for line in ocr_stats.summary_lines():
+            print(f"  {line}")
+        ocr_stats.save()
+        
+        if worker.is_cancelled():
+            return UnifiedExtractionResult([], debug_results, progress.pages_done, total_pages,
+                                           progress.elapsed(), cancelled=True,
+                                           skipped_region_extractions=skipped_region_extractions)
+        
+        # Step 2: Create internal Excel data structure (instead of generating Excel file)
+        report("Creating internal Excel data...")
+        excel_data = self.create_internal_excel_data(debug_results, report)
+        
+        if excel_data:
             # Step 2.5: Generate Excel backup file
-            self.unified_progress_bar.setValue(70)
-            
             try:
-                self.generate_excel_backup_file(self.internal_excel_data)
-                self.update_status("✅ Excel backup file generated successfully")
+                self.generate_excel_backup_file(excel_data, report)
+                report("✅ Excel backup file generated successfully")
             except Exception as e:
-                self.update_status(f"⚠️ Warning: Could not generate Excel backup: {str(e)}")
-            
-            # DEBUG: Show the generated table data
-            self.show_debug_table(self.internal_excel_data)
+                report(f"⚠️ Warning: Could not generate Excel backup: {str(e)}")
             
             # Also print to console for easy debugging
-            self.print_debug_data(self.internal_excel_data)
-            
-            # Step 3: Set up for barcode generation and database upload
-            self.unified_progress_bar.setValue(70)
-            
-            # Set the internal data as the Excel data for the existing processing flow
-            self.excel_order_numbers = [row.get('ordernumber', '') for row in self.internal_excel_data if row.get('ordernumber')]
-            
-            # Set the picking sheet files as the PDF files for processing
-            self.selected_picking_pdf_files = self.picking_sheet_files
-            
-            # Step 4: Continue with the existing barcode generation and database upload process
-            self.unified_progress_bar.setValue(80)
-            
-            # Start the existing processing flow
-            self.show_progress(True)
-            self.update_status("Starting barcode generation and database upload...")
-            
-            # Start background processing
-            self.processing_thread = ProcessingThread(self)
-            self.processing_thread.progress_signal.connect(self.update_status)
-            self.processing_thread.finished_signal.connect(self.on_unified_processing_finished)
-            self.processing_thread.start()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Unified Processing Error", f"An error occurred during unified processing:\n{str(e)}")
+            self.print_debug_data(excel_data)
+        
+        return UnifiedExtractionResult(excel_data, debug_results, progress.pages_done, total_pages,
+                                       progress.elapsed(),
+                                       skipped_region_extractions=skipped_region_extractions)
+    
+    def on_unified_extraction_finished(self, result):
+        """Steps 3-4 of the unified flow, back on the GUI thread: show the data and start barcodes and upload"""
+        self.unified_cancel_btn.setVisible(False)
+        
+        if result.error or result.cancelled or not result.excel_data:
             self.unified_process_btn.setEnabled(True)
             self.unified_progress_bar.setVisible(False)
-            self.update_status(f"Unified processing failed: {str(e)}")
+            if result.error:
+                QMessageBox.critical(self, "Unified Processing Error", f"An error occurred during unified processing:\n{result.error}")
+                self.update_status(f"Unified processing failed: {result.error}")
+            elif result.cancelled:
+                self.update_status(f"Unified processing cancelled after {result.pages_processed} of {result.total_pages} pages")
+            else:
+                QMessageBox.warning(self, "No Data", "No valid data found in the picking sheets. Please check the PDF files and try again.")
+            return
+        
+        self.internal_excel_data = result.excel_data
+        self.update_status(f"Extracted {result.pages_processed} pages in {result.seconds:.1f}s "
+                           f"({result.pages_per_second:.1f} pages/sec, "
+                           f"{result.skipped_region_extractions} region extractions skipped on non-trigger pages)")
+        self.unified_progress_bar.setValue(70)
+        
+        # DEBUG: Show the generated table data
+        self.show_debug_table(self.internal_excel_data)
+        
+        # Step 3: Set up for barcode generation and database upload
+        # Set the internal data as the Excel data for the existing processing flow
+        self.excel_order_numbers = [row.get('ordernumber', '') for row in self.internal_excel_data if row.get('ordernumber')]
+        
+        # Set the picking sheet files as the PDF files for processing
+        self.selected_picking_pdf_files = self.picking_sheet_files
+        
+        # Step 4: Continue with the existing barcode generation and database upload process
+        self.unified_progress_bar.setValue(80)
+        
+        # Start the existing processing flow
+        self.show_progress(True)
+        self.update_status("Starting barcode generation and database upload...")
+        
+        # Start background processing
+        self.processing_thread = ProcessingThread(self)
+        self.processing_thread.progress_signal.connect(self.update_status)
+        self.processing_thread.finished_signal.connect(self.on_unified_processing_finished)
+        self.processing_thread.start()
     
-    def create_internal_excel_data(self, debug_results):
+    def create_internal_excel_data(self, debug_results, status_callback=None):
         """Create internal Excel data structure from debug results (same logic as generate_excel_files but returns data instead of saving)"""
+        # Worker threads pass their progress signal; the status bar may only be touched from the GUI thread
+        update_status = status_callback or self.update_status
         if not debug_results:
             return []
         
@@ -5936,12 +6266,12 @@ Date: {created_at}"""
                 
                 key = (file_name, page_num)
                 
-                if 'Region 4' in region_name:
+                if TRIGGER_REGION in region_name:
                     cleaned_text = extracted_text.strip()
-                    if 'Total Items Delivered:' not in cleaned_text:
+                    if TRIGGER_TEXT not in cleaned_text:
                         pages_to_skip.add(key)
                     else:
-                        self.update_status(f"Processing page {page_num} - 'Total Items Delivered:' found in Region 4")
+                        update_status(f"Processing page {page_num} - '{TRIGGER_TEXT}' found in {TRIGGER_REGION}")
             
             # Second pass: collect data only from pages that should be processed
             for result in debug_results:
@@ -6012,11 +6342,11 @@ Date: {created_at}"""
                     }
                     excel_data.append(excel_row)
             
-            self.update_status(f"Created {len(excel_data)} rows of internal Excel data")
+            update_status(f"Created {len(excel_data)} rows of internal Excel data")
             return excel_data
             
         except Exception as e:
-            self.update_status(f"Error creating internal Excel data: {str(e)}")
+            update_status(f"Error creating internal Excel data: {str(e)}")
             return []
     
     def on_unified_processing_finished(self, success, result):
@@ -6770,10 +7100,11 @@ Date: {created_at}"""
             )
             self.update_status(f"Excel generation failed: {str(e)}")
     
-    def generate_excel_backup_file(self, excel_data):
+    def generate_excel_backup_file(self, excel_data, status_callback=None):
         """Generate Excel backup file from processed table data"""
+        update_status = status_callback or self.update_status
         if not excel_data:
-            self.update_status("No data to generate Excel backup")
+            update_status("No data to generate Excel backup")
             return
         
         try:
@@ -6846,10 +7177,10 @@ Date: {created_at}"""
             # Save the workbook
             wb.save(excel_path)
             
-            self.update_status(f"✅ Excel backup saved: {excel_path}")
+            update_status(f"✅ Excel backup saved: {excel_path}")
             
         except Exception as e:
-            self.update_status(f"❌ Error generating Excel backup: {str(e)}")
+            update_status(f"❌ Error generating Excel backup: {str(e)}")
             raise e
     
     def add_more_orders(self):
@@ -6950,6 +7281,8 @@ Date: {created_at}"""
                     
                     self.ocr_setup_completed = config.get('setup_completed', False)
                     self.region_5_save_location = config.get('region_5_save_location', 'Column K (Region 5 Data)')
+                    self.region_ocr_mode = config.get('region_ocr_mode', 'page')
+                    self.region_calibration = config.get('region_calibration', True)
                     
                     # Print loaded configuration
                     configured_regions = [region for region in self.ocr_regions.values() if region['coordinates']]
@@ -7048,85 +7381,6 @@ Date: {created_at}"""
             else:
                 QMessageBox.critical(self, "Processing Error", f"Error during picking dockets processing: {error_msg}")
 
-    def generate_ocr_variants(self, order_id):
-        """
-        Generate common OCR variants of an order ID to handle character recognition errors
-        """
-        variants = [order_id]  # Include original
-        
-        # Common OCR character substitutions
-        substitutions = {
-            '0': ['O', 'o', 'Q', 'D'],
-            'O': ['0', 'o', 'Q', 'D'],
-            '1': ['l', 'I', '|', 'i'],
-            'l': ['1', 'I', '|', 'i'],
-            'I': ['1', 'l', '|', 'i'],
-            '5': ['S', 's'],
-            'S': ['5', 's'],
-            '8': ['B', 'b'],
-            'B': ['8', 'b'],
-            '6': ['G', 'g'],
-            'G': ['6', 'g'],
-            '2': ['Z', 'z'],
-            'Z': ['2', 'z'],
-            '9': ['g', 'q'],
-            'g': ['9', 'q'],
-            'q': ['9', 'g'],
-            'C': ['c', 'G'],
-            'c': ['C', 'G'],
-            'P': ['p', 'R'],
-            'p': ['P', 'R'],
-            'R': ['P', 'p'],
-            'U': ['u', 'V'],
-            'u': ['U', 'V'],
-            'V': ['U', 'u'],
-            'N': ['n', 'M'],
-            'n': ['N', 'M'],
-            'M': ['N', 'n'],
-            'K': ['k', 'X'],
-            'k': ['K', 'X'],
-            'X': ['K', 'k'],
-            'F': ['f', 'E'],
-            'f': ['F', 'E'],
-            'E': ['F', 'f'],
-            'T': ['t', 'Y'],
-            't': ['T', 'Y'],
-            'Y': ['T', 't'],
-            'W': ['w', 'VV'],
-            'w': ['W', 'VV'],
-            'H': ['h', 'A'],
-            'h': ['H', 'A'],
-            'A': ['H', 'h'],
-            'J': ['j', 'I'],
-            'j': ['J', 'I'],
-            'L': ['l', 'I'],
-            'D': ['d', 'O'],
-            'd': ['D', 'O']
-        }
-        
-        # Generate variants by substituting each character
-        for i, char in enumerate(order_id):
-            if char in substitutions:
-                for sub in substitutions[char]:
-                    variant = order_id[:i] + sub + order_id[i+1:]
-                    if variant not in variants:
-                        variants.append(variant)
-        
-        # Generate variants with missing characters (common OCR issue)
-        for i in range(len(order_id)):
-            variant = order_id[:i] + order_id[i+1:]
-            if variant not in variants:
-                variants.append(variant)
-        
-        # Generate variants with extra characters (common OCR issue)
-        for i in range(len(order_id) + 1):
-            for char in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789':
-                variant = order_id[:i] + char + order_id[i:]
-                if variant not in variants:
-                    variants.append(variant)
-        
-        return variants
-
     def clean_extracted_text(self, text):
         """
         Clean extracted text to improve accuracy and readability
@@ -7155,6 +7409,117 @@ Date: {created_at}"""
         
         return cleaned
 
+    def extract_region_text(self, page, rect, region, ocr_service, page_words=None, use_text_layer=True,
+                            layer_text=None):
+        """
+        Extract the text of one OCR region from the text layer, queueing OCR when it is empty.
+        
+        With page_words the region is looked up in the page's word-level OCR
+        instead of being rendered and OCRed on its own. use_text_layer=False
+        (documents with a junk text layer) goes to OCR directly. layer_text
+        is the region's text-layer text when the caller already cut it from
+        the page's PageLayout.
+        
+        Returns:
+            (text, ocr_future) - ocr_future is None unless OCR was queued (see resolve_region_ocr)
+        """
+        if not use_text_layer:
+            extracted_text = ""
+        elif layer_text is not None:
+            extracted_text = layer_text
+        else:
+            extracted_text = self.extract_text_from_exact_coordinates(page, rect)
+        
+        # Debug: Print extraction results
+        if extracted_text.strip():
+            print(f"      ✅ Extracted: '{extracted_text.strip()}'")
+            # Special debug for Region 5
+            if region['name'] == 'Region 5':
+                print(f"      🟣 REGION 5 DEBUG: Raw text = '{extracted_text}'")
+                print(f"      🟣 REGION 5 DEBUG: Cleaned text = '{self.clean_extracted_text(extracted_text)}'")
+            return extracted_text, None
+        
+        print(f"      ❌ No text extracted from {region['name']}")
+        print(f"      🔄 Trying OCR fallback for {region['name']}...")
+        if page_words is not None:
+            return extracted_text, page_words.region_result(rect)
+        return extracted_text, self.ocr_region(page, rect, region, ocr_service)
+    
+    def ocr_region(self, page, rect, region, ocr_service):
+        """Queue OCR of one region with its strategy (ocr_strategy); returns a Future of OcrResult"""
+        strategy = strategy_for(region['name'])
+        try:
+            image = render_page_image(page, dpi=DEFAULT_OCR_DPI, clip=rect)
+            return ocr_service.submit_confident(image, strategy.psm_modes, strategy.min_confidence)
+        except Exception as ocr_error:
+            failed = Future()
+            failed.set_exception(ocr_error)
+            return failed
+    
+    def create_page_words(self, page, ocr_service, extraction_cache, file_hash, page_num):
+        """Word-level OCR for one page, from the extraction cache when an earlier run stored it"""
+        if file_hash:
+            cached_words = extraction_cache.get(file_hash, page_num, FULL_PAGE, PAGE_WORDS_MODE)
+            if cached_words is not None:
+                try:
+                    return PageWords(ocr_service, None, words=words_from_json(cached_words.text))
+                except (ValueError, TypeError) as e:
+                    print(f"      ⚠️ Ignoring unreadable cached OCR words: {e}")
+        
+        def render_page():
+            image = render_page_image(page, dpi=DEFAULT_OCR_DPI)
+            return image, render_scale(DEFAULT_OCR_DPI), page.rect.x0, page.rect.y0
+        
+        return PageWords(ocr_service, render_page)
+    
+    def resolve_region_ocr(self, region, extracted_text, ocr_future, ocr_stats, retry=None):
+        """
+        Wait for a region's queued OCR, calling retry() for a region OCR
+        Future when words were read but their mean confidence is below the
+        region's threshold. A region with no words is final.
+        
+        Returns:
+            (text, ocr_used, ocr_failed) - ocr_failed results should not be cached
+        """
+        strategy = strategy_for(region['name'])
+        try:
+            ocr_result = ocr_future.result()
+        except Exception as ocr_error:
+            print(f"      ❌ OCR error for {region['name']}: {str(ocr_error)}")
+            ocr_stats.record_ocr(region['name'], None)
+            return extracted_text, False, True
+        
+        retried = False
+        if (retry is not None and not ocr_result.error and ocr_result.text.strip()
+                and ocr_result.confidence is not None and ocr_result.confidence < strategy.min_confidence):
+            print(f"      🔁 Low confidence ({ocr_result.confidence:.0f}) for {region['name']}, OCRing the region...")
+            retried = True
+            try:
+                retry_result = retry().result()
+            except Exception as ocr_error:
+                print(f"      ❌ OCR retry error for {region['name']}: {str(ocr_error)}")
+                retry_result = None
+            if retry_result is not None:
+                attempts = ocr_result.attempts + retry_result.attempts
+                seconds = ocr_result.seconds + retry_result.seconds
+                if retry_result.text.strip() and (retry_result.confidence or 0) > (ocr_result.confidence or -1):
+                    ocr_result = retry_result
+                ocr_result = ocr_result._replace(attempts=attempts, seconds=seconds)
+        
+        ocr_stats.record_ocr(region['name'], ocr_result, strategy.min_confidence, retried)
+        
+        if ocr_result.text.strip():
+            confidence = f", confidence {ocr_result.confidence:.0f}" if ocr_result.confidence is not None else ""
+            print(f"      ✅ OCR extracted: '{ocr_result.text.strip()}' (PSM {ocr_result.psm_mode}{confidence})")
+            return ocr_result.text, True, False
+        
+        # Every PSM mode erroring (e.g. Tesseract missing) is a failure, not an empty region
+        if ocr_result.error:
+            print(f"      ❌ OCR error for {region['name']}: {ocr_result.error}")
+            return extracted_text, False, True
+        print(f"      ❌ OCR failed for {region['name']} - no text detected")
+        return extracted_text, False, False
+    
     def extract_text_from_exact_coordinates(self, page, rect):
         """
         Extract text from exact coordinates, filtering out any text outside the specified rectangle
@@ -7199,9 +7564,6 @@ Date: {created_at}"""
 
     def process_picking_dockets_internal(self):
         """Internal method for picking dockets processing with barcode generation and Excel upload"""
-        import re
-        from barcode import Code128
-        from barcode.writer import ImageWriter
         import tempfile
         
         try:
@@ -7338,16 +7700,8 @@ Date: {created_at}"""
                         self.processing_thread.progress_signal.emit(f"❌ Skipped barcode generation for '{order_id}': {error_msg}")
                         continue
                     
-                    # Create barcode using Code128
-                    code128 = Code128(order_id, writer=ImageWriter())
-                    
-                    # Generate barcode as bytes
-                    barcode_buffer = io.BytesIO()
-                    code128.write(barcode_buffer)
-                    barcode_buffer.seek(0)
-                    
-                    # Store the barcode image data
-                    order_barcodes[order_id] = barcode_buffer.getvalue()
+                    # Code128 module pattern, stamped as vector bars
+                    order_barcodes[order_id] = code128_pattern(order_id)
                     barcode_generation_status[order_id] = "Generated"
                     
                     self.processing_thread.progress_signal.emit(f"✅ Generated barcode for Order ID: {order_id}")
@@ -7362,6 +7716,25 @@ Date: {created_at}"""
             files_with_matches = set()
             files_without_matches = set()
             
+            # Build the order ID indexes once for the whole run
+            order_matcher = OrderMatcher(unique_order_numbers)
+            order_token_index = TokenOrderIndex(unique_order_numbers)
+            order_ocr_index = OcrConfusionIndex(unique_order_numbers)
+            order_fuzzy_index = EditDistanceIndex(unique_order_numbers)
+            
+            # Pages where more than one order ID was found
+            ambiguous_pages = []
+            
+            # Extract the text of every page up front, spread across all CPU cores
+            extracted_pdfs = extract_pdf_texts(
+                self.selected_picking_pdf_files,
+                ocr_zoom=3,
+                ocr_psm_modes=[6, 3, 7, 8, 13],  # Different page segmentation modes
+                tesseract_cmd=pytesseract.pytesseract.tesseract_cmd,
+                progress_callback=self.processing_thread.progress_signal.emit,
+                cache=default_extraction_cache()
+            )
+            
             # Process picking docket PDF files
             for pdf_file in self.selected_picking_pdf_files:
                 self.processing_thread.progress_signal.emit(f"Processing picking docket: {Path(pdf_file).name}")
@@ -7370,88 +7743,85 @@ Date: {created_at}"""
                 file_has_matches = False
                 
                 try:
-                    # Open PDF
-                    pdf_document = fitz.open(pdf_file)
+                    pdf_text = extracted_pdfs[pdf_file]
                     
                     # Process each page
-                    for page_num in range(len(pdf_document)):
-                        page = pdf_document[page_num]
-                        
-                        # Extract text from page
-                        page_text = page.get_text()
+                    for extracted_page in pdf_text.pages:
+                        page_num = extracted_page.page_num
+                        page_text = extracted_page.text
                         
-                        # Only use OCR if no text was found (much faster)
-                        if not page_text.strip():
-                            try:
-                                # Render page as image for OCR with higher resolution
-                                pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))  # 3x resolution for better OCR
-                                img_data = pix.tobytes("png")
-                                img = Image.open(io.BytesIO(img_data))
-                                
-                                # Try multiple OCR configurations for better accuracy
-                                ocr_text = ""
-                                psm_modes = [6, 3, 7, 8, 13]  # Different page segmentation modes
-                                
-                                for psm_mode in psm_modes:
-                                    try:
-                                        ocr_result = pytesseract.image_to_string(img, config=f'--psm {psm_mode}')
-                                        if ocr_result.strip():
-                                            ocr_text = ocr_result
-                                            break
-                                    except Exception:
-                                        continue
-                                
-                                # Use OCR text if found
-                                if ocr_text.strip():
-                                    page_text = ocr_text
-                                    self.processing_thread.progress_signal.emit(
-                                        f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
-                                    )
-                                
-                            except Exception as ocr_error:
-                                self.processing_thread.progress_signal.emit(
-                                    f"OCR failed for page {page_num + 1}: {str(ocr_error)}"
-                                )
+                        if extracted_page.ocr_used:
+                            self.processing_thread.progress_signal.emit(
+                                f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
+                            )
+                        elif extracted_page.ocr_error:
+                            self.processing_thread.progress_signal.emit(
+                                f"OCR failed for page {page_num + 1}: {extracted_page.ocr_error}"
+                            )
                         
                         # Search for exact order ID matches from Excel data (both files)
                         matched_order_id = None
                         
-                        # Search for each order ID from Excel data directly in the PDF text
-                        for excel_order_id in unique_order_numbers:
-                            # Case-insensitive search for the exact order ID
-                            if excel_order_id.upper() in page_text.upper():
-                                matched_order_id = excel_order_id  # Use the exact case from Excel
+                        # Search for all order IDs from Excel data in a single pass over the PDF text
+                        excel_order_id = order_matcher.first_match(page_text)
+                        if excel_order_id:
+                            matched_order_id = excel_order_id  # Use the exact case from Excel
+                            self.processing_thread.progress_signal.emit(
+                                f"✅ Found exact match: '{excel_order_id}' on page {page_num + 1}"
+                            )
+                        
+                        # Word boundary matches: used when no exact match was found, and to
+                        # report pages that carry more than one order ID
+                        word_matches = order_token_index.find_order_ids(page_text)
+                        if not matched_order_id and word_matches:
+                            matched_order_id = word_matches[0]
+                            self.processing_thread.progress_signal.emit(
+                                f"✅ Found word boundary match: '{matched_order_id}' on page {page_num + 1}"
+                            )
+                        if len(word_matches) > 1:
+                            ambiguous_pages.append({
+                                'source_file': pdf_file,
+                                'page_num': page_num,
+                                'order_ids': word_matches,
+                                'used_order_id': matched_order_id
+                            })
+                            self.processing_thread.progress_signal.emit(
+                                f"⚠ Page {page_num + 1} of {Path(pdf_file).name} contains {len(word_matches)} order IDs "
+                                f"({', '.join(word_matches)}) - using '{matched_order_id}'"
+                            )
+                        
+                        # If still no match, look the page tokens up in OCR-confusion canonical form.
+                        # Fuzzy hits are only taken when a single order matches; otherwise the page is reported
+                        fuzzy_candidates = []
+                        if not matched_order_id:
+                            ocr_match, fuzzy_candidates = order_ocr_index.unique_match(page_text)
+                            if ocr_match:
+                                matched_order_id = ocr_match.order_id
                                 self.processing_thread.progress_signal.emit(
-                                    f"✅ Found exact match: '{excel_order_id}' on page {page_num + 1}"
+                                    f"✅ Found OCR variant match: '{matched_order_id}' (as '{page_text.upper()[ocr_match.start:ocr_match.end]}') on page {page_num + 1}"
                                 )
-                                break
                         
-                        # If no exact match found, try word boundary search for more precision
-                        if not matched_order_id:
-                            for excel_order_id in unique_order_numbers:
-                                # Use word boundaries to avoid partial matches
-                                pattern = r'\b' + re.escape(excel_order_id) + r'\b'
-                                if re.search(pattern, page_text, re.IGNORECASE):
-                                    matched_order_id = excel_order_id
-                                    self.processing_thread.progress_signal.emit(
-                                        f"✅ Found word boundary match: '{excel_order_id}' on page {page_num + 1}"
-                                    )
-                                    break
+                        # Finally allow for dropped, extra or misread characters (up to 2 edits)
+                        if not matched_order_id and not fuzzy_candidates:
+                            fuzzy_match, fuzzy_candidates = order_fuzzy_index.unique_match(page_text)
+                            if fuzzy_match:
+                                matched_order_id = fuzzy_match.order_id
+                                self.processing_thread.progress_signal.emit(
+                                    f"✅ Found OCR variant match: '{matched_order_id}' (as '{page_text.upper()[fuzzy_match.start:fuzzy_match.end]}', "
+                                    f"{fuzzy_match.distance} edit(s), {fuzzy_match.confidence:.0%} confidence) on page {page_num + 1}"
+                                )
                         
-                        # If still no match, try fuzzy matching for OCR errors
-                        if not matched_order_id:
-                            for excel_order_id in unique_order_numbers:
-                                # Try common OCR character substitutions
-                                ocr_variants = self.generate_ocr_variants(excel_order_id)
-                                for variant in ocr_variants:
-                                    if variant.upper() in page_text.upper():
-                                        matched_order_id = excel_order_id
-                                        self.processing_thread.progress_signal.emit(
-                                            f"✅ Found OCR variant match: '{excel_order_id}' (as '{variant}') on page {page_num + 1}"
-                                        )
-                                        break
-                                if matched_order_id:
-                                    break
+                        if not matched_order_id and len(fuzzy_candidates) > 1:
+                            ambiguous_pages.append({
+                                'source_file': pdf_file,
+                                'page_num': page_num,
+                                'order_ids': fuzzy_candidates,
+                                'used_order_id': None
+                            })
+                            self.processing_thread.progress_signal.emit(
+                                f"⚠ Page {page_num + 1} of {Path(pdf_file).name} is an equally close OCR match for {len(fuzzy_candidates)} orders "
+                                f"({', '.join(fuzzy_candidates)}) - left unmatched"
+                            )
                         
                         # Debug: Show what we found on this page
                         if matched_order_id:
@@ -7491,8 +7861,10 @@ Date: {created_at}"""
                         
                         total_pages_processed += 1
                     
+                    if pdf_text.error:
+                        raise Exception(pdf_text.error)
+                    
                     processed_files += 1
-                    pdf_document.close()
                     
                     # Track whether this file had matches
                     if file_has_matches:
@@ -7505,8 +7877,6 @@ Date: {created_at}"""
                 except Exception as e:
                     self.processing_thread.progress_signal.emit(f"Error processing {pdf_file}: {str(e)}")
                     files_without_matches.add(Path(pdf_file).name)
-                    if 'pdf_document' in locals():
-                        pdf_document.close()
                     continue
             
             # Summary of what was found
@@ -7635,6 +8005,20 @@ Date: {created_at}"""
                         'order_id': order_id
                     })
             
+            # Size and save time of every output PDF
+            output_stats = {}
+            
+            # Vector barcode for every order, shared by all output PDFs;
+            # barcodes rendered by an earlier run come from the on-disk cache
+            barcode_cache = default_barcode_cache()
+            cache_hits = barcode_cache.hits if barcode_cache else 0
+            barcode_templates = BarcodeTemplates(order_barcodes, barcode_cache)
+            if barcode_cache:
+                reused_barcodes = barcode_cache.hits - cache_hits
+                self.processing_thread.progress_signal.emit(
+                    f"🏷️  Barcode cache: {reused_barcodes} reused, {len(order_barcodes) - reused_barcodes} rendered"
+                )
+            
             # Process each PDF file and add barcodes to matching pages
             for pdf_file, pages_to_modify in pdf_files_to_modify.items():
                 try:
@@ -7647,6 +8031,9 @@ Date: {created_at}"""
                     # Sort pages by page number to process in order
                     pages_to_modify.sort(key=lambda x: x['page_num'])
                     
+                    # Embeds each order's barcode image once for this file
+                    barcode_stamper = BarcodeStamper(barcode_templates)
+                    
                     # Add barcodes to each matching page
                     for page_info in pages_to_modify:
                         page_num = page_info['page_num']
@@ -7657,31 +8044,15 @@ Date: {created_at}"""
                             page = pdf_document[page_num]
                             
                             # Add barcode at the top center of the page
-                            if order_id in order_barcodes:
-                                try:
-                                    # Insert barcode image at the top center
-                                    barcode_data = order_barcodes[order_id]
-                                    
-                                    # Calculate position for top center
-                                    page_width = page.rect.width
-                                    barcode_width = 700  # Long barcode
-                                    barcode_height = 70  # Shorter barcode
-                                    
-                                    barcode_x = (page_width - barcode_width) / 2  # Center horizontally
-                                    barcode_y = 20  # Top margin
-                                    
-                                    # Insert barcode image
-                                    barcode_rect = fitz.Rect(barcode_x, barcode_y, barcode_x + barcode_width, barcode_y + barcode_height)
-                                    page.insert_image(barcode_rect, stream=barcode_data)
-                                    
+                            try:
+                                if barcode_stamper.stamp(page, order_id):
                                     self.processing_thread.progress_signal.emit(
                                         f"Added barcode for Order {order_id} to page {page_num + 1} in {pdf_filename}"
                                     )
-                                    
-                                except Exception as barcode_error:
-                                    self.processing_thread.progress_signal.emit(
-                                        f"Error adding barcode to page {page_num + 1} for Order {order_id}: {str(barcode_error)}"
-                                    )
+                            except Exception as barcode_error:
+                                self.processing_thread.progress_signal.emit(
+                                    f"Error adding barcode to page {page_num + 1} for Order {order_id}: {str(barcode_error)}"
+                                )
                             
                         except Exception as e:
                             self.processing_thread.progress_signal.emit(
@@ -7693,14 +8064,16 @@ Date: {created_at}"""
                     output_filename = f"Barcoded_{pdf_filename}"
                     output_path = output_dir / output_filename
                     
-                    pdf_document.save(str(output_path))
+                    save_stats = save_document(pdf_document, output_path)
                     pdf_document.close()
+                    output_stats[output_filename] = save_stats
                     
                     # Verify the file was created
                     if output_path.exists():
                         created_files.append(output_filename)
                         self.processing_thread.progress_signal.emit(
-                            f"✓ Successfully created {output_filename} with barcodes added"
+                            f"✓ Successfully created {output_filename} with barcodes added "
+                            f"({format_file_size(save_stats.file_size)}, saved in {save_stats.save_seconds:.2f}s)"
                         )
                     else:
                         failed_files.append(output_filename)
@@ -7717,6 +8090,8 @@ Date: {created_at}"""
                         pdf_document.close()
                     continue
             
+            barcode_templates.close()
+            
             # Final summary message
             self.processing_thread.progress_signal.emit("Processing complete!")
             if SUPABASE_AVAILABLE:
@@ -7725,6 +8100,11 @@ Date: {created_at}"""
             self.processing_thread.progress_signal.emit(f"Created {len(created_files)} barcoded PDF files in {output_dir}")
             self.processing_thread.progress_signal.emit(f"📅 Files saved in date folder: {current_date}")
             self.processing_thread.progress_signal.emit(f"🏷️  Generated barcodes for {len(order_barcodes)} unique order numbers from Excel files")
+            total_output_size = sum(stats.file_size for stats in output_stats.values())
+            total_save_seconds = sum(stats.save_seconds for stats in output_stats.values())
+            self.processing_thread.progress_signal.emit(
+                f"💾 Output size: {format_file_size(total_output_size)}, saved in {total_save_seconds:.2f}s"
+            )
             self.processing_thread.progress_signal.emit("📋 Added barcodes to pages with order IDs matching Excel file - other pages remain unchanged")
             
             # Generate summary report
@@ -7742,6 +8122,8 @@ Date: {created_at}"""
                 f.write(f"Total picking docket PDF files processed: {processed_files}\n")
                 f.write(f"Total pages scanned: {total_pages_processed}\n")
                 f.write(f"Barcoded PDF files created: {len(created_files)}\n")
+                f.write(f"Total output size: {format_file_size(total_output_size)}\n")
+                f.write(f"Total save time: {total_save_seconds:.2f}s\n")
                 f.write(f"Barcodes generated: {len(order_barcodes)}\n")
                 f.write(f"Barcode generation failures: {len(barcode_generation_errors)}\n")
                 f.write(f"Order numbers found in PDFs: {len(order_numbers_found_in_pdfs)}\n")
@@ -7785,7 +8167,9 @@ Date: {created_at}"""
                 if created_files:
                     f.write("✓ Successfully Created Order PDF Files:\n")
                     for filename in created_files:
-                        f.write(f"  - {filename}\n")
+                        save_stats = output_stats[filename]
+                        f.write(f"  - {filename} ({format_file_size(save_stats.file_size)}, "
+                                f"saved in {save_stats.save_seconds:.2f}s)\n")
                     f.write("\n")
                 
                 if failed_files:
@@ -7794,6 +8178,13 @@ Date: {created_at}"""
                         f.write(f"  - {filename}\n")
                     f.write("\n")
                 
+                if ambiguous_pages:
+                    f.write("⚠ Pages With Multiple Order IDs:\n")
+                    for page_info in ambiguous_pages:
+                        f.write(f"  - Page {page_info['page_num'] + 1} from {Path(page_info['source_file']).name}: "
+                                f"{', '.join(page_info['order_ids'])} (used {page_info['used_order_id'] or 'none - left unmatched'})\n")
+                    f.write("\n")
+                
                 f.write("Order Page Counts:\n")
                 for order_id, pages in order_pages.items():
                     f.write(f"  Order {order_id}: {len(pages)} pages\n")
@@ -7824,7 +8215,10 @@ Date: {created_at}"""
                 "order_numbers_found_in_pdfs": list(order_numbers_found_in_pdfs),
                 "order_numbers_not_found": list(set(unique_order_numbers) - order_numbers_found_in_pdfs),
                 "database_upload": SUPABASE_AVAILABLE,
-                "excel_file": Path(excel_file_path).name if excel_file_path else "None"
+                "excel_file": Path(excel_file_path).name if excel_file_path else "None",
+                "output_size_bytes": total_output_size,
+                "save_seconds": total_save_seconds,
+                "ambiguous_pages": ambiguous_pages
             }
             
         except Exception as e:
@@ -8375,32 +8769,32 @@ Date: {created_at}"""
                 border-radius: 6px;
             }
             
-            QTableWidget#orderTable {
+            QTableView#orderTable {
                 background-color: white;
                 border: none;
                 gridline-color: #e2e8f0;
                 font-size: 12px;
             }
             
-            QTableWidget#orderTable::item {
+            QTableView#orderTable::item {
                 padding: 8px 12px;
                 border-bottom: 1px solid #f1f3f4;
             }
             
-            QTableWidget#orderTable::item:first {
+            QTableView#orderTable::item:first {
                 border-left: none;
             }
             
-            QTableWidget#orderTable::item:last {
+            QTableView#orderTable::item:last {
                 border-right: none;
             }
             
-            QTableWidget#orderTable::item:selected {
+            QTableView#orderTable::item:selected {
                 background-color: #e3f2fd;
                 color: #1976d2;
             }
             
-            QTableWidget#orderTable QHeaderView::section {
+            QTableView#orderTable QHeaderView::section {
                 background-color: #f8f9fa;
                 border: none;
                 border-bottom: 2px solid #e2e8f0;
@@ -8411,11 +8805,11 @@ Date: {created_at}"""
                 font-size: 12px;
             }
             
-            QTableWidget#orderTable QHeaderView::section:first {
+            QTableView#orderTable QHeaderView::section:first {
                 border-top-left-radius: 6px;
             }
             
-            QTableWidget#orderTable QHeaderView::section:last {
+            QTableView#orderTable QHeaderView::section:last {
                 border-top-right-radius: 6px;
                 border-right: none;
             }
@@ -8614,10 +9008,21 @@ Date: {created_at}"""
         """)
 
 
+def report_startup():
+    """Print how long the window took to appear, then connect to Supabase in the background"""
+    print(f"⏱️ Window shown {(time.perf_counter() - STARTUP_STARTED) * 1000:.0f} ms after start")
+    if SUPABASE_AVAILABLE:
+        warm_up_supabase()
+        start_outbox_flusher()
+
+
 def main():
+    # Required for the text extraction worker processes in the frozen .exe
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = DispatchScanningApp()
     window.show()
+    QTimer.singleShot(0, report_startup)
     sys.exit(app.exec())
 
 
@@ -0,0 +1,338 @@
+"""
+Durable outbox for writes to Supabase.
+
+Print and scan events were inserted with a synchronous HTTP call from the
+UI thread: when the dispatch bay Wi-Fi dropped, every label print stalled
+on the timeout and the event was lost. Events are now committed to
+app_data/event_outbox.sqlite3 (a local transaction, well under a
+millisecond) and an OutboxFlusher thread sends them in batches once
+Supabase is reachable, backing off while it is not.
+
+Every queued row carries an idempotency key. Rows queued with
+on_conflict=IDEMPOTENCY_COLUMN get it as their UUID primary key (tables
+defined in supabase_schema.sql), rows queued with
+on_conflict=IDEMPOTENCY_KEY_COLUMN get it in a unique idempotency_key
+column (tables without a client-settable UUID id). Both are upserted
+ignoring duplicates, so a batch that is resent after a lost response (or
+by a second app sharing the outbox) is written once. Rows with a natural key
+(e.g. generated_barcodes.order_id) upsert on that, and update_on(column)
+queues an update of the row with that column's value.
+
+A batch the server rejects is retried one row at a time, so one bad row
+does not hold back its table. A row rejected MAX_ATTEMPTS times is parked
+with status 'dead' and no longer sent; failures while offline only delay
+rows, they never count towards that limit.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from app_paths import app_data_dir
+
+IDEMPOTENCY_COLUMN = "id"
+IDEMPOTENCY_KEY_COLUMN = "idempotency_key"
+
+# Conflict columns that take the row's idempotency key as their value
+KEY_COLUMNS = (IDEMPOTENCY_COLUMN, IDEMPOTENCY_KEY_COLUMN)
+
+# on_conflict values starting with this are updates keyed on the named column
+UPDATE_PREFIX = "update:"
+
+# Rows per request when flushing
+FLUSH_BATCH_ROWS = 200
+
+# Seconds between flushes while idle, and the longest wait after failures
+FLUSH_INTERVAL = 2.0
+MAX_BACKOFF = 60.0
+
+# Rejections after which a row is parked as dead
+MAX_ATTEMPTS = 8
+
+PENDING = "pending"
+DEAD = "dead"
+
+
+def update_on(column: str) -> str:
+    """on_conflict value queuing an update of the row whose column matches the record's"""
+    return UPDATE_PREFIX + column
+
+
+def is_update(on_conflict: str) -> bool:
+    return on_conflict.startswith(UPDATE_PREFIX)
+
+
+def update_key(on_conflict: str) -> str:
+    return on_conflict[len(UPDATE_PREFIX):]
+
+
+class OutboxRow(NamedTuple):
+    """One queued write"""
+    row_id: int
+    table: str
+    on_conflict: str
+    record: Dict
+    attempts: int
+
+
+class EventOutbox:
+    """SQLite write-ahead queue of rows for Supabase, safe to share between threads"""
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or app_data_dir() / "event_outbox.sqlite3")
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+        self._connection = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        with self._lock, self._connection:
+            # WAL: the apps share the outbox; NORMAL sync still survives an app crash
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    table_name TEXT NOT NULL,
+                    on_conflict TEXT NOT NULL,
+                    record TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    rejections INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending'
+                )
+            """)
+            # Outboxes created before dead letters existed
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(outbox)")}
+            if "rejections" not in columns:
+                self._connection.execute("ALTER TABLE outbox ADD COLUMN rejections INTEGER NOT NULL DEFAULT 0")
+            if "status" not in columns:
+                self._connection.execute("ALTER TABLE outbox ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'")
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Called (on the enqueuing thread) after rows are queued, e.g. to wake a flusher"""
+        self._listeners.append(listener)
+
+    def enqueue(self, table: str, record: Dict, on_conflict: str = IDEMPOTENCY_COLUMN,
+                idempotency_key: Optional[str] = None) -> str:
+        """Queue one row; returns its idempotency key"""
+        return self.enqueue_many(table, [record], on_conflict,
+                                 [idempotency_key] if idempotency_key else None)[0]
+
+    def enqueue_many(self, table: str, records: Iterable[Dict], on_conflict: str = IDEMPOTENCY_COLUMN,
+                     idempotency_keys: Optional[List[str]] = None) -> List[str]:
+        """
+        Queue rows for a table in one local transaction.
+
+        Args:
+            table: Supabase table
+            records: Rows to write
+            on_conflict: Upsert conflict column; one of KEY_COLUMNS adds the key to every row under that column
+            idempotency_keys: Keys for the rows (new UUIDs by default)
+
+        Returns:
+            The idempotency keys, in row order
+        """
+        records = list(records)
+        keys = list(idempotency_keys) if idempotency_keys else [str(uuid.uuid4()) for _ in records]
+        now = time.time()
+        rows = []
+        for key, record in zip(keys, records):
+            if on_conflict in KEY_COLUMNS:
+                record = dict(record, **{on_conflict: key})
+            rows.append((key, table, on_conflict, json.dumps(record, default=str), now))
+        with self._lock, self._connection:
+            # Queuing the same key again is a no-op
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, table_name, on_conflict, record, created_at) "
+                "VALUES (?, ?, ?, ?, ?)", rows
+            )
+        for listener in self._listeners:
+            listener()
+        return keys
+
+    def depth(self) -> int:
+        """Rows waiting to be sent"""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+
+    def dead_count(self) -> int:
+        """Rows parked after MAX_ATTEMPTS rejections"""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ?", (DEAD,)
+            ).fetchone()[0]
+
+    def due(self, limit: int = FLUSH_BATCH_ROWS, now: Optional[float] = None) -> List[OutboxRow]:
+        """Oldest rows whose backoff has passed"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, table_name, on_conflict, record, attempts FROM outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?", (PENDING, now, limit)
+            ).fetchall()
+        return [OutboxRow(row_id, table, on_conflict, json.loads(record), attempts)
+                for row_id, table, on_conflict, record, attempts in rows]
+
+    def mark_sent(self, row_ids: Iterable[int]):
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id in row_ids])
+
+    def mark_failed(self, row_ids: Iterable[int], error: str, now: Optional[float] = None,
+                    rejected: bool = False):
+        """
+        Count a failed attempt; the rows wait 2, 4, 8 ... seconds (up to MAX_BACKOFF) before the next.
+
+        Args:
+            row_ids: Outbox rows that failed
+            error: Error message kept with the rows
+            now: Time of the attempt
+            rejected: The server refused these rows (not a network failure); counts towards MAX_ATTEMPTS
+        """
+        now = time.time() if now is None else now
+        with self._lock, self._connection:
+            for row_id in row_ids:
+                self._connection.execute(
+                    "UPDATE outbox SET attempts = attempts + 1, last_error = ?, "
+                    "next_attempt_at = ? + MIN(?, ? * (1 << MIN(attempts, 10))), "
+                    "rejections = rejections + ?, "
+                    "status = CASE WHEN rejections + ? >= ? THEN ? ELSE status END WHERE id = ?",
+                    (error, now, MAX_BACKOFF, FLUSH_INTERVAL, int(rejected), int(rejected), MAX_ATTEMPTS,
+                     DEAD, row_id)
+                )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def is_network_error(error: Exception) -> bool:
+    """Default test for failures that say nothing about the rows themselves"""
+    return isinstance(error, (ConnectionError, TimeoutError, OSError))
+
+
+def describe_error(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+class OutboxFlusher:
+    """Background thread sending due outbox rows in batches per (table, on_conflict)"""
+
+    def __init__(self, outbox: EventOutbox, send_rows: Callable[[str, List[Dict], str], None],
+                 interval: float = FLUSH_INTERVAL, batch_rows: int = FLUSH_BATCH_ROWS,
+                 is_transient: Callable[[Exception], bool] = is_network_error):
+        """
+        Args:
+            outbox: The queue to drain
+            send_rows: Writes (table, records, on_conflict) to the server, raises on failure
+            interval: Seconds between flushes while idle
+            batch_rows: Rows fetched per flush round
+            is_transient: True for errors where the server was not reached (retried without limit)
+        """
+        self.outbox = outbox
+        self.send_rows = send_rows
+        self.is_transient = is_transient
+        self.interval = interval
+        self.batch_rows = batch_rows
+        self.sent = 0
+        self.failed_batches = 0
+        self.rejected_rows = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        outbox.add_listener(self._wake.set)
+
+    def flush_once(self) -> int:
+        """Send every due row once; returns the number of rows sent"""
+        sent = 0
+        while not self._stop.is_set():
+            rows = self.outbox.due(self.batch_rows)
+            if not rows:
+                break
+            batches: Dict[tuple, List[OutboxRow]] = {}
+            for row in rows:
+                batches.setdefault((row.table, row.on_conflict), []).append(row)
+            any_failed = False
+            for (table, on_conflict), batch in batches.items():
+                try:
+                    self.send_rows(table, [row.record for row in batch], on_conflict)
+                except Exception as e:
+                    self.failed_batches += 1
+                    any_failed = True
+                    if self.is_transient(e):
+                        # Offline: back off and try the whole batch again later
+                        self.outbox.mark_failed([row.row_id for row in batch], describe_error(e))
+                    else:
+                        # Rejected: find the rows the server refuses, send the rest
+                        sent += self._send_one_by_one(table, on_conflict, batch)
+                    continue
+                self.outbox.mark_sent([row.row_id for row in batch])
+                sent += len(batch)
+            if any_failed:
+                break
+        self.sent += sent
+        return sent
+
+    def _send_one_by_one(self, table: str, on_conflict: str, batch: List[OutboxRow]) -> int:
+        """Send a rejected batch row by row; returns the number of rows sent"""
+        sent = 0
+        for index, row in enumerate(batch):
+            try:
+                self.send_rows(table, [row.record], on_conflict)
+            except Exception as e:
+                if self.is_transient(e):
+                    # Connection lost part way: the rest waits for the next flush
+                    self.outbox.mark_failed([row.row_id for row in batch[index:]], describe_error(e))
+                    break
+                self.rejected_rows += 1
+                self.outbox.mark_failed([row.row_id], describe_error(e), rejected=True)
+                print(f"❌ Outbox: {table} rejected a row ({describe_error(e)})")
+                continue
+            self.outbox.mark_sent([row.row_id])
+            sent += 1
+        return sent
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sent = self.flush_once()
+                if sent:
+                    print(f"📤 Outbox: sent {sent} queued rows, {self.outbox.depth()} waiting")
+            except sqlite3.Error as e:
+                print(f"Error flushing event outbox: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self) -> "OutboxFlusher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="outbox-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_default_outbox: Optional[EventOutbox] = None
+_default_outbox_lock = threading.Lock()
+
+
+def default_event_outbox() -> Optional[EventOutbox]:
+    """The app-wide event outbox, or None if it cannot be opened"""
+    global _default_outbox
+    with _default_outbox_lock:
+        if _default_outbox is None:
+            try:
+                _default_outbox = EventOutbox()
+            except Exception as e:
+                print(f"Event outbox unavailable: {e}")
+                return None
+        return _default_outbox
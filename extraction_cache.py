@@ -0,0 +1,203 @@
+"""
+Persistent per-page text extraction cache.
+
+Operators often run the same picking-docket PDFs two or three times (after
+fixing the Excel file, an OptimoRoute refresh or new OCR regions), and every
+rerun paid the full get_text() and OCR cost again. Extracted text is stored
+in app_data/extraction_cache.sqlite3, keyed by (sha256 of the PDF, page
+number, clip rectangle, extraction mode), so a rerun only redoes matching
+and PDF assembly. The mode string must name every setting that changes the
+result (e.g. OCR zoom and PSM modes).
+
+The same database keeps each document's text-layer verdict (see
+text_layer), so repeat runs skip the sampling.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from app_paths import app_data_dir
+
+# Entries not stored or bulk-read for this long are removed when the cache is opened
+MAX_AGE_DAYS = 30
+
+# Full-page entries use an empty clip
+FULL_PAGE = ""
+
+_file_hashes: Dict[Tuple[str, int, int], str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_sha256(pdf_path) -> str:
+    """sha256 of a file, remembered per (path, size, mtime) for this process"""
+    stat = os.stat(pdf_path)
+    key = (str(pdf_path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        digest = _file_hashes.get(key)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(pdf_path, "rb") as pdf_file:
+            for block in iter(lambda: pdf_file.read(1024 * 1024), b""):
+                sha256.update(block)
+        digest = sha256.hexdigest()
+        with _file_hashes_lock:
+            _file_hashes[key] = digest
+    return digest
+
+
+def clip_key(rect) -> str:
+    """Cache key for a clip rectangle (anything with x0, y0, x1, y1, or a 4-sequence)"""
+    if rect is None:
+        return FULL_PAGE
+    x0, y0, x1, y1 = (rect.x0, rect.y0, rect.x1, rect.y1) if hasattr(rect, "x0") else rect
+    return f"{x0:.2f},{y0:.2f},{x1:.2f},{y1:.2f}"
+
+
+class CachedText(NamedTuple):
+    """One cached extraction"""
+    text: str
+    ocr_used: bool
+
+
+class ExtractionCache:
+    """SQLite-backed cache of extracted page text, safe to share between threads"""
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or app_data_dir() / "extraction_cache.sqlite3")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        with self._lock, self._connection:
+            # WAL lets the three apps read while another one writes
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS page_text (
+                    file_hash TEXT NOT NULL,
+                    page_num INTEGER NOT NULL,
+                    clip TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    ocr_used INTEGER NOT NULL,
+                    used_at REAL NOT NULL,
+                    PRIMARY KEY (file_hash, page_num, clip, mode)
+                )
+            """)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS document_verdict (
+                    file_hash TEXT NOT NULL,
+                    classifier TEXT NOT NULL,
+                    verdict TEXT NOT NULL,
+                    used_at REAL NOT NULL,
+                    PRIMARY KEY (file_hash, classifier)
+                )
+            """)
+            expired = time.time() - MAX_AGE_DAYS * 86400
+            self._connection.execute("DELETE FROM page_text WHERE used_at < ?", (expired,))
+            self._connection.execute("DELETE FROM document_verdict WHERE used_at < ?", (expired,))
+
+    def get(self, file_hash: str, page_num: int, clip: str, mode: str) -> Optional[CachedText]:
+        """Cached text for one page (and clip), or None on a miss"""
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT text, ocr_used FROM page_text WHERE file_hash = ? AND page_num = ? AND clip = ? AND mode = ?",
+                    (file_hash, page_num, clip, mode)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading extraction cache: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedText(row[0], bool(row[1]))
+
+    def get_pages(self, file_hash: str, mode: str, clip: str = FULL_PAGE) -> Dict[int, CachedText]:
+        """Every cached page of one document for a mode and clip, by page number"""
+        try:
+            with self._lock, self._connection:
+                rows = self._connection.execute(
+                    "SELECT page_num, text, ocr_used FROM page_text WHERE file_hash = ? AND clip = ? AND mode = ?",
+                    (file_hash, clip, mode)
+                ).fetchall()
+                if rows:
+                    self._connection.execute(
+                        "UPDATE page_text SET used_at = ? WHERE file_hash = ? AND clip = ? AND mode = ?",
+                        (time.time(), file_hash, clip, mode)
+                    )
+        except sqlite3.Error as e:
+            print(f"Error reading extraction cache: {e}")
+            rows = []
+        self.hits += len(rows)
+        return {page_num: CachedText(text, bool(ocr_used)) for page_num, text, ocr_used in rows}
+
+    def put(self, file_hash: str, page_num: int, clip: str, mode: str, text: str, ocr_used: bool = False):
+        """Store the text of one page (and clip)"""
+        self.put_many([(file_hash, page_num, clip, mode, text, ocr_used)])
+
+    def put_many(self, rows: Iterable[Tuple[str, int, str, str, str, bool]]):
+        """Store (file_hash, page_num, clip, mode, text, ocr_used) rows in one transaction"""
+        now = time.time()
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO page_text VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(file_hash, page_num, clip, mode, text, int(ocr_used), now)
+                     for file_hash, page_num, clip, mode, text, ocr_used in rows]
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing extraction cache: {e}")
+
+    def get_verdict(self, file_hash: str, classifier: str) -> Optional[str]:
+        """Stored document verdict of a classifier, or None"""
+        try:
+            with self._lock, self._connection:
+                row = self._connection.execute(
+                    "SELECT verdict FROM document_verdict WHERE file_hash = ? AND classifier = ?",
+                    (file_hash, classifier)
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE document_verdict SET used_at = ? WHERE file_hash = ? AND classifier = ?",
+                        (time.time(), file_hash, classifier)
+                    )
+        except sqlite3.Error as e:
+            print(f"Error reading extraction cache: {e}")
+            return None
+        return row[0] if row is not None else None
+
+    def put_verdict(self, file_hash: str, classifier: str, verdict: str):
+        """Store a document verdict"""
+        try:
+            with self._lock, self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO document_verdict VALUES (?, ?, ?, ?)",
+                                         (file_hash, classifier, verdict, time.time()))
+        except sqlite3.Error as e:
+            print(f"Error writing extraction cache: {e}")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_default_cache: Optional[ExtractionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_extraction_cache() -> Optional[ExtractionCache]:
+    """The app-wide extraction cache, or None if it cannot be opened"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ExtractionCache()
+            except Exception as e:
+                print(f"Extraction cache unavailable: {e}")
+                return None
+        return _default_cache
@@ -1,3 +1,6 @@
+import time
+# Startup is measured from here: the imports below are part of it
+STARTUP_STARTED = time.perf_counter()
 import sys
 import os
 import json
@@ -5,8 +8,7 @@ from pathlib import Path
 import pandas as pd
 import fitz  # PyMuPDF
 import pytesseract
-from PIL import Image
-import io
+import multiprocessing
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
@@ -28,7 +30,14 @@ from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSize, QDate
 from PySide6.QtGui import QFont, QPalette, QColor, QIcon, QPixmap
 
 # Import Supabase configuration
-from supabase_config import save_generated_barcodes
+from supabase_config import (save_generated_barcodes, warm_up_supabase, outbox_depth, outbox_dead_count,
+                             start_outbox_flusher)
+from order_matching import OrderMatcher, TokenOrderIndex
+from pdf_text_extraction import extract_pdf_texts
+from extraction_cache import default_extraction_cache
+from pdf_assembly import SourceDocumentCache, append_pages
+from barcode_stamping import BarcodeTemplates, BarcodeStamper, code128_pattern, save_document, format_file_size
+from barcode_cache import default_barcode_cache
 
 
 
@@ -810,6 +819,24 @@ class TransportSorterApp(QMainWindow):
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         self.status_bar.addPermanentWidget(self.progress_bar)
+        
+        # Upload rows waiting in the local outbox for Supabase
+        self.outbox_label = QLabel()
+        self.status_bar.addPermanentWidget(self.outbox_label)
+        self.outbox_timer = QTimer(self)
+        self.outbox_timer.timeout.connect(self.update_outbox_depth)
+        self.outbox_timer.start(2000)
+        self.update_outbox_depth()
+    
+    def update_outbox_depth(self):
+        """Show how many rows the outbox still has to send"""
+        depth = outbox_depth()
+        text = f"📤 Outbox: {depth} waiting" if depth else "📤 Outbox: all sent"
+        dead = outbox_dead_count()
+        if dead:
+            # Rejected by Supabase too often; kept in the outbox file for inspection
+            text += f" ⚠️ {dead} failed"
+        self.outbox_label.setText(text)
     
     def create_header(self):
         """Create clean header"""
@@ -2151,8 +2178,6 @@ class TransportSorterApp(QMainWindow):
     
     def process_all_pdfs_and_packing_internal(self):
         """Internal method for PDF processing"""
-        import re
-        
         try:
             output_dir = Path(self.output_dir_edit.text())
             output_dir.mkdir(exist_ok=True)
@@ -2173,39 +2198,42 @@ class TransportSorterApp(QMainWindow):
             if len(self.delivery_data_with_drivers) > 5:
                 self.processing_thread.progress_signal.emit(f"  ... and {len(self.delivery_data_with_drivers) - 5} more orders")
             
+            # Build the order ID indexes once for the whole run
+            order_matcher = OrderMatcher(self.delivery_data_with_drivers.keys())
+            order_token_index = TokenOrderIndex(self.delivery_data_with_drivers.keys())
+            
+            # Pages where more than one order ID was found
+            ambiguous_pages = []
+            
+            # Extract the text of every page up front, spread across all CPU cores
+            extracted_pdfs = extract_pdf_texts(
+                self.selected_pdf_files,
+                ocr_zoom=2,
+                tesseract_cmd=pytesseract.pytesseract.tesseract_cmd,
+                progress_callback=self.processing_thread.progress_signal.emit,
+                cache=default_extraction_cache()
+            )
+            
             # Process PDF files
             for pdf_file in self.selected_pdf_files:
                 self.processing_thread.progress_signal.emit(f"Processing: {Path(pdf_file).name}")
                 
                 try:
-                    # Open PDF
-                    pdf_document = fitz.open(pdf_file)
+                    pdf_text = extracted_pdfs[pdf_file]
                     
                     # Process each page
-                    for page_num in range(len(pdf_document)):
-                        page = pdf_document[page_num]
-                        
-                        # Extract text from page
-                        page_text = page.get_text()
+                    for extracted_page in pdf_text.pages:
+                        page_num = extracted_page.page_num
+                        page_text = extracted_page.text
                         
-                        # If no text found, try OCR
-                        if not page_text.strip():
-                            try:
-                                # Render page as image for OCR
-                                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x resolution
-                                img_data = pix.tobytes("png")
-                                img = Image.open(io.BytesIO(img_data))
-                                
-                                # Perform OCR
-                                page_text = pytesseract.image_to_string(img)
-                                self.processing_thread.progress_signal.emit(
-                                    f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
-                                )
-                            except Exception as ocr_error:
-                                self.processing_thread.progress_signal.emit(
-                                    f"OCR failed for page {page_num + 1}: {str(ocr_error)}"
-                                )
-                                page_text = ""
+                        if extracted_page.ocr_used:
+                            self.processing_thread.progress_signal.emit(
+                                f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
+                            )
+                        elif extracted_page.ocr_error:
+                            self.processing_thread.progress_signal.emit(
+                                f"OCR failed for page {page_num + 1}: {extracted_page.ocr_error}"
+                            )
                         
                         # New approach: Search for exact order ID matches from Excel data
                         # This is much simpler and more reliable than parsing "Our Order No" patterns
@@ -2213,29 +2241,36 @@ class TransportSorterApp(QMainWindow):
                         order_id = None
                         matched_order_id = None
                         
-                        # Search for each order ID from Excel directly in the PDF text
-                        for excel_order_id in self.delivery_data_with_drivers.keys():
-                            # Case-insensitive search for the exact order ID
-                            if excel_order_id.upper() in page_text.upper():
-                                order_id = excel_order_id  # Use the exact case from Excel
-                                matched_order_id = excel_order_id
-                                self.processing_thread.progress_signal.emit(
-                                    f"✅ Found exact match: '{excel_order_id}' on page {page_num + 1}"
-                                )
-                                break
+                        # Search for all order IDs from Excel in a single pass over the PDF text
+                        excel_order_id = order_matcher.first_match(page_text)
+                        if excel_order_id:
+                            # Case-insensitive match, exact case from Excel
+                            order_id = excel_order_id
+                            matched_order_id = excel_order_id
+                            self.processing_thread.progress_signal.emit(
+                                f"✅ Found exact match: '{excel_order_id}' on page {page_num + 1}"
+                            )
                         
-                        # If no exact match found, try word boundary search for more precision
-                        if not order_id:
-                            for excel_order_id in self.delivery_data_with_drivers.keys():
-                                # Use word boundaries to avoid partial matches
-                                pattern = r'\b' + re.escape(excel_order_id) + r'\b'
-                                if re.search(pattern, page_text, re.IGNORECASE):
-                                    order_id = excel_order_id
-                                    matched_order_id = excel_order_id
-                                    self.processing_thread.progress_signal.emit(
-                                        f"✅ Found word boundary match: '{excel_order_id}' on page {page_num + 1}"
-                                    )
-                                    break
+                        # Word boundary matches: used when no exact match was found, and to
+                        # report pages that carry more than one order ID
+                        word_matches = order_token_index.find_order_ids(page_text)
+                        if not order_id and word_matches:
+                            order_id = word_matches[0]
+                            matched_order_id = order_id
+                            self.processing_thread.progress_signal.emit(
+                                f"✅ Found word boundary match: '{order_id}' on page {page_num + 1}"
+                            )
+                        if len(word_matches) > 1:
+                            ambiguous_pages.append({
+                                'source_file': pdf_file,
+                                'page_num': page_num,
+                                'order_ids': word_matches,
+                                'used_order_id': order_id
+                            })
+                            self.processing_thread.progress_signal.emit(
+                                f"⚠ Page {page_num + 1} of {Path(pdf_file).name} contains {len(word_matches)} order IDs "
+                                f"({', '.join(word_matches)}) - using '{order_id}'"
+                            )
                         
                         # Debug: Show what we found on this page
                         if order_id:
@@ -2302,13 +2337,13 @@ class TransportSorterApp(QMainWindow):
                         
                         total_pages_processed += 1
                     
+                    if pdf_text.error:
+                        raise Exception(pdf_text.error)
+                    
                     processed_files += 1
-                    pdf_document.close()
                     
                 except Exception as e:
                     self.processing_thread.progress_signal.emit(f"Error processing {pdf_file}: {str(e)}")
-                    if 'pdf_document' in locals():
-                        pdf_document.close()
                     continue
             
             # Create separate PDF files for each driver
@@ -2335,77 +2370,75 @@ class TransportSorterApp(QMainWindow):
                     "error": "No matching orders found in PDF files"
                 }
             
-            for driver_number, pages in driver_pages.items():
-                if not pages:
-                    continue
-                
-                try:
-                    # Create new PDF for this driver
-                    output_filename = f"Driver_{driver_number}_Orders.pdf"
-                    output_path = output_dir / output_filename
-                    
-                    self.processing_thread.progress_signal.emit(
-                        f"Creating {output_filename} with {len(pages)} pages..."
-                    )
-                    
-                    new_pdf = fitz.open()
-                    pages_added = 0
-                    
-                    # Add all pages for this driver
-                    # Group pages by source file to minimize file opening
-                    pages_by_file = {}
-                    for page_info in pages:
-                        source_file = page_info['source_pdf_path']
-                        if source_file not in pages_by_file:
-                            pages_by_file[source_file] = []
-                        pages_by_file[source_file].append(page_info['page_num'])
+            # Keep source PDFs open for the whole assembly run
+            source_documents = SourceDocumentCache()
+            try:
+                for driver_number, pages in driver_pages.items():
+                    if not pages:
+                        continue
                     
-                    # Process each source file
-                    for source_file, page_numbers in pages_by_file.items():
-                        try:
-                            source_pdf = fitz.open(source_file)
-                            for page_num in page_numbers:
-                                # Insert page into new PDF
-                                new_pdf.insert_pdf(source_pdf, from_page=page_num, to_page=page_num)
-                                pages_added += 1
-                            source_pdf.close()
-                        except Exception as e:
-                            self.processing_thread.progress_signal.emit(
+                    try:
+                        # Create new PDF for this driver
+                        output_filename = f"Driver_{driver_number}_Orders.pdf"
+                        output_path = output_dir / output_filename
+                        
+                        self.processing_thread.progress_signal.emit(
+                            f"Creating {output_filename} with {len(pages)} pages..."
+                        )
+                        
+                        new_pdf = fitz.open()
+                        
+                        # Add all pages for this driver
+                        # Group pages by source file to keep page runs together
+                        pages_by_file = {}
+                        for page_info in pages:
+                            source_file = page_info['source_pdf_path']
+                            if source_file not in pages_by_file:
+                                pages_by_file[source_file] = []
+                            pages_by_file[source_file].append(page_info['page_num'])
+                        
+                        # Copy each run of consecutive pages with a single insert
+                        pages_added = append_pages(
+                            new_pdf,
+                            [(source_file, page_num) for source_file, page_numbers in pages_by_file.items() for page_num in page_numbers],
+                            source_documents,
+                            on_error=lambda source_file, e: self.processing_thread.progress_signal.emit(
                                 f"Error adding pages from {source_file}: {str(e)}"
                             )
-                            continue
-                    
-                    # Only save if we successfully added pages
-                    if pages_added > 0:
-                        new_pdf.save(str(output_path))
-                        new_pdf.close()
+                        )
                         
-                        # Verify the file was created
-                        if output_path.exists():
-                            created_files.append(output_filename)
-                            self.processing_thread.progress_signal.emit(
-                                f"✓ Successfully created {output_filename} with {pages_added} pages"
-                            )
+                        # Only save if we successfully added pages
+                        if pages_added > 0:
+                            new_pdf.save(str(output_path))
+                            new_pdf.close()
+                            
+                            # Verify the file was created
+                            if output_path.exists():
+                                created_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✓ Successfully created {output_filename} with {pages_added} pages"
+                                )
+                            else:
+                                failed_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✗ Failed to create {output_filename} - file not found after save"
+                                )
                         else:
+                            new_pdf.close()
                             failed_files.append(output_filename)
                             self.processing_thread.progress_signal.emit(
-                                f"✗ Failed to create {output_filename} - file not found after save"
+                                f"✗ No pages added to {output_filename}"
                             )
-                    else:
-                        new_pdf.close()
-                        failed_files.append(output_filename)
+                            
+                    except Exception as e:
+                        failed_files.append(f"Driver_{driver_number}_Orders.pdf")
                         self.processing_thread.progress_signal.emit(
-                            f"✗ No pages added to {output_filename}"
+                            f"✗ Error creating PDF for Driver {driver_number}: {str(e)}"
                         )
-                        
-                except Exception as e:
-                    failed_files.append(f"Driver_{driver_number}_Orders.pdf")
-                    self.processing_thread.progress_signal.emit(
-                        f"✗ Error creating PDF for Driver {driver_number}: {str(e)}"
-                    )
-                    continue
-            
-            # All PDFs are already closed during processing
+                        continue
+                
+            finally:
+                source_documents.close()
             
             # Final summary message
             self.processing_thread.progress_signal.emit("Processing complete!")
@@ -2445,6 +2478,13 @@ class TransportSorterApp(QMainWindow):
                     for page_info in pages:
                         f.write(f"    - Order {page_info['order_id']} (Page {page_info['page_num'] + 1} from {Path(page_info['source_file']).name})\n")
                     f.write("\n")
+                
+                if ambiguous_pages:
+                    f.write("⚠ Pages With Multiple Order IDs:\n")
+                    for page_info in ambiguous_pages:
+                        f.write(f"  - Page {page_info['page_num'] + 1} from {Path(page_info['source_file']).name}: "
+                                f"{', '.join(page_info['order_ids'])} (used {page_info['used_order_id']})\n")
+                    f.write("\n")
             
             # Collect driver details for results dialog
             driver_details = {}
@@ -2463,7 +2503,8 @@ class TransportSorterApp(QMainWindow):
                 "created_files": created_files,
                 "failed_files": failed_files,
                 "driver_details": driver_details,
-                "output_dir": str(output_dir)
+                "output_dir": str(output_dir),
+                "ambiguous_pages": ambiguous_pages
             }
             
         except Exception as e:
@@ -2526,9 +2567,6 @@ class TransportSorterApp(QMainWindow):
 
     def process_picking_dockets_internal(self):
         """Internal method for picking dockets processing with reversed page order"""
-        import re
-        from barcode import Code128
-        from barcode.writer import ImageWriter
         import tempfile
         
         try:
@@ -2555,67 +2593,76 @@ class TransportSorterApp(QMainWindow):
             if len(self.delivery_data_with_drivers) > 5:
                 self.processing_thread.progress_signal.emit(f"  ... and {len(self.delivery_data_with_drivers) - 5} more orders")
             
+            # Build the order ID indexes once for the whole run
+            order_matcher = OrderMatcher(self.delivery_data_with_drivers.keys())
+            order_token_index = TokenOrderIndex(self.delivery_data_with_drivers.keys())
+            
+            # Pages where more than one order ID was found
+            ambiguous_pages = []
+            
+            # Extract the text of every page up front, spread across all CPU cores
+            extracted_pdfs = extract_pdf_texts(
+                self.selected_picking_pdf_files,
+                ocr_zoom=2,
+                tesseract_cmd=pytesseract.pytesseract.tesseract_cmd,
+                progress_callback=self.processing_thread.progress_signal.emit,
+                cache=default_extraction_cache()
+            )
+            
             # Process picking docket PDF files
             for pdf_file in self.selected_picking_pdf_files:
                 self.processing_thread.progress_signal.emit(f"Processing picking docket: {Path(pdf_file).name}")
                 
                 try:
-                    # Open PDF
-                    pdf_document = fitz.open(pdf_file)
+                    pdf_text = extracted_pdfs[pdf_file]
                     
                     # Process each page
-                    for page_num in range(len(pdf_document)):
-                        page = pdf_document[page_num]
-                        
-                        # Extract text from page
-                        page_text = page.get_text()
+                    for extracted_page in pdf_text.pages:
+                        page_num = extracted_page.page_num
+                        page_text = extracted_page.text
                         
-                        # If no text found, try OCR
-                        if not page_text.strip():
-                            try:
-                                # Render page as image for OCR
-                                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x resolution
-                                img_data = pix.tobytes("png")
-                                img = Image.open(io.BytesIO(img_data))
-                                
-                                # Perform OCR
-                                page_text = pytesseract.image_to_string(img)
-                                self.processing_thread.progress_signal.emit(
-                                    f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
-                                )
-                            except Exception as ocr_error:
-                                self.processing_thread.progress_signal.emit(
-                                    f"OCR failed for page {page_num + 1}: {str(ocr_error)}"
-                                )
-                                page_text = ""
+                        if extracted_page.ocr_used:
+                            self.processing_thread.progress_signal.emit(
+                                f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
+                            )
+                        elif extracted_page.ocr_error:
+                            self.processing_thread.progress_signal.emit(
+                                f"OCR failed for page {page_num + 1}: {extracted_page.ocr_error}"
+                            )
                         
-                        # Search for exact order ID matches from Excel data
                         order_id = None
                         matched_order_id = None
                         
-                        # Search for each order ID from Excel directly in the PDF text
-                        for excel_order_id in self.delivery_data_with_drivers.keys():
-                            # Case-insensitive search for the exact order ID
-                            if excel_order_id.upper() in page_text.upper():
-                                order_id = excel_order_id  # Use the exact case from Excel
-                                matched_order_id = excel_order_id
-                                self.processing_thread.progress_signal.emit(
-                                    f"✅ Found exact match: '{excel_order_id}' on page {page_num + 1}"
-                                )
-                                break
+                        # Search for all order IDs from Excel in a single pass over the PDF text
+                        excel_order_id = order_matcher.first_match(page_text)
+                        if excel_order_id:
+                            # Case-insensitive match, exact case from Excel
+                            order_id = excel_order_id
+                            matched_order_id = excel_order_id
+                            self.processing_thread.progress_signal.emit(
+                                f"✅ Found exact match: '{excel_order_id}' on page {page_num + 1}"
+                            )
                         
-                        # If no exact match found, try word boundary search for more precision
-                        if not order_id:
-                            for excel_order_id in self.delivery_data_with_drivers.keys():
-                                # Use word boundaries to avoid partial matches
-                                pattern = r'\b' + re.escape(excel_order_id) + r'\b'
-                                if re.search(pattern, page_text, re.IGNORECASE):
-                                    order_id = excel_order_id
-                                    matched_order_id = excel_order_id
-                                    self.processing_thread.progress_signal.emit(
-                                        f"✅ Found word boundary match: '{excel_order_id}' on page {page_num + 1}"
-                                    )
-                                    break
+                        # Word boundary matches: used when no exact match was found, and to
+                        # report pages that carry more than one order ID
+                        word_matches = order_token_index.find_order_ids(page_text)
+                        if not order_id and word_matches:
+                            order_id = word_matches[0]
+                            matched_order_id = order_id
+                            self.processing_thread.progress_signal.emit(
+                                f"✅ Found word boundary match: '{order_id}' on page {page_num + 1}"
+                            )
+                        if len(word_matches) > 1:
+                            ambiguous_pages.append({
+                                'source_file': pdf_file,
+                                'page_num': page_num,
+                                'order_ids': word_matches,
+                                'used_order_id': order_id
+                            })
+                            self.processing_thread.progress_signal.emit(
+                                f"⚠ Page {page_num + 1} of {Path(pdf_file).name} contains {len(word_matches)} order IDs "
+                                f"({', '.join(word_matches)}) - using '{order_id}'"
+                            )
                         
                         # Debug: Show what we found on this page
                         if order_id:
@@ -2665,13 +2712,13 @@ class TransportSorterApp(QMainWindow):
                         
                         total_pages_processed += 1
                     
+                    if pdf_text.error:
+                        raise Exception(pdf_text.error)
+                    
                     processed_files += 1
-                    pdf_document.close()
                     
                 except Exception as e:
                     self.processing_thread.progress_signal.emit(f"Error processing {pdf_file}: {str(e)}")
-                    if 'pdf_document' in locals():
-                        pdf_document.close()
                     continue
             
             # Generate barcodes for all unique order IDs found
@@ -2684,16 +2731,8 @@ class TransportSorterApp(QMainWindow):
             # Create barcodes for each unique order ID
             for order_id in unique_order_ids:
                 try:
-                    # Create barcode using Code128
-                    code128 = Code128(order_id, writer=ImageWriter())
-                    
-                    # Generate barcode as bytes
-                    barcode_buffer = io.BytesIO()
-                    code128.write(barcode_buffer)
-                    barcode_buffer.seek(0)
-                    
-                    # Store the barcode image data
-                    order_barcodes[order_id] = barcode_buffer.getvalue()
+                    # Code128 module pattern, stamped as vector bars
+                    order_barcodes[order_id] = code128_pattern(order_id)
                     
                     self.processing_thread.progress_signal.emit(f"Generated barcode for Order ID: {order_id}")
                     
@@ -2760,132 +2799,146 @@ class TransportSorterApp(QMainWindow):
                     "error": "No matching orders found in picking docket PDF files"
                 }
             
-            for driver_number, pages in driver_pages.items():
-                if not pages:
-                    continue
-                
-                try:
-                    # Create new PDF for this driver
-                    output_filename = f"Driver_{driver_number}_Picking_Dockets.pdf"
-                    output_path = picking_output_dir / output_filename
-                    
-                    # Sort pages by stop number, then REVERSE the order for picking
-                    # This ensures that the first stops in delivery sequence are at the top of the pallet
-                    pages_with_stop_numbers = []
-                    for page_info in pages:
-                        stop_number = page_info.get('stop_number', '0')
-                        try:
-                            # Try to convert to int for proper numeric sorting
-                            sort_key = int(stop_number) if stop_number.isdigit() else 999999
-                        except:
-                            sort_key = 999999
-                        pages_with_stop_numbers.append((sort_key, page_info))
-                    
-                    # Sort by stop number (ascending), then reverse for picking
-                    pages_with_stop_numbers.sort(key=lambda x: x[0])
-                    sorted_pages = [page_info for sort_key, page_info in pages_with_stop_numbers]
-                    
-                    # REVERSE the order for picking (first delivery stops at top of pallet)
-                    reversed_pages = sorted_pages[::-1]
-                    
-                    self.processing_thread.progress_signal.emit(
-                        f"Creating {output_filename} with {len(reversed_pages)} pages in REVERSED order..."
-                    )
-                    self.processing_thread.progress_signal.emit(
-                        f"  First page will be: Order {reversed_pages[0]['order_id']} (Stop {reversed_pages[0]['stop_number']})"
-                    )
-                    self.processing_thread.progress_signal.emit(
-                        f"  Last page will be: Order {reversed_pages[-1]['order_id']} (Stop {reversed_pages[-1]['stop_number']})"
-                    )
-                    
-                    new_pdf = fitz.open()
-                    pages_added = 0
+            # Size and save time of every output PDF
+            output_stats = {}
+            
+            # Vector barcode for every order, shared by all driver PDFs;
+            # barcodes rendered by an earlier run come from the on-disk cache
+            barcode_cache = default_barcode_cache()
+            cache_hits = barcode_cache.hits if barcode_cache else 0
+            barcode_templates = BarcodeTemplates(order_barcodes, barcode_cache)
+            if barcode_cache:
+                reused_barcodes = barcode_cache.hits - cache_hits
+                self.processing_thread.progress_signal.emit(
+                    f"🏷️  Barcode cache: {reused_barcodes} reused, {len(order_barcodes) - reused_barcodes} rendered"
+                )
+            
+            # Keep source PDFs open for the whole assembly run
+            source_documents = SourceDocumentCache()
+            try:
+                for driver_number, pages in driver_pages.items():
+                    if not pages:
+                        continue
                     
-                    # Add all pages for this driver in reversed order with barcodes
-                    for page_info in reversed_pages:
-                        try:
-                            # Open source PDF and get the page
-                            source_pdf = fitz.open(page_info['source_pdf_path'])
-                            source_page = source_pdf[page_info['page_num']]
-                            
-                            # Create a new page in the output PDF
-                            new_page = new_pdf.new_page(width=source_page.rect.width, height=source_page.rect.height)
-                            
-                            # Copy the original page content
-                            new_page.show_pdf_page(new_page.rect, source_pdf, page_info['page_num'])
-                            
-                            # Add barcode at the top center of the page
-                            order_id = page_info['order_id']
-                            if order_id in order_barcodes:
+                    try:
+                        # Create new PDF for this driver
+                        output_filename = f"Driver_{driver_number}_Picking_Dockets.pdf"
+                        output_path = picking_output_dir / output_filename
+                        
+                        # Sort pages by stop number, then REVERSE the order for picking
+                        # This ensures that the first stops in delivery sequence are at the top of the pallet
+                        pages_with_stop_numbers = []
+                        for page_info in pages:
+                            stop_number = page_info.get('stop_number', '0')
+                            try:
+                                # Try to convert to int for proper numeric sorting
+                                sort_key = int(stop_number) if stop_number.isdigit() else 999999
+                            except:
+                                sort_key = 999999
+                            pages_with_stop_numbers.append((sort_key, page_info))
+                        
+                        # Sort by stop number (ascending), then reverse for picking
+                        pages_with_stop_numbers.sort(key=lambda x: x[0])
+                        sorted_pages = [page_info for sort_key, page_info in pages_with_stop_numbers]
+                        
+                        # REVERSE the order for picking (first delivery stops at top of pallet)
+                        reversed_pages = sorted_pages[::-1]
+                        
+                        self.processing_thread.progress_signal.emit(
+                            f"Creating {output_filename} with {len(reversed_pages)} pages in REVERSED order..."
+                        )
+                        self.processing_thread.progress_signal.emit(
+                            f"  First page will be: Order {reversed_pages[0]['order_id']} (Stop {reversed_pages[0]['stop_number']})"
+                        )
+                        self.processing_thread.progress_signal.emit(
+                            f"  Last page will be: Order {reversed_pages[-1]['order_id']} (Stop {reversed_pages[-1]['stop_number']})"
+                        )
+                        
+                        new_pdf = fitz.open()
+                        pages_added = 0
+                        
+                        # Embeds each order's barcode image once for this file
+                        barcode_stamper = BarcodeStamper(barcode_templates)
+                        
+                        # Add all pages for this driver in reversed order with barcodes
+                        for page_info in reversed_pages:
+                            try:
+                                # Get the page from the (cached) source PDF
+                                source_pdf = source_documents.get(page_info['source_pdf_path'])
+                                source_page = source_pdf[page_info['page_num']]
+                                
+                                # Create a new page in the output PDF
+                                new_page = new_pdf.new_page(width=source_page.rect.width, height=source_page.rect.height)
+                                
+                                # Copy the original page content
+                                new_page.show_pdf_page(new_page.rect, source_pdf, page_info['page_num'])
+                                
+                                # Add barcode at the top center of the page
+                                order_id = page_info['order_id']
                                 try:
-                                    # Insert barcode image at the top center
-                                    barcode_data = order_barcodes[order_id]
-                                    
-                                    # Calculate position for top center
-                                    page_width = new_page.rect.width
-                                    barcode_width = 700  # Even longer barcode
-                                    barcode_height = 70  # Shorter barcode
-                                    
-                                    barcode_x = (page_width - barcode_width) / 2  # Center horizontally
-                                    barcode_y = 20  # Top margin
-                                    
-                                    # Insert barcode image
-                                    barcode_rect = fitz.Rect(barcode_x, barcode_y, barcode_x + barcode_width, barcode_y + barcode_height)
-                                    new_page.insert_image(barcode_rect, stream=barcode_data)
-                                    
-                                    self.processing_thread.progress_signal.emit(
-                                        f"Added barcode for Order {order_id} to page {pages_added + 1}"
-                                    )
-                                    
+                                    if barcode_stamper.stamp(new_page, order_id):
+                                        self.processing_thread.progress_signal.emit(
+                                            f"Added barcode for Order {order_id} to page {pages_added + 1}"
+                                        )
                                 except Exception as barcode_error:
                                     self.processing_thread.progress_signal.emit(
                                         f"Error adding barcode to page for Order {order_id}: {str(barcode_error)}"
                                     )
-                            
-                            source_pdf.close()
-                            pages_added += 1
-                            
-                        except Exception as e:
-                            self.processing_thread.progress_signal.emit(
-                                f"Error processing page for Order {page_info['order_id']}: {str(e)}"
-                            )
-                            continue
-                    
-                    # Only save if we successfully added pages
-                    if pages_added > 0:
-                        new_pdf.save(str(output_path))
-                        new_pdf.close()
+                                
+                                pages_added += 1
+                                
+                            except Exception as e:
+                                self.processing_thread.progress_signal.emit(
+                                    f"Error processing page for Order {page_info['order_id']}: {str(e)}"
+                                )
+                                continue
                         
-                        # Verify the file was created
-                        if output_path.exists():
-                            created_files.append(output_filename)
-                            self.processing_thread.progress_signal.emit(
-                                f"✓ Successfully created {output_filename} with {pages_added} pages in REVERSED order with barcodes"
-                            )
+                        # Only save if we successfully added pages
+                        if pages_added > 0:
+                            save_stats = save_document(new_pdf, output_path)
+                            new_pdf.close()
+                            output_stats[output_filename] = save_stats
+                            
+                            # Verify the file was created
+                            if output_path.exists():
+                                created_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✓ Successfully created {output_filename} with {pages_added} pages in REVERSED order with barcodes "
+                                    f"({format_file_size(save_stats.file_size)}, saved in {save_stats.save_seconds:.2f}s)"
+                                )
+                            else:
+                                failed_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✗ Failed to create {output_filename} - file not found after save"
+                                )
                         else:
+                            new_pdf.close()
                             failed_files.append(output_filename)
                             self.processing_thread.progress_signal.emit(
-                                f"✗ Failed to create {output_filename} - file not found after save"
+                                f"✗ No pages added to {output_filename}"
                             )
-                    else:
-                        new_pdf.close()
-                        failed_files.append(output_filename)
+                            
+                    except Exception as e:
+                        failed_files.append(f"Driver_{driver_number}_Picking_Dockets.pdf")
                         self.processing_thread.progress_signal.emit(
-                            f"✗ No pages added to {output_filename}"
+                            f"✗ Error creating picking docket PDF for Driver {driver_number}: {str(e)}"
                         )
-                        
-                except Exception as e:
-                    failed_files.append(f"Driver_{driver_number}_Picking_Dockets.pdf")
-                    self.processing_thread.progress_signal.emit(
-                        f"✗ Error creating picking docket PDF for Driver {driver_number}: {str(e)}"
-                    )
-                    continue
+                        continue
+                
+            finally:
+                source_documents.close()
+                barcode_templates.close()
             
             # Final summary message
             self.processing_thread.progress_signal.emit("Picking dockets processing complete!")
             self.processing_thread.progress_signal.emit(f"Created {len(created_files)} picking docket PDF files in {picking_output_dir}")
             self.processing_thread.progress_signal.emit("📝 Pages are in REVERSED order - first delivery stops are at the top!")
             self.processing_thread.progress_signal.emit(f"🏷️  Generated barcodes for {len(unique_order_ids)} unique order IDs")
+            total_output_size = sum(stats.file_size for stats in output_stats.values())
+            total_save_seconds = sum(stats.save_seconds for stats in output_stats.values())
+            self.processing_thread.progress_signal.emit(
+                f"💾 Output size: {format_file_size(total_output_size)}, saved in {total_save_seconds:.2f}s"
+            )
             self.processing_thread.progress_signal.emit("📋 Only pages with order IDs matching Excel data were included - others were filtered out")
             
             # Generate summary report
@@ -2897,6 +2950,8 @@ class TransportSorterApp(QMainWindow):
                 f.write(f"Total pages scanned: {total_pages_processed}\n")
                 f.write(f"Driver picking docket PDF files created: {len(created_files)}\n")
                 f.write(f"Unique order IDs with barcodes: {len(unique_order_ids)}\n")
+                f.write(f"Total output size: {format_file_size(total_output_size)}\n")
+                f.write(f"Total save time: {total_save_seconds:.2f}s\n")
                 if failed_files:
                     f.write(f"Failed PDF files: {len(failed_files)}\n")
                 f.write("\n")
@@ -2907,7 +2962,9 @@ class TransportSorterApp(QMainWindow):
                 if created_files:
                     f.write("✓ Successfully Created Picking Docket PDF Files:\n")
                     for filename in created_files:
-                        f.write(f"  - {filename}\n")
+                        save_stats = output_stats[filename]
+                        f.write(f"  - {filename} ({format_file_size(save_stats.file_size)}, "
+                                f"saved in {save_stats.save_seconds:.2f}s)\n")
                     f.write("\n")
                 
                 if failed_files:
@@ -2941,6 +2998,13 @@ class TransportSorterApp(QMainWindow):
                         f.write(f"    - Order {page_info['order_id']} (Stop {page_info['stop_number']}) - Page {page_info['page_num'] + 1} from {Path(page_info['source_file']).name}\n")
                     f.write("\n")
                 
+                if ambiguous_pages:
+                    f.write("⚠ Pages With Multiple Order IDs:\n")
+                    for page_info in ambiguous_pages:
+                        f.write(f"  - Page {page_info['page_num'] + 1} from {Path(page_info['source_file']).name}: "
+                                f"{', '.join(page_info['order_ids'])} (used {page_info['used_order_id']})\n")
+                    f.write("\n")
+                
                 f.write("Barcodes Generated:\n")
                 for order_id in sorted(unique_order_ids):
                     f.write(f"  - {order_id}\n")
@@ -2963,7 +3027,10 @@ class TransportSorterApp(QMainWindow):
                 "failed_files": failed_files,
                 "driver_details": driver_details,
                 "output_dir": str(picking_output_dir),
-                "barcodes_generated": len(unique_order_ids)
+                "barcodes_generated": len(unique_order_ids),
+                "output_size_bytes": total_output_size,
+                "save_seconds": total_save_seconds,
+                "ambiguous_pages": ambiguous_pages
             }
             
         except Exception as e:
@@ -2971,8 +3038,18 @@ class TransportSorterApp(QMainWindow):
             raise e
 
 
+def report_startup():
+    """Print how long the window took to appear, then connect to Supabase in the background"""
+    print(f"⏱️ Window shown {(time.perf_counter() - STARTUP_STARTED) * 1000:.0f} ms after start")
+    warm_up_supabase()
+    start_outbox_flusher()
+
+
 def main():
     """Main application entry point"""
+    # Required for the text extraction worker processes in the frozen .exe
+    multiprocessing.freeze_support()
+    
     app = QApplication(sys.argv)
     
     # Set application properties
@@ -2986,6 +3063,7 @@ def main():
     # Create and show the main window
     window = TransportSorterApp()
     window.show()
+    QTimer.singleShot(0, report_startup)
     
     sys.exit(app.exec())
 
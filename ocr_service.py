@@ -0,0 +1,451 @@
+"""
+Tesseract OCR service backed by long-lived worker processes.
+
+`pytesseract.image_to_string` starts a new tesseract process and reloads
+the traineddata on every call, and the dispatch PSM cascade can make five
+of those calls per region. OcrService keeps a pool of worker processes,
+each holding one TesseractEngine for its whole life, and hands out futures
+so callers can queue every region of a page before waiting for any.
+
+TesseractEngine uses tesserocr (the Tesseract C API, traineddata loaded
+once per process; bundled by the specs, installed from requirements.txt
+except on Windows, where it needs a separately installed wheel).
+Without it the engine falls back to pytesseract - still a subprocess per
+call, only run in parallel - and says so once per process. The PDF text
+extraction workers use the same per-process engine.
+
+submit_words runs one word-level (TSV) pass over a whole page; regions are
+then answered from the word boxes with words_in_rect instead of an OCR
+call per region.
+
+recognize_confident scores every PSM attempt by its mean word confidence
+and only retries with the next mode while the score is below a threshold,
+instead of accepting the first non-empty string.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Default worker processes; Tesseract is CPU bound and each worker runs it single-threaded
+DEFAULT_OCR_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# Full automatic page segmentation for word-level page OCR
+PAGE_PSM_MODE = 3
+
+
+class OcrResult(NamedTuple):
+    """Outcome of one OCR request"""
+    text: str
+    psm_mode: Optional[int] = None      # PSM mode that produced the text
+    error: Optional[str] = None         # Set when every attempt raised
+    confidence: Optional[float] = None  # Mean word confidence (0-100) when measured
+    attempts: int = 0                   # Tesseract runs it took
+    seconds: float = 0.0                # Time spent in Tesseract
+
+
+class OcrWord(NamedTuple):
+    """One recognised word; coordinates in whatever space the caller mapped them to"""
+    text: str
+    confidence: float
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    line: int       # Sequential line number on the page, in reading order
+
+
+class TesseractEngine:
+    """Tesseract bound to one process: one tesserocr API reused for every call"""
+
+    def __init__(self, tesseract_cmd: Optional[str] = None):
+        import pytesseract
+        self._pytesseract = pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+        self._api = None
+        try:
+            import tesserocr
+            kwargs = {}
+            if tesseract_cmd:
+                # Windows installs keep tessdata next to tesseract.exe
+                tessdata = os.path.join(os.path.dirname(tesseract_cmd), "tessdata")
+                if os.path.isdir(tessdata):
+                    kwargs["path"] = tessdata
+            self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        except Exception as e:
+            self._api = None
+            print(f"⚠️ tesserocr unavailable ({type(e).__name__}: {e}) - OCR falls back to a tesseract process per call")
+
+    @property
+    def uses_api(self) -> bool:
+        return self._api is not None
+
+    def image_to_string(self, image, psm_mode: Optional[int] = None) -> str:
+        """OCR a PIL image; psm_mode None uses Tesseract's default segmentation"""
+        if self._api is not None:
+            self._api.SetPageSegMode(3 if psm_mode is None else psm_mode)
+            self._api.SetImage(image)
+            return self._api.GetUTF8Text()
+        if psm_mode is None:
+            return self._pytesseract.image_to_string(image)
+        return self._pytesseract.image_to_string(image, config=f'--psm {psm_mode}')
+
+    def image_to_words(self, image, psm_mode: int = 3) -> List[OcrWord]:
+        """Word boxes (image pixels) for a whole image, in reading order"""
+        words = []
+        if self._api is not None:
+            import tesserocr
+            self._api.SetPageSegMode(psm_mode)
+            self._api.SetImage(image)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            line = -1
+            if iterator is not None:
+                while True:
+                    if iterator.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                        line += 1
+                    text = iterator.GetUTF8Text(tesserocr.RIL.WORD)
+                    box = iterator.BoundingBox(tesserocr.RIL.WORD)
+                    if text and text.strip() and box:
+                        words.append(OcrWord(text, iterator.Confidence(tesserocr.RIL.WORD), *box, max(line, 0)))
+                    if not iterator.Next(tesserocr.RIL.WORD):
+                        break
+            return words
+
+        data = self._pytesseract.image_to_data(image, config=f'--psm {psm_mode}',
+                                               output_type=self._pytesseract.Output.DICT)
+        line_numbers = {}
+        for i, text in enumerate(data["text"]):
+            if not text or not text.strip():
+                continue
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            line = line_numbers.setdefault(line_key, len(line_numbers))
+            left, top = data["left"][i], data["top"][i]
+            words.append(OcrWord(text, float(data["conf"][i]), left, top,
+                                 left + data["width"][i], top + data["height"][i], line))
+        return words
+
+    def recognize(self, image, psm_modes: Sequence[Optional[int]] = (None,)) -> OcrResult:
+        """Try each PSM mode in order and return the first non-empty text"""
+        start = time.perf_counter()
+        last_error = None
+        failed_calls = 0
+        for attempt, psm_mode in enumerate(psm_modes, 1):
+            try:
+                text = self.image_to_string(image, psm_mode)
+            except Exception as e:
+                failed_calls += 1
+                last_error = str(e)
+                continue
+            if text.strip():
+                return OcrResult(text, psm_mode, attempts=attempt, seconds=time.perf_counter() - start)
+        seconds = time.perf_counter() - start
+        if psm_modes and failed_calls == len(psm_modes):
+            return OcrResult("", None, last_error, attempts=len(psm_modes), seconds=seconds)
+        return OcrResult("", attempts=len(psm_modes), seconds=seconds)
+
+    def recognize_confident(self, image, psm_modes: Sequence[int], min_confidence: float) -> OcrResult:
+        """
+        Try each PSM mode in order until one reads text with a mean word
+        confidence of at least min_confidence. A mode reading no words ends
+        the cascade: a blank image stays blank in every mode.
+
+        Returns:
+            The first confident result, else the most confident non-empty one
+        """
+        start = time.perf_counter()
+        best = None
+        last_error = None
+        failed_calls = 0
+        for attempt, psm_mode in enumerate(psm_modes, 1):
+            try:
+                words = self.image_to_words(image, psm_mode)
+            except Exception as e:
+                failed_calls += 1
+                last_error = str(e)
+                continue
+            confidence = mean_confidence(words)
+            if confidence is None:
+                if best is None:
+                    return OcrResult("", psm_mode, attempts=attempt, seconds=time.perf_counter() - start)
+                break
+            result = OcrResult(words_text(words), psm_mode, confidence=confidence, attempts=attempt)
+            if confidence >= min_confidence:
+                best = result
+                break
+            if best is None or confidence > best.confidence:
+                best = result
+        seconds = time.perf_counter() - start
+        if best is not None:
+            return best._replace(attempts=attempt, seconds=seconds)
+        if psm_modes and failed_calls == len(psm_modes):
+            return OcrResult("", None, last_error, attempts=len(psm_modes), seconds=seconds)
+        return OcrResult("", attempts=len(psm_modes), seconds=seconds)
+
+
+_engine: Optional[TesseractEngine] = None
+
+
+def get_engine(tesseract_cmd: Optional[str] = None) -> TesseractEngine:
+    """The engine of the current process, created on first use"""
+    global _engine
+    if _engine is None:
+        _engine = TesseractEngine(tesseract_cmd)
+    elif tesseract_cmd:
+        _engine._pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    return _engine
+
+
+def _init_worker(tesseract_cmd: Optional[str]):
+    # Several workers each running a multi-threaded Tesseract only fight over the cores
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    get_engine(tesseract_cmd)
+
+
+def _image_payload(image):
+    """Raw pixels of a PIL image: much cheaper to pickle than the image object"""
+    if image.mode not in ("1", "L", "RGB", "RGBA"):
+        image = image.convert("RGB")  # Palette images would lose their palette
+    return image.mode, image.size, image.tobytes()
+
+
+def _image_from_payload(payload):
+    from PIL import Image
+    mode, size, data = payload
+    return Image.frombytes(mode, size, data)
+
+
+def _recognize_payload(payload, psm_modes) -> OcrResult:
+    return get_engine().recognize(_image_from_payload(payload), psm_modes)
+
+
+def _recognize_confident_payload(payload, psm_modes, min_confidence) -> OcrResult:
+    return get_engine().recognize_confident(_image_from_payload(payload), psm_modes, min_confidence)
+
+
+def _words_payload(payload, psm_mode) -> List[OcrWord]:
+    return get_engine().image_to_words(_image_from_payload(payload), psm_mode)
+
+
+def words_in_rect(words: Sequence[OcrWord], rect) -> List[OcrWord]:
+    """
+    Words lying mostly inside rect: the same at-least-50%-overlap rule the
+    dispatch app applies to text-layer spans. rect needs x0, y0, x1, y1.
+    """
+    selected = []
+    for word in words:
+        word_area = (word.x1 - word.x0) * (word.y1 - word.y0)
+        if word_area <= 0:
+            continue
+        overlap_width = min(word.x1, rect.x1) - max(word.x0, rect.x0)
+        overlap_height = min(word.y1, rect.y1) - max(word.y0, rect.y0)
+        if overlap_width > 0 and overlap_height > 0 and overlap_width * overlap_height / word_area > 0.5:
+            selected.append(word)
+    return selected
+
+
+def mean_confidence(words: Sequence[OcrWord]) -> Optional[float]:
+    """Mean confidence of the recognised words, None when there are none"""
+    confidences = [word.confidence for word in words if word.confidence >= 0]
+    if not confidences:
+        return None
+    return sum(confidences) / len(confidences)
+
+
+def words_text(words: Sequence[OcrWord]) -> str:
+    """Join words in reading order, one output line per OCR line"""
+    lines = []
+    current_line = None
+    for word in words:
+        if word.line != current_line:
+            lines.append([])
+            current_line = word.line
+        lines[-1].append(word.text)
+    return "\n".join(" ".join(line) for line in lines)
+
+
+def scale_words(words: Sequence[OcrWord], scale: float, x_offset: float = 0.0, y_offset: float = 0.0) -> List[OcrWord]:
+    """Map word boxes from image pixels to page coordinates (pixel / scale + offset)"""
+    return [word._replace(x0=word.x0 / scale + x_offset, y0=word.y0 / scale + y_offset,
+                          x1=word.x1 / scale + x_offset, y1=word.y1 / scale + y_offset)
+            for word in words]
+
+
+def words_to_json(words: Sequence[OcrWord]) -> str:
+    return json.dumps([list(word) for word in words])
+
+
+def words_from_json(data: str) -> List[OcrWord]:
+    return [OcrWord(*word) for word in json.loads(data)]
+
+
+def _then(future: Future, transform: Callable) -> Future:
+    """Future of transform(result) once future completes; exceptions propagate"""
+    derived = Future()
+
+    def done(source):
+        try:
+            derived.set_result(transform(source.result()))
+        except Exception as e:
+            derived.set_exception(e)
+
+    future.add_done_callback(done)
+    return derived
+
+
+class OcrService:
+    """Pool of OCR worker processes; submit() returns a Future of OcrResult"""
+
+    def __init__(self, workers: int = DEFAULT_OCR_WORKERS, tesseract_cmd: Optional[str] = None):
+        self.workers = workers
+        self.tesseract_cmd = tesseract_cmd
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     initializer=_init_worker,
+                                                     initargs=(self.tesseract_cmd,))
+            return self._executor
+
+    def submit(self, image, psm_modes: Sequence[Optional[int]] = (None,)) -> "Future[OcrResult]":
+        """
+        Queue a PIL image for OCR.
+
+        Args:
+            image: PIL image (any mode)
+            psm_modes: PSM modes tried in order until one returns text
+
+        Returns:
+            Future resolving to an OcrResult
+        """
+        psm_modes = tuple(psm_modes)
+        try:
+            return self._get_executor().submit(_recognize_payload, _image_payload(image), psm_modes)
+        except (BrokenProcessPool, RuntimeError, OSError):
+            # No usable pool (a worker died): start a fresh one next time, OCR here for now
+            self.shutdown()
+            future = Future()
+            try:
+                future.set_result(get_engine(self.tesseract_cmd).recognize(image, psm_modes))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+    def submit_confident(self, image, psm_modes: Sequence[int], min_confidence: float) -> "Future[OcrResult]":
+        """Queue a PIL image for confidence-driven OCR (see TesseractEngine.recognize_confident)"""
+        psm_modes = tuple(psm_modes)
+        try:
+            return self._get_executor().submit(_recognize_confident_payload, _image_payload(image),
+                                               psm_modes, min_confidence)
+        except (BrokenProcessPool, RuntimeError, OSError):
+            self.shutdown()
+            future = Future()
+            try:
+                future.set_result(get_engine(self.tesseract_cmd).recognize_confident(image, psm_modes, min_confidence))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+    def submit_words(self, image, psm_mode: int = 3) -> "Future[List[OcrWord]]":
+        """
+        Queue a PIL image for one word-level (TSV) OCR pass.
+
+        Returns:
+            Future resolving to the OcrWord boxes in image pixels
+        """
+        try:
+            return self._get_executor().submit(_words_payload, _image_payload(image), psm_mode)
+        except (BrokenProcessPool, RuntimeError, OSError):
+            self.shutdown()
+            future = Future()
+            try:
+                future.set_result(get_engine(self.tesseract_cmd).image_to_words(image, psm_mode))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class PageWords:
+    """
+    Word-level OCR of one page, run at most once and shared by all its regions.
+
+    render_page() returns (PIL image, scale, x_offset, y_offset) mapping image
+    pixels to page coordinates; it is only called when the first region asks
+    for OCR, so pages whose regions all have a text layer are never rendered.
+    """
+
+    def __init__(self, ocr_service: OcrService, render_page: Callable[[], Tuple],
+                 psm_mode: int = PAGE_PSM_MODE, words: Optional[List[OcrWord]] = None):
+        self.ocr_service = ocr_service
+        self.psm_mode = psm_mode
+        self.from_cache = words is not None
+        self.seconds = 0.0              # Render and OCR time of the page pass
+        self._render_page = render_page
+        self._future: Optional[Future] = None
+        if words is not None:
+            self._future = Future()
+            self._future.set_result(words)
+
+    @property
+    def started(self) -> bool:
+        return self._future is not None
+
+    def words_future(self) -> "Future[List[OcrWord]]":
+        """Future of the page's words in page coordinates"""
+        if self._future is None:
+            start = time.perf_counter()
+
+            def to_page(words, scale, x_offset, y_offset):
+                self.seconds = time.perf_counter() - start
+                return scale_words(words, scale, x_offset, y_offset)
+
+            try:
+                image, scale, x_offset, y_offset = self._render_page()
+                pixel_words = self.ocr_service.submit_words(image, self.psm_mode)
+                self._future = _then(pixel_words, lambda words: to_page(words, scale, x_offset, y_offset))
+            except Exception as e:
+                self._future = Future()
+                self._future.set_exception(e)
+        return self._future
+
+    def region_result(self, rect) -> "Future[OcrResult]":
+        """Future OcrResult for the words lying in rect"""
+        def region(words):
+            region_words = words_in_rect(words, rect)
+            return OcrResult(words_text(region_words), self.psm_mode, confidence=mean_confidence(region_words))
+
+        return _then(self.words_future(), region)
+
+
+_default_service: Optional[OcrService] = None
+_default_service_lock = threading.Lock()
+
+
+def default_ocr_service(tesseract_cmd: Optional[str] = None) -> OcrService:
+    """The app-wide OCR service; workers start on the first submit"""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = OcrService(tesseract_cmd=tesseract_cmd)
+            atexit.register(_default_service.shutdown)
+        elif tesseract_cmd and tesseract_cmd != _default_service.tesseract_cmd:
+            # Tesseract was reconfigured: new workers pick up the new path
+            _default_service.shutdown()
+            _default_service.tesseract_cmd = tesseract_cmd
+        return _default_service
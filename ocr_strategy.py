@@ -0,0 +1,149 @@
+"""
+Per-region OCR strategy for the dispatch picking-docket regions.
+
+The region OCR fallback used to try PSM 6, 3, 7, 8 and 13 in turn and take
+the first non-empty string, so a noisy region cost up to five Tesseract
+runs and could still return PSM 6 garbage. Each region type now starts with
+the page segmentation mode that fits its layout (a single line for the
+order number and route, a block for the site name) and only retries with
+the next mode while the mean word confidence stays below the region's
+threshold.
+
+OcrStats records per-region text-layer and OCR hit rates, Tesseract runs
+and OCR seconds, accumulated across runs in app_data/ocr_stats.json, so
+the PSM orders and thresholds below can be tuned from real dockets.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence
+
+from app_paths import app_data_dir
+
+# Tesseract page segmentation modes
+PSM_AUTO = 3
+PSM_BLOCK = 6
+PSM_SINGLE_LINE = 7
+PSM_SINGLE_WORD = 8
+
+
+class RegionStrategy(NamedTuple):
+    """How one region type is OCRed"""
+    psm_modes: Sequence[int]        # Tried in order while confidence stays low
+    min_confidence: float           # Mean word confidence (0-100) accepted without a retry
+
+
+# Keyed by region name, as the unified flow and create_internal_excel_data use them
+REGION_STRATEGIES: Dict[str, RegionStrategy] = {
+    'Region 1': RegionStrategy((PSM_SINGLE_LINE, PSM_BLOCK), 60.0),         # Route
+    'Region 2': RegionStrategy((PSM_SINGLE_LINE, PSM_SINGLE_WORD), 70.0),   # Order number
+    'Region 3': RegionStrategy((PSM_BLOCK, PSM_AUTO), 55.0),                # Site name
+    'Region 4': RegionStrategy((PSM_SINGLE_LINE, PSM_BLOCK), 60.0),         # "Total Items Delivered:" trigger
+    'Region 5': RegionStrategy((PSM_SINGLE_LINE, PSM_BLOCK), 55.0),         # Address line
+}
+
+DEFAULT_STRATEGY = RegionStrategy((PSM_BLOCK, PSM_SINGLE_LINE, PSM_AUTO), 60.0)
+
+# Stats entry for word-level page OCR passes shared by every region of a page
+PAGE_OCR = 'Page OCR'
+
+
+def strategy_for(region_name: str) -> RegionStrategy:
+    return REGION_STRATEGIES.get(region_name, DEFAULT_STRATEGY)
+
+
+class RegionStats:
+    """Counters for one region"""
+
+    FIELDS = ("regions", "text_layer", "cached", "ocr_requests", "ocr_hits",
+              "low_confidence", "retries", "tesseract_runs", "ocr_seconds")
+
+    def __init__(self, **counts):
+        for field in self.FIELDS:
+            setattr(self, field, counts.get(field, 0))
+
+    def as_dict(self) -> Dict[str, float]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def add(self, other: "RegionStats"):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+
+class OcrStats:
+    """Per-region text-layer/OCR hit rates and OCR time for one run"""
+
+    def __init__(self):
+        self.regions: Dict[str, RegionStats] = {}
+
+    def _region(self, region_name: str) -> RegionStats:
+        if region_name not in self.regions:
+            self.regions[region_name] = RegionStats()
+        return self.regions[region_name]
+
+    def record_text_layer(self, region_name: str):
+        stats = self._region(region_name)
+        stats.regions += 1
+        stats.text_layer += 1
+
+    def record_cached(self, region_name: str):
+        stats = self._region(region_name)
+        stats.regions += 1
+        stats.cached += 1
+
+    def record_page_ocr(self, seconds: float):
+        """Record one shared word-level OCR pass over a whole page"""
+        stats = self._region(PAGE_OCR)
+        stats.tesseract_runs += 1
+        stats.ocr_seconds += seconds
+
+    def record_ocr(self, region_name: str, result, min_confidence: Optional[float] = None, retried: bool = False):
+        """Record one region's OCR outcome (an OcrResult, or None when OCR raised)"""
+        stats = self._region(region_name)
+        stats.regions += 1
+        stats.ocr_requests += 1
+        stats.retries += int(retried)
+        if result is None:
+            return
+        stats.tesseract_runs += result.attempts
+        stats.ocr_seconds += result.seconds
+        if result.text.strip():
+            stats.ocr_hits += 1
+        if (min_confidence is not None and result.confidence is not None
+                and result.confidence < min_confidence):
+            stats.low_confidence += 1
+
+    def summary_lines(self):
+        """One line per region: hit rates, Tesseract runs and OCR seconds"""
+        lines = []
+        for region_name, stats in sorted(self.regions.items()):
+            if region_name == PAGE_OCR:
+                lines.append(f"{region_name}: {stats.tesseract_runs} pages, {stats.ocr_seconds:.1f}s OCR")
+                continue
+            text_rate = 100.0 * stats.text_layer / stats.regions
+            ocr_rate = 100.0 * stats.ocr_hits / stats.ocr_requests if stats.ocr_requests else 0.0
+            lines.append(f"{region_name}: {stats.regions} regions, text layer {text_rate:.0f}%, "
+                         f"cached {stats.cached}, OCR {stats.ocr_requests} "
+                         f"(hit rate {ocr_rate:.0f}%, low confidence {stats.low_confidence}, "
+                         f"retries {stats.retries}), {stats.tesseract_runs} Tesseract runs, "
+                         f"{stats.ocr_seconds:.1f}s OCR")
+        return lines
+
+    def save(self, stats_path=None) -> Optional[Path]:
+        """Add this run's counters to the totals in app_data/ocr_stats.json"""
+        stats_path = Path(stats_path) if stats_path else app_data_dir() / "ocr_stats.json"
+        try:
+            totals = {}
+            if stats_path.exists():
+                with open(stats_path, 'r') as f:
+                    totals = json.load(f)
+            for region_name, stats in self.regions.items():
+                total = RegionStats(**totals.get(region_name, {}))
+                total.add(stats)
+                totals[region_name] = total.as_dict()
+            with open(stats_path, 'w') as f:
+                json.dump(totals, f, indent=2)
+            return stats_path
+        except (OSError, ValueError) as e:
+            print(f"Error saving OCR statistics: {e}")
+            return None
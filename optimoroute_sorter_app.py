@@ -5,8 +5,7 @@ from pathlib import Path
 import pandas as pd
 import fitz  # PyMuPDF
 import pytesseract
-from PIL import Image
-import io
+import multiprocessing
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
@@ -29,6 +28,11 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSize, QDate, QPropertyAnimation, QEasingCurve, QRect
 from PySide6.QtGui import QFont, QPalette, QColor, QIcon, QPixmap, QPainter, QRegion
 
+from order_matching import OrderMatcher, TokenOrderIndex, match_page_order
+from pdf_text_extraction import extract_pdf_texts
+from extraction_cache import default_extraction_cache, file_sha256, clip_key
+from pdf_assembly import SourceDocumentCache, append_pages
+
 
 class ProcessingThread(QThread):
     """Background thread for PDF processing operations"""
@@ -1678,6 +1682,39 @@ class OptimoRouteSorterApp(QMainWindow):
             return ''
 
     # ===== New Tab core processing =====
+    def get_bottom_region_texts(self, pdf_path, doc):
+        """
+        Text of the bottom 1/5 of every page (where the route is printed),
+        taken from the extraction cache where an earlier run stored it.
+        """
+        extraction_cache = default_extraction_cache()
+        try:
+            file_hash = file_sha256(pdf_path) if extraction_cache else None
+        except OSError:
+            file_hash = None
+
+        texts = []
+        new_rows = []
+        for page_index in range(len(doc)):
+            page = doc.load_page(page_index)
+            rect = page.rect
+            bottom_region = fitz.Rect(rect.x0, rect.y0 + (rect.height * 4 / 5.0), rect.x1, rect.y1)
+            region_clip = clip_key(bottom_region)
+
+            cached = extraction_cache.get(file_hash, page_index, region_clip, "text") if file_hash else None
+            if cached is not None:
+                texts.append(cached.text)
+                continue
+
+            text = page.get_text("text", clip=bottom_region) or ""
+            texts.append(text)
+            if file_hash:
+                new_rows.append((file_hash, page_index, region_clip, "text", text, False))
+
+        if new_rows:
+            extraction_cache.put_many(new_rows)
+        return texts
+
     def combine_route_from_bottom_region(self):
         try:
             if not self.newtab_selected_pdf_files:
@@ -1700,11 +1737,8 @@ class OptimoRouteSorterApp(QMainWindow):
                 except Exception:
                     continue
 
-                for page_index in range(len(doc)):
-                    page = doc.load_page(page_index)
-                    rect = page.rect
-                    bottom_region = fitz.Rect(rect.x0, rect.y0 + (rect.height * 4/5.0), rect.x1, rect.y1)
-                    text = page.get_text("text", clip=bottom_region) or ""
+                bottom_texts = self.get_bottom_region_texts(pdf_path, doc)
+                for page_index, text in enumerate(bottom_texts):
                     text_lower = text.lower()
                     if any(variant in text_lower for variant in route_variants):
                         matched_pages.append((pdf_path, page_index))
@@ -1721,13 +1755,8 @@ class OptimoRouteSorterApp(QMainWindow):
 
             output_pdf_path = os.path.join(route_folder, f"{safe_route}.pdf")
             out_doc = fitz.open()
-            for src_path, pnum in matched_pages:
-                try:
-                    src_doc = fitz.open(src_path)
-                    out_doc.insert_pdf(src_doc, from_page=pnum, to_page=pnum)
-                    src_doc.close()
-                except Exception:
-                    continue
+            with SourceDocumentCache() as source_documents:
+                append_pages(out_doc, matched_pages, source_documents)
 
             if out_doc.page_count == 0:
                 out_doc.close()
@@ -1777,13 +1806,9 @@ class OptimoRouteSorterApp(QMainWindow):
 
                 # Precompute route label per page (or None)
                 page_route = [None] * num_pages
+                bottom_texts = self.get_bottom_region_texts(pdf_path, doc)
                 for page_index in range(num_pages):
-                    page = doc.load_page(page_index)
-                    rect = page.rect
-                    bottom_region = fitz.Rect(
-                        rect.x0, rect.y0 + (rect.height * 4 / 5.0), rect.x1, rect.y1
-                    )
-                    text_lower = (page.get_text("text", clip=bottom_region) or "").lower()
+                    text_lower = bottom_texts[page_index].lower()
                     for route_label, variants in route_to_variants.items():
                         # Strict match: check for whole-word match with word boundaries
                         matched = False
@@ -1828,52 +1853,46 @@ class OptimoRouteSorterApp(QMainWindow):
                         missing_pages.append((pdf_path, idx))
                 doc.close()
 
-            any_output = False
-            for route_label, pages in matches.items():
-                if not pages:
-                    continue
-                any_output = True
-                safe_route = re.sub(r"[^A-Za-z0-9_-]+", "_", route_label)
-                output_pdf_path = os.path.join(session_folder, f"{safe_route}.pdf")
-
-                # Reverse the order within each route group so pages with routes come first
-                # This ensures route pages are printed first, then delivery notes
-                sorted_pages = list(reversed(pages))
-
-                # Update status directly since this method runs synchronously
-                self.update_status(f"✓ {route_label}: Processing {len(pages)} pages (route pages first, then delivery notes)")
-
-                out_doc = fitz.open()
-                for src_path, pnum in sorted_pages:
-                    try:
-                        src_doc = fitz.open(src_path)
-                        out_doc.insert_pdf(src_doc, from_page=pnum, to_page=pnum)
-                        src_doc.close()
-                    except Exception:
+            # Keep source PDFs open while the route and missing PDFs are assembled
+            source_documents = SourceDocumentCache()
+            try:
+                any_output = False
+                for route_label, pages in matches.items():
+                    if not pages:
                         continue
-                if out_doc.page_count:
-                    out_doc.save(output_pdf_path)
-                out_doc.close()
-
-            # Create Missing Routes PDF if needed
-            missing_count = len(missing_pages)
-            if missing_count:
-                any_output = True
-                missing_pdf_path = os.path.join(session_folder, "Missing_Routes.pdf")
-                out_missing = fitz.open()
+                    any_output = True
+                    safe_route = re.sub(r"[^A-Za-z0-9_-]+", "_", route_label)
+                    output_pdf_path = os.path.join(session_folder, f"{safe_route}.pdf")
+
+                    # Reverse the order within each route group so pages with routes come first
+                    # This ensures route pages are printed first, then delivery notes
+                    sorted_pages = list(reversed(pages))
+
+                    # Update status directly since this method runs synchronously
+                    self.update_status(f"✓ {route_label}: Processing {len(pages)} pages (route pages first, then delivery notes)")
+
+                    out_doc = fitz.open()
+                    append_pages(out_doc, sorted_pages, source_documents)
+                    if out_doc.page_count:
+                        out_doc.save(output_pdf_path)
+                    out_doc.close()
+
+                # Create Missing Routes PDF if needed
+                missing_count = len(missing_pages)
+                if missing_count:
+                    any_output = True
+                    missing_pdf_path = os.path.join(session_folder, "Missing_Routes.pdf")
+                    out_missing = fitz.open()
+                    
+                    # For missing routes PDF, all pages are without routes, so no sorting needed
+                    # But we'll maintain the original order from the source files
+                    append_pages(out_missing, missing_pages, source_documents)
+                    if out_missing.page_count:
+                        out_missing.save(missing_pdf_path)
+                    out_missing.close()
                 
-                # For missing routes PDF, all pages are without routes, so no sorting needed
-                # But we'll maintain the original order from the source files
-                for src_path, pnum in missing_pages:
-                    try:
-                        src_doc = fitz.open(src_path)
-                        out_missing.insert_pdf(src_doc, from_page=pnum, to_page=pnum)
-                        src_doc.close()
-                    except Exception:
-                        continue
-                if out_missing.page_count:
-                    out_missing.save(missing_pdf_path)
-                out_missing.close()
+            finally:
+                source_documents.close()
 
             # Create combined PDF by concatenating route-specific PDFs in order
             combined_all_path = os.path.join(session_folder, "All_Pages_Combined.pdf")
@@ -2911,8 +2930,6 @@ class OptimoRouteSorterApp(QMainWindow):
     
     def process_all_pdfs_and_packing_internal(self):
         """Internal method for PDF processing"""
-        import re
-        
         # Get delivery data for summary generation
         delivery_data_with_drivers = self.delivery_data_with_drivers
         
@@ -2947,69 +2964,65 @@ class OptimoRouteSorterApp(QMainWindow):
             if len(self.delivery_data_with_drivers) > 5:
                 self.processing_thread.progress_signal.emit(f"  ... and {len(self.delivery_data_with_drivers) - 5} more orders")
             
+            # Build the order ID indexes once for the whole run
+            order_matcher = OrderMatcher(self.delivery_data_with_drivers.keys())
+            order_token_index = TokenOrderIndex(self.delivery_data_with_drivers.keys())
+            
+            # Pages where more than one order ID was found
+            ambiguous_pages = []
+            
+            # Extract the text of every page up front, spread across all CPU cores
+            extracted_pdfs = extract_pdf_texts(
+                self.selected_pdf_files,
+                ocr_zoom=2,
+                tesseract_cmd=pytesseract.pytesseract.tesseract_cmd,
+                progress_callback=self.processing_thread.progress_signal.emit,
+                cache=default_extraction_cache()
+            )
+            
             # Process PDF files
             for pdf_file in self.selected_pdf_files:
                 self.processing_thread.progress_signal.emit(f"Processing: {Path(pdf_file).name}")
                 
                 try:
-                    # Open PDF
-                    pdf_document = fitz.open(pdf_file)
+                    pdf_text = extracted_pdfs[pdf_file]
                     
                     # Process each page
-                    for page_num in range(len(pdf_document)):
-                        page = pdf_document[page_num]
+                    for extracted_page in pdf_text.pages:
+                        page_num = extracted_page.page_num
+                        page_text = extracted_page.text
                         
-                        # Extract text from page
-                        page_text = page.get_text()
-                        
-                        # If no text found, try OCR
-                        if not page_text.strip():
-                            try:
-                                # Render page as image for OCR
-                                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x resolution
-                                img_data = pix.tobytes("png")
-                                img = Image.open(io.BytesIO(img_data))
-                                
-                                # Perform OCR
-                                page_text = pytesseract.image_to_string(img)
-                                self.processing_thread.progress_signal.emit(
-                                    f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
-                                )
-                            except Exception as ocr_error:
-                                self.processing_thread.progress_signal.emit(
-                                    f"OCR failed for page {page_num + 1}: {str(ocr_error)}"
-                                )
-                                page_text = ""
-                        
-                        # Search for exact order ID matches from delivery data
-                        order_id = None
-                        matched_order_id = None
-                        
-                        # Search for each order ID from delivery data directly in the PDF text
-                        for delivery_order_id in self.delivery_data_with_drivers.keys():
-                            # Case-insensitive search for the exact order ID
-                            if delivery_order_id.upper() in page_text.upper():
-                                order_id = delivery_order_id  # Use the exact case from delivery data
-                                matched_order_id = delivery_order_id
-                                found_order_ids.add(delivery_order_id)  # Track found order
-                                self.processing_thread.progress_signal.emit(
-                                    f"✅ Found exact match: '{delivery_order_id}' on page {page_num + 1}"
-                                )
-                                break
+                        if extracted_page.ocr_used:
+                            self.processing_thread.progress_signal.emit(
+                                f"Used OCR for page {page_num + 1} in {Path(pdf_file).name}"
+                            )
+                        elif extracted_page.ocr_error:
+                            self.processing_thread.progress_signal.emit(
+                                f"OCR failed for page {page_num + 1}: {extracted_page.ocr_error}"
+                            )
                         
-                        # If no exact match found, try word boundary search for more precision
-                        if not order_id:
-                            for delivery_order_id in self.delivery_data_with_drivers.keys():
-                                # Use word boundaries to avoid partial matches
-                                pattern = r'\b' + re.escape(delivery_order_id) + r'\b'
-                                if re.search(pattern, page_text, re.IGNORECASE):
-                                    order_id = delivery_order_id
-                                    matched_order_id = delivery_order_id
-                                    found_order_ids.add(delivery_order_id)  # Track found order
-                                    self.processing_thread.progress_signal.emit(
-                                        f"✅ Found word boundary match: '{delivery_order_id}' on page {page_num + 1}"
-                                    )
-                                    break
+                        # Exact match from delivery data (case-insensitive, exact case from delivery data),
+                        # else a word boundary match; word matches also report pages with several order IDs.
+                        # Decided per page, so a page without an order ID is never filed under the previous one
+                        page_match = match_page_order(page_text, order_matcher, order_token_index)
+                        order_id = page_match.order_id
+                        word_matches = page_match.word_matches
+                        if order_id:
+                            found_order_ids.add(order_id)  # Track found order
+                            self.processing_thread.progress_signal.emit(
+                                f"✅ Found {'exact' if page_match.exact else 'word boundary'} match: '{order_id}' on page {page_num + 1}"
+                            )
+                        if len(word_matches) > 1:
+                            ambiguous_pages.append({
+                                'source_file': pdf_file,
+                                'page_num': page_num,
+                                'order_ids': word_matches,
+                                'used_order_id': order_id
+                            })
+                            self.processing_thread.progress_signal.emit(
+                                f"⚠ Page {page_num + 1} of {Path(pdf_file).name} contains {len(word_matches)} order IDs "
+                                f"({', '.join(word_matches)}) - using '{order_id}'"
+                            )
                         
                         # Debug: Show what we found on this page
                         if order_id:
@@ -3076,13 +3089,13 @@ class OptimoRouteSorterApp(QMainWindow):
                         
                         total_pages_processed += 1
                     
+                    if pdf_text.error:
+                        raise Exception(pdf_text.error)
+                    
                     processed_files += 1
-                    pdf_document.close()
                     
                 except Exception as e:
                     self.processing_thread.progress_signal.emit(f"Error processing {pdf_file}: {str(e)}")
-                    if 'pdf_document' in locals():
-                        pdf_document.close()
                     continue
             
             # Calculate missing order IDs
@@ -3127,189 +3140,183 @@ class OptimoRouteSorterApp(QMainWindow):
                     "error": "No matching orders found in PDF files"
                 }
             
-            for driver_number, pages in driver_pages.items():
-                if not pages:
-                    continue
-
-                try:
-                    # Create new PDF for this driver
-                    # Count unique orders for this driver
-                    unique_orders = len(set(page_info['order_id'] for page_info in pages))
-                    output_filename = f"Driver_{driver_number}_{unique_orders}_Orders.pdf"
-                    output_path = date_folder / output_filename
-
-                    self.processing_thread.progress_signal.emit(
-                        f"Creating {output_filename} with {len(pages)} pages ({unique_orders} unique orders)..."
-                    )
+            # Keep source PDFs open for the whole assembly run
+            source_documents = SourceDocumentCache()
+            try:
+                for driver_number, pages in driver_pages.items():
+                    if not pages:
+                        continue
 
-                    # Sort pages by stop number first (delivery sequence order)
                     try:
-                        pages.sort(key=lambda x: int(x.get('stop_number', 0)))
-                    except (ValueError, TypeError):
-                        # If stop numbers aren't numeric, sort as strings
-                        pages.sort(key=lambda x: str(x.get('stop_number', '')))
-                    
-                    # Reverse pages so they print in correct order (last page prints first)
-                    pages.reverse()
-                    
-                    self.processing_thread.progress_signal.emit(
-                        f"Pages sorted by delivery sequence and reversed for correct printing order"
-                    )
+                        # Create new PDF for this driver
+                        # Count unique orders for this driver
+                        unique_orders = len(set(page_info['order_id'] for page_info in pages))
+                        output_filename = f"Driver_{driver_number}_{unique_orders}_Orders.pdf"
+                        output_path = date_folder / output_filename
 
-                    new_pdf = fitz.open()
-                    pages_added = 0
+                        self.processing_thread.progress_signal.emit(
+                            f"Creating {output_filename} with {len(pages)} pages ({unique_orders} unique orders)..."
+                        )
 
-                    # Add all pages for this driver in reversed delivery sequence order
-                    # Group pages by source file to minimize file opening
-                    pages_by_file = {}
-                    for page_info in pages:
-                        source_file = page_info['source_pdf_path']
-                        if source_file not in pages_by_file:
-                            pages_by_file[source_file] = []
-                        pages_by_file[source_file].append(page_info['page_num'])
-                    
-                    # Process each source file
-                    for source_file, page_numbers in pages_by_file.items():
+                        # Sort pages by stop number first (delivery sequence order)
                         try:
-                            source_pdf = fitz.open(source_file)
-                            for page_num in page_numbers:
-                                # Insert page into new PDF
-                                new_pdf.insert_pdf(source_pdf, from_page=page_num, to_page=page_num)
-                                pages_added += 1
-                            source_pdf.close()
-                        except Exception as e:
-                            self.processing_thread.progress_signal.emit(
+                            pages.sort(key=lambda x: int(x.get('stop_number', 0)))
+                        except (ValueError, TypeError):
+                            # If stop numbers aren't numeric, sort as strings
+                            pages.sort(key=lambda x: str(x.get('stop_number', '')))
+                        
+                        # Reverse pages so they print in correct order (last page prints first)
+                        pages.reverse()
+                        
+                        self.processing_thread.progress_signal.emit(
+                            f"Pages sorted by delivery sequence and reversed for correct printing order"
+                        )
+
+                        new_pdf = fitz.open()
+
+                        # Add all pages for this driver in reversed delivery sequence order
+                        # Group pages by source file to keep page runs together
+                        pages_by_file = {}
+                        for page_info in pages:
+                            source_file = page_info['source_pdf_path']
+                            if source_file not in pages_by_file:
+                                pages_by_file[source_file] = []
+                            pages_by_file[source_file].append(page_info['page_num'])
+                        
+                        # Copy each run of consecutive pages with a single insert
+                        pages_added = append_pages(
+                            new_pdf,
+                            [(source_file, page_num) for source_file, page_numbers in pages_by_file.items() for page_num in page_numbers],
+                            source_documents,
+                            on_error=lambda source_file, e: self.processing_thread.progress_signal.emit(
                                 f"Error adding pages from {source_file}: {str(e)}"
                             )
-                            continue
-                    
-                    # Only save if we successfully added pages
-                    if pages_added > 0:
-                        new_pdf.save(str(output_path))
-                        new_pdf.close()
+                        )
                         
-                        # Verify the file was created
-                        if output_path.exists():
-                            created_files.append(output_filename)
-                            self.processing_thread.progress_signal.emit(
-                                f"✓ Successfully created {output_filename} with {pages_added} pages"
-                            )
+                        # Only save if we successfully added pages
+                        if pages_added > 0:
+                            new_pdf.save(str(output_path))
+                            new_pdf.close()
+                            
+                            # Verify the file was created
+                            if output_path.exists():
+                                created_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✓ Successfully created {output_filename} with {pages_added} pages"
+                                )
+                            else:
+                                failed_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✗ Failed to create {output_filename} - file not found after save"
+                                )
                         else:
+                            new_pdf.close()
                             failed_files.append(output_filename)
                             self.processing_thread.progress_signal.emit(
-                                f"✗ Failed to create {output_filename} - file not found after save"
+                                f"✗ No pages added to {output_filename}"
                             )
-                    else:
-                        new_pdf.close()
-                        failed_files.append(output_filename)
+                            
+                    except Exception as e:
+                        # Count unique orders for error message
+                        unique_orders = len(set(page_info['order_id'] for page_info in pages))
+                        failed_files.append(f"Driver_{driver_number}_{unique_orders}_Orders.pdf")
                         self.processing_thread.progress_signal.emit(
-                            f"✗ No pages added to {output_filename}"
+                            f"✗ Error creating PDF for Driver {driver_number}: {str(e)}"
                         )
-                        
-                except Exception as e:
-                    # Count unique orders for error message
-                    unique_orders = len(set(page_info['order_id'] for page_info in pages))
-                    failed_files.append(f"Driver_{driver_number}_{unique_orders}_Orders.pdf")
-                    self.processing_thread.progress_signal.emit(
-                        f"✗ Error creating PDF for Driver {driver_number}: {str(e)}"
-                    )
-                    continue
-            
-            # Create Reversed Picking folder with opposite order
-            self.processing_thread.progress_signal.emit("Creating Reversed Picking folder...")
-            
-            reversed_picking_folder = date_folder / "Reversed Picking Orders"
-            reversed_picking_folder.mkdir(exist_ok=True)
-            
-            reversed_created_files = []
-            reversed_failed_files = []
-            
-            for driver_number, pages in driver_pages.items():
-                if not pages:
-                    continue
-
-                try:
-                    # Create new PDF for this driver in reversed picking order
-                    unique_orders = len(set(page_info['order_id'] for page_info in pages))
-                    output_filename = f"Driver_{driver_number}_{unique_orders}_Orders.pdf"
-                    reversed_output_path = reversed_picking_folder / output_filename
-
-                    self.processing_thread.progress_signal.emit(
-                        f"Creating reversed picking {output_filename} with {len(pages)} pages ({unique_orders} unique orders)..."
-                    )
+                        continue
+                
+                # Create Reversed Picking folder with opposite order
+                self.processing_thread.progress_signal.emit("Creating Reversed Picking folder...")
+                
+                reversed_picking_folder = date_folder / "Reversed Picking Orders"
+                reversed_picking_folder.mkdir(exist_ok=True)
+                
+                reversed_created_files = []
+                reversed_failed_files = []
+                
+                for driver_number, pages in driver_pages.items():
+                    if not pages:
+                        continue
 
-                    # Sort pages by stop number (delivery sequence order) - NO REVERSE
-                    # This means first deliveries will be picked last
-                    reversed_pages = pages.copy()  # Make a copy to avoid modifying original
                     try:
-                        reversed_pages.sort(key=lambda x: int(x.get('stop_number', 0)))
-                    except (ValueError, TypeError):
-                        # If stop numbers aren't numeric, sort as strings
-                        reversed_pages.sort(key=lambda x: str(x.get('stop_number', '')))
-                    
-                    # DO NOT reverse - keep delivery sequence order for reversed picking
-                    self.processing_thread.progress_signal.emit(
-                        f"Pages sorted by delivery sequence for reversed picking (first deliveries picked last)"
-                    )
+                        # Create new PDF for this driver in reversed picking order
+                        unique_orders = len(set(page_info['order_id'] for page_info in pages))
+                        output_filename = f"Driver_{driver_number}_{unique_orders}_Orders.pdf"
+                        reversed_output_path = reversed_picking_folder / output_filename
 
-                    new_pdf = fitz.open()
-                    pages_added = 0
-
-                    # Add all pages for this driver in delivery sequence order (first delivery picked last)
-                    # Group pages by source file to minimize file opening
-                    pages_by_file = {}
-                    for page_info in reversed_pages:
-                        source_file = page_info['source_pdf_path']
-                        if source_file not in pages_by_file:
-                            pages_by_file[source_file] = []
-                        pages_by_file[source_file].append(page_info['page_num'])
-                    
-                    # Process each source file
-                    for source_file, page_numbers in pages_by_file.items():
+                        self.processing_thread.progress_signal.emit(
+                            f"Creating reversed picking {output_filename} with {len(pages)} pages ({unique_orders} unique orders)..."
+                        )
+
+                        # Sort pages by stop number (delivery sequence order) - NO REVERSE
+                        # This means first deliveries will be picked last
+                        reversed_pages = pages.copy()  # Make a copy to avoid modifying original
                         try:
-                            source_pdf = fitz.open(source_file)
-                            for page_num in page_numbers:
-                                # Insert page into new PDF
-                                new_pdf.insert_pdf(source_pdf, from_page=page_num, to_page=page_num)
-                                pages_added += 1
-                            source_pdf.close()
-                        except Exception as e:
-                            self.processing_thread.progress_signal.emit(
+                            reversed_pages.sort(key=lambda x: int(x.get('stop_number', 0)))
+                        except (ValueError, TypeError):
+                            # If stop numbers aren't numeric, sort as strings
+                            reversed_pages.sort(key=lambda x: str(x.get('stop_number', '')))
+                        
+                        # DO NOT reverse - keep delivery sequence order for reversed picking
+                        self.processing_thread.progress_signal.emit(
+                            f"Pages sorted by delivery sequence for reversed picking (first deliveries picked last)"
+                        )
+
+                        new_pdf = fitz.open()
+
+                        # Add all pages for this driver in delivery sequence order (first delivery picked last)
+                        # Group pages by source file to keep page runs together
+                        pages_by_file = {}
+                        for page_info in reversed_pages:
+                            source_file = page_info['source_pdf_path']
+                            if source_file not in pages_by_file:
+                                pages_by_file[source_file] = []
+                            pages_by_file[source_file].append(page_info['page_num'])
+                        
+                        # Copy each run of consecutive pages with a single insert
+                        pages_added = append_pages(
+                            new_pdf,
+                            [(source_file, page_num) for source_file, page_numbers in pages_by_file.items() for page_num in page_numbers],
+                            source_documents,
+                            on_error=lambda source_file, e: self.processing_thread.progress_signal.emit(
                                 f"Error adding pages from {source_file} to reversed picking PDF: {str(e)}"
                             )
-                            continue
-                    
-                    # Only save if we successfully added pages
-                    if pages_added > 0:
-                        new_pdf.save(str(reversed_output_path))
-                        new_pdf.close()
+                        )
                         
-                        # Verify the file was created
-                        if reversed_output_path.exists():
-                            reversed_created_files.append(output_filename)
-                            self.processing_thread.progress_signal.emit(
-                                f"✓ Successfully created reversed picking {output_filename} with {pages_added} pages"
-                            )
+                        # Only save if we successfully added pages
+                        if pages_added > 0:
+                            new_pdf.save(str(reversed_output_path))
+                            new_pdf.close()
+                            
+                            # Verify the file was created
+                            if reversed_output_path.exists():
+                                reversed_created_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✓ Successfully created reversed picking {output_filename} with {pages_added} pages"
+                                )
+                            else:
+                                reversed_failed_files.append(output_filename)
+                                self.processing_thread.progress_signal.emit(
+                                    f"✗ Failed to create reversed picking {output_filename} - file not found after save"
+                                )
                         else:
+                            new_pdf.close()
                             reversed_failed_files.append(output_filename)
                             self.processing_thread.progress_signal.emit(
-                                f"✗ Failed to create reversed picking {output_filename} - file not found after save"
+                                f"✗ No pages added to reversed picking {output_filename}"
                             )
-                    else:
-                        new_pdf.close()
-                        reversed_failed_files.append(output_filename)
+                            
+                    except Exception as e:
+                        # Count unique orders for error message
+                        unique_orders = len(set(page_info['order_id'] for page_info in pages))
+                        reversed_failed_files.append(f"Driver_{driver_number}_{unique_orders}_Orders.pdf")
                         self.processing_thread.progress_signal.emit(
-                            f"✗ No pages added to reversed picking {output_filename}"
+                            f"✗ Error creating reversed picking PDF for Driver {driver_number}: {str(e)}"
                         )
-                        
-                except Exception as e:
-                    # Count unique orders for error message
-                    unique_orders = len(set(page_info['order_id'] for page_info in pages))
-                    reversed_failed_files.append(f"Driver_{driver_number}_{unique_orders}_Orders.pdf")
-                    self.processing_thread.progress_signal.emit(
-                        f"✗ Error creating reversed picking PDF for Driver {driver_number}: {str(e)}"
-                    )
-                    continue
+                        continue
+                
+            finally:
+                source_documents.close()
             
             # Final summary message
             self.processing_thread.progress_signal.emit("Processing complete!")
@@ -3374,6 +3381,13 @@ class OptimoRouteSorterApp(QMainWindow):
                         f.write(f"  - {order_id} (Driver: {driver_name}, Stop: {stop_number})\n")
                     f.write("\n")
                 
+                if ambiguous_pages:
+                    f.write("⚠ Pages With Multiple Order IDs:\n")
+                    for page_info in ambiguous_pages:
+                        f.write(f"  - Page {page_info['page_num'] + 1} from {Path(page_info['source_file']).name}: "
+                                f"{', '.join(page_info['order_ids'])} (used {page_info['used_order_id']})\n")
+                    f.write("\n")
+                
                 f.write("Driver Page Counts:\n")
                 for driver_number, pages in driver_pages.items():
                     f.write(f"  Driver {driver_number}: {len(pages)} pages\n")
@@ -3406,7 +3420,8 @@ class OptimoRouteSorterApp(QMainWindow):
                 "found_order_ids": list(found_order_ids),
                 "missing_order_ids": list(missing_order_ids),
                 "total_order_ids": len(all_order_ids),
-                "delivery_data_with_drivers": delivery_data_with_drivers
+                "delivery_data_with_drivers": delivery_data_with_drivers,
+                "ambiguous_pages": ambiguous_pages
             }
             
         except Exception as e:
@@ -3896,6 +3911,8 @@ class OptimoRouteSorterApp(QMainWindow):
 
 
 def main():
+    # Required for the text extraction worker processes in the frozen .exe
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = OptimoRouteSorterApp()
     window.show()
@@ -0,0 +1,178 @@
+"""
+Read-through in-memory cache of the orders the scanning station looks up.
+
+Every scan used to query dispatch_orders for the scanned order number,
+adding 150-600 ms between trigger pull and the crate dialog. The cache
+preloads recent orders (the columns the lookup shows) into a dict keyed
+by the normalized order number, at startup and then on a refresh interval
+on a background thread. A lookup is a dict read; numbers that are not
+loaded, or whose entry is older than the TTL, go to the database and are
+cached. When the database cannot be reached a stale entry is still
+served, so scanning keeps working offline.
+
+LatencyHistogram records scan-to-dialog times in fixed buckets.
+"""
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Entries older than this are looked up again
+DEFAULT_TTL = 15 * 60.0
+
+# Seconds between background preloads
+DEFAULT_REFRESH_INTERVAL = 5 * 60.0
+
+# Preload window: orders uploaded the evening before are scanned the next morning
+PRELOAD_HOURS = 36
+
+
+def normalize_order_number(order_number) -> str:
+    """Cache key: upper case without whitespace (scanners and sheets differ in both)"""
+    return "".join(str(order_number).split()).upper()
+
+
+class OrderLookupCache:
+    """Order rows by normalized order number, preloaded and refreshed in the background"""
+
+    def __init__(self, load_orders: Callable[[], List[Dict]], fetch_order: Callable[[str], Optional[Dict]],
+                 ttl: float = DEFAULT_TTL, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        """
+        Args:
+            load_orders: Returns the rows to preload (newest first)
+            fetch_order: Returns the row for one (normalized) order number from the database, or None
+            ttl: Seconds an entry is served without asking the database
+            refresh_interval: Seconds between background preloads
+        """
+        self.load_orders = load_orders
+        self.fetch_order = fetch_order
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.loaded_at: Optional[float] = None
+        self._orders: Dict[str, Tuple[Dict, float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._orders)
+
+    def refresh(self) -> int:
+        """Preload the recent orders; returns the number of orders loaded"""
+        started = time.perf_counter()
+        rows = self.load_orders()
+        now = time.time()
+        orders = {}
+        for row in rows:
+            # One row per order item: keep the first (newest) per order
+            key = normalize_order_number(row.get('ordernumber', ''))
+            if key and key not in orders:
+                orders[key] = (row, now)
+        with self._lock:
+            # Entries fetched on a miss stay until their TTL runs out
+            self._orders = {key: entry for key, entry in self._orders.items() if now - entry[1] < self.ttl}
+            self._orders.update(orders)
+            self.loaded_at = now
+        print(f"📦 Order cache: {len(orders)} orders preloaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return len(orders)
+
+    def get(self, order_number) -> Tuple[Optional[Dict], str]:
+        """
+        The row for an order number and where it came from.
+
+        Returns:
+            (row or None, source) with source 'cache', 'database' or 'stale'
+        """
+        key = normalize_order_number(order_number)
+        now = time.time()
+        with self._lock:
+            entry = self._orders.get(key)
+        if entry is not None and now - entry[1] < self.ttl:
+            self.hits += 1
+            return dict(entry[0]), 'cache'
+
+        self.misses += 1
+        try:
+            # The database is asked for the same normalized number the cache is keyed by
+            row = self.fetch_order(key)
+        except Exception as e:
+            if entry is None:
+                raise
+            # Offline: the last known row is better than no dialog
+            print(f"⚠️ Order lookup failed ({e}) - using cached data for {key}")
+            self.stale_hits += 1
+            return dict(entry[0]), 'stale'
+        if row is None:
+            return None, 'database'
+        with self._lock:
+            self._orders[key] = (row, time.time())
+        return dict(row), 'database'
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Order cache refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def start(self) -> "OrderLookupCache":
+        """Preload now and then every refresh_interval, on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="order-cache-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# Bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class LatencyHistogram:
+    """Counts of latencies in fixed millisecond buckets"""
+
+    def __init__(self, bounds_ms: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = list(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.samples: List[float] = []
+        self._lock = threading.Lock()
+
+    def record(self, milliseconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds_ms, milliseconds)] += 1
+            self.samples.append(milliseconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, share: float) -> float:
+        """Latency below which the given share (0-1) of samples fall"""
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+    def summary_lines(self) -> List[str]:
+        """One line per non-empty bucket with a bar, then the percentiles"""
+        total = len(self.samples)
+        if not total:
+            return ["no samples"]
+        lines = []
+        labels = [f"<= {bound:g} ms" for bound in self.bounds_ms] + [f"> {self.bounds_ms[-1]:g} ms"]
+        for label, count in zip(labels, self.counts):
+            if count:
+                lines.append(f"{label:>12s} {count:5d} {'#' * max(1, round(40 * count / total))}")
+        lines.append(f"p50 {self.percentile(0.5):.0f} ms, p95 {self.percentile(0.95):.0f} ms, "
+                     f"max {max(self.samples):.0f} ms over {total} scans")
+        return lines
@@ -0,0 +1,503 @@
+"""
+Shared order-ID matching for picking-docket page text.
+
+The processors in main.py, optimoroute_sorter_app.py and
+dispatch_scanning_app.py all need to answer the same question for every
+page: "which of tonight's order IDs appear in this text?". Instead of
+scanning the page once per order, an OrderMatcher is built once per run
+from the order set and then finds every order ID on a page in one pass.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# Runs of word characters, the units `\b` boundaries sit between
+WORD_PATTERN = re.compile(r"\w+")
+
+
+# Characters OCR commonly confuses with each other (uppercase, since all
+# matching is case-insensitive). Every character in a group maps to the
+# group's first character in the canonical form. Only a digit and the
+# marks that look like it: merging two digits (6/9) or unrelated letters
+# (C/G, L/J) would give neighbouring order numbers one canonical form.
+OCR_CONFUSION_CLASSES = (
+    "O0DQ",
+    "I1L|",
+    "S5",
+    "B8",
+    "G6",
+    "Z2",
+)
+
+_OCR_CANONICAL_TABLE = str.maketrans({
+    char: group[0] for group in OCR_CONFUSION_CLASSES for char in group
+})
+
+
+def normalize_order_id(order_id) -> str:
+    """Normalize an order ID (or page text) for case-insensitive matching"""
+    if order_id is None:
+        return ""
+    return str(order_id).strip().upper()
+
+
+def canonical_ocr_form(text) -> str:
+    """
+    Collapse OCR-confusable characters so that e.g. 'SO-1OO1', '5O-l001' and
+    'SO-1001' all share one canonical form. The mapping is one character to
+    one character, so offsets in the canonical text match the original.
+    """
+    return str(text).upper().translate(_OCR_CANONICAL_TABLE)
+
+
+# Page tokens for fuzzy matching: whitespace and label punctuation split
+# tokens, so "No:SO-1001," still yields "SO-1001"
+FUZZY_TOKEN_PATTERN = re.compile(r"[^\s:;,()\[\]]+")
+
+
+class OrderMatch(NamedTuple):
+    """A single order ID found in page text"""
+    order_id: str  # Order ID exactly as it appears in the order set
+    start: int     # Offset of the match in the normalized page text
+    end: int
+
+
+class FuzzyOrderMatch(NamedTuple):
+    """An order ID found in page text within a small edit distance"""
+    order_id: str
+    start: int
+    end: int
+    distance: int       # Edits (insert/delete/substitute/transpose) after OCR canonicalization
+    confidence: float   # 1.0 for an exact canonical match, lower per edit
+
+
+class _OrderIndex:
+    """
+    Common bookkeeping for the per-run order indexes.
+
+    Keeps the order IDs in their original form and in the order they were
+    given; the position in that list is the priority used when a page
+    contains more than one order, matching the old "first order in the
+    order set wins" loops.
+    """
+
+    def __init__(self, order_ids: Iterable[str]):
+        self.order_ids: List[str] = []
+        self._priority: Dict[str, int] = {}
+        self._lengths: List[int] = []
+
+        for order_id in order_ids:
+            if order_id is None or order_id in self._priority:
+                continue
+            pattern = normalize_order_id(order_id)
+            if not pattern:
+                # An empty ID would "match" every page
+                continue
+            index = len(self.order_ids)
+            self.order_ids.append(order_id)
+            self._priority[order_id] = index
+            self._lengths.append(len(pattern))
+            self._add_pattern(pattern, index)
+
+    def __len__(self):
+        return len(self.order_ids)
+
+    def _add_pattern(self, pattern: str, index: int):
+        raise NotImplementedError
+
+    def find_all(self, page_text: str) -> List[OrderMatch]:
+        raise NotImplementedError
+
+    def find_order_ids(self, page_text: str) -> List[str]:
+        """Distinct order IDs found on the page, in order-set priority"""
+        found = {match.order_id for match in self.find_all(page_text)}
+        return sorted(found, key=self._priority.__getitem__)
+
+    def best_match(self, page_text: str) -> Optional[OrderMatch]:
+        """
+        The match the old per-order loop would have picked for this page:
+        the first order in the order set whose ID appears in the text
+        (its first occurrence if it appears more than once).
+        """
+        matches = self.find_all(page_text)
+        if not matches:
+            return None
+        return min(matches, key=lambda match: (self._priority[match.order_id], match.start))
+
+    def first_match(self, page_text: str) -> Optional[str]:
+        """Order ID of `best_match`, or None if no order ID is on the page"""
+        match = self.best_match(page_text)
+        return match.order_id if match else None
+
+    def unique_match(self, page_text: str) -> Tuple[Optional[tuple], List[str]]:
+        """
+        The match only when exactly one order ID is found on the page at the
+        closest distance (every match of an exact index is at distance 0).
+        Fuzzy lookups use this instead of `best_match`: a page that is as
+        close to several orders is reported rather than given to one of them.
+
+        Returns:
+            (match or None, distinct order IDs at the closest distance in order-set priority)
+        """
+        matches = self.find_all(page_text)
+        if not matches:
+            return None, []
+        closest = min(getattr(match, 'distance', 0) for match in matches)
+        matches = [match for match in matches if getattr(match, 'distance', 0) == closest]
+        order_ids = sorted({match.order_id for match in matches}, key=self._priority.__getitem__)
+        if len(order_ids) != 1:
+            return None, order_ids
+        return matches[0], order_ids
+
+
+class OrderMatcher(_OrderIndex):
+    """
+    Aho-Corasick automaton over the normalized order IDs of one run.
+
+    Matching is case-insensitive substring matching, the same rule as the
+    old `order_id.upper() in page_text.upper()` loop, but the page text is
+    uppercased once and walked once no matter how many orders there are.
+    """
+
+    def __init__(self, order_ids: Iterable[str]):
+        # Trie / automaton storage: one entry per state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._alphabet = set()
+
+        super().__init__(order_ids)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, index: int):
+        """Insert a normalized order ID into the trie"""
+        state = 0
+        for char in pattern:
+            self._alphabet.add(char)
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self):
+        """Breadth-first construction of failure links and merged outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Inherit matches that end at the failure state (suffix matches)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, page_text: str) -> List[OrderMatch]:
+        """
+        Find every occurrence of every order ID in the page text.
+
+        Returns:
+            List of OrderMatch sorted by position in the page
+        """
+        if not page_text or not self.order_ids:
+            return []
+
+        text = page_text.upper()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        alphabet = self._alphabet
+        order_ids = self.order_ids
+        lengths = self._lengths
+
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            if char not in alphabet:
+                state = 0
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                for index in output[state]:
+                    matches.append(OrderMatch(order_ids[index], end - lengths[index], end))
+
+        matches.sort(key=lambda match: (match.start, match.end))
+        return matches
+
+
+class TokenOrderIndex(_OrderIndex):
+    """
+    Word-boundary order lookup in O(tokens per page).
+
+    Equivalent to `re.search(r'\b' + re.escape(order_id) + r'\b', page_text,
+    re.IGNORECASE)` for every order, but the page is tokenized once and each
+    token costs one dict lookup. Order IDs are keyed by their first word
+    token, so IDs with separators (SO-1001, 12/345) are confirmed by
+    comparing the text that follows the token.
+    """
+
+    def __init__(self, order_ids: Iterable[str]):
+        # Normalized first token -> [(normalized ID, index), ...]
+        self._by_first_token: Dict[str, List[tuple]] = {}
+        # IDs that start or end with punctuation have no word boundary to
+        # anchor on; they keep the regex search (rare in practice)
+        self._regex_patterns: List[tuple] = []
+
+        super().__init__(order_ids)
+
+    def _prepare_text(self, text: str) -> str:
+        """Normalize page text (or an order ID) before tokenizing"""
+        return text.upper()
+
+    def _add_pattern(self, pattern: str, index: int):
+        pattern = self._prepare_text(pattern)
+        first_token = WORD_PATTERN.match(pattern)
+        if first_token and WORD_PATTERN.fullmatch(pattern[-1]):
+            self._by_first_token.setdefault(first_token.group(), []).append((pattern, index))
+        else:
+            regex = re.compile(r"\b" + re.escape(pattern) + r"\b")
+            self._regex_patterns.append((regex, index))
+
+    def find_all(self, page_text: str) -> List[OrderMatch]:
+        """
+        Find every word-bounded occurrence of every order ID in the page text.
+
+        Returns:
+            List of OrderMatch sorted by position in the page
+        """
+        if not page_text or not self.order_ids:
+            return []
+
+        text = self._prepare_text(page_text)
+        by_first_token = self._by_first_token
+        order_ids = self.order_ids
+
+        matches = []
+        for token in WORD_PATTERN.finditer(text):
+            candidates = by_first_token.get(token.group())
+            if not candidates:
+                continue
+            start = token.start()
+            for pattern, index in candidates:
+                end = start + len(pattern)
+                if end == token.end():
+                    matches.append(OrderMatch(order_ids[index], start, end))
+                elif text.startswith(pattern, start) and not WORD_PATTERN.match(text, end):
+                    # Multi-token ID: the rest of the ID follows the token and
+                    # must itself end on a word boundary
+                    matches.append(OrderMatch(order_ids[index], start, end))
+
+        for regex, index in self._regex_patterns:
+            for found in regex.finditer(text):
+                matches.append(OrderMatch(order_ids[index], found.start(), found.end()))
+
+        matches.sort(key=lambda match: (match.start, match.end))
+        return matches
+
+
+class OcrConfusionIndex(TokenOrderIndex):
+    """
+    Word-boundary order lookup that tolerates OCR character confusions.
+
+    Order IDs and page text are both reduced to their canonical OCR form
+    (see OCR_CONFUSION_CLASSES), so a page reading '5O-l0O1' finds order
+    'SO-1001' with the same one-dict-lookup-per-token cost as the exact
+    token index. Several orders can share a canonical form; all of them are
+    returned, and `unique_match` refuses to pick between them.
+    """
+
+    def _prepare_text(self, text: str) -> str:
+        return canonical_ocr_form(text)
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance between a and b, or max_distance + 1
+    as soon as it is known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_minimum = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_minimum = min(row_minimum, value)
+        if row_minimum > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[len(b)]
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    """All strings reachable from word by deleting up to max_distance characters"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        next_frontier -= results
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+class EditDistanceIndex(_OrderIndex):
+    """
+    SymSpell-style deletion-neighbourhood index for OCR'd order numbers.
+
+    Every order ID is stored under all of its deletions up to its allowed
+    edit distance, in canonical OCR form so that character confusions are
+    free and only dropped, extra or wrong characters count as edits. A page
+    token is looked up by generating its own deletions, and the few
+    candidates that share one are verified with a bounded edit distance.
+
+    The allowed distance grows with ID length (see `allowed_distance`) so
+    short IDs are not matched by unrelated short words. Token results are
+    memoized for the life of the index, and picking-docket boilerplate
+    repeats on every page, so most tokens cost a single dict lookup.
+    """
+
+    def __init__(self, order_ids: Iterable[str], max_distance: int = 2):
+        self.max_distance = max_distance
+        self._deletes: Dict[str, List[int]] = {}
+        self._canonical: List[str] = []
+        self._token_cache: Dict[str, List[tuple]] = {}
+        self._min_length = None
+        self._max_length = 0
+
+        super().__init__(order_ids)
+
+    def allowed_distance(self, length: int) -> int:
+        """Edits tolerated for an order ID of the given length"""
+        return min(self.max_distance, length // 4)
+
+    def _add_pattern(self, pattern: str, index: int):
+        canonical = canonical_ocr_form(pattern)
+        self._canonical.append(canonical)
+        length = len(canonical)
+        self._min_length = length if self._min_length is None else min(self._min_length, length)
+        self._max_length = max(self._max_length, length)
+        for deleted in _deletes(canonical, self.allowed_distance(length)):
+            self._deletes.setdefault(deleted, []).append(index)
+
+    def lookup(self, token: str) -> List[tuple]:
+        """
+        Orders within their allowed edit distance of a single token.
+
+        Returns:
+            List of (index, distance) tuples
+        """
+        canonical = canonical_ocr_form(token)
+        cached = self._token_cache.get(canonical)
+        if cached is not None:
+            return cached
+
+        results = []
+        length = len(canonical)
+        if self._min_length is not None and \
+                self._min_length - self.max_distance <= length <= self._max_length + self.max_distance:
+            seen = set()
+            for deleted in _deletes(canonical, self.max_distance):
+                for index in self._deletes.get(deleted, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    candidate = self._canonical[index]
+                    allowed = self.allowed_distance(len(candidate))
+                    distance = bounded_edit_distance(canonical, candidate, allowed)
+                    if distance <= allowed:
+                        results.append((index, distance))
+
+        self._token_cache[canonical] = results
+        return results
+
+    def find_all(self, page_text: str) -> List[FuzzyOrderMatch]:
+        """
+        Find every page token within edit distance of an order ID.
+
+        Returns:
+            List of FuzzyOrderMatch sorted by position in the page
+        """
+        if not page_text or not self.order_ids:
+            return []
+
+        text = page_text.upper()
+        matches = []
+        for token in FUZZY_TOKEN_PATTERN.finditer(text):
+            # Trim punctuation hanging off either end ("SO-1001." / "#SO-1001")
+            start, end = token.start(), token.end()
+            while start < end and not WORD_PATTERN.match(text, start) and text[start] != "|":
+                start += 1
+            while end > start and not WORD_PATTERN.match(text[end - 1]) and text[end - 1] != "|":
+                end -= 1
+            if start == end:
+                continue
+            for index, distance in self.lookup(text[start:end]):
+                confidence = 1.0 - distance / max(self._lengths[index], 1)
+                matches.append(FuzzyOrderMatch(self.order_ids[index], start, end, distance, confidence))
+
+        matches.sort(key=lambda match: (match.start, match.end))
+        return matches
+
+    def ranked_matches(self, page_text: str) -> List[FuzzyOrderMatch]:
+        """
+        Matches best first. Tie-break rule: fewest edits, then highest
+        confidence (the longer order ID), then order-set priority, then
+        position on the page.
+        """
+        return sorted(
+            self.find_all(page_text),
+            key=lambda match: (match.distance, -match.confidence,
+                               self._priority[match.order_id], match.start)
+        )
+
+    def best_match(self, page_text: str) -> Optional[FuzzyOrderMatch]:
+        """Top match by the `ranked_matches` tie-break rule"""
+        ranked = self.ranked_matches(page_text)
+        return ranked[0] if ranked else None
+
+
+class PageOrderMatch(NamedTuple):
+    """The order a page belongs to, decided from that page's text alone"""
+    order_id: Optional[str]     # None when no order ID is on the page
+    exact: bool                 # Found by substring match (else by word boundary)
+    word_matches: List[str]     # Every word-bounded order ID on the page, in order-set priority
+
+
+def match_page_order(page_text: str, order_matcher: OrderMatcher,
+                     token_index: TokenOrderIndex) -> PageOrderMatch:
+    """
+    The exact match if any, else the first word-boundary match. Nothing
+    carries over from the previous page: a page without an order ID gets
+    None, never the order of the page before it.
+    """
+    word_matches = token_index.find_order_ids(page_text)
+    order_id = order_matcher.first_match(page_text)
+    if order_id:
+        return PageOrderMatch(order_id, True, word_matches)
+    return PageOrderMatch(word_matches[0] if word_matches else None, False, word_matches)
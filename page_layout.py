@@ -0,0 +1,122 @@
+"""
+Text spans of one page, indexed for region lookups.
+
+The unified flow pulled each configured region out of the text layer with
+its own `page.get_text("dict")` call, parsing the full page layout once
+per region and building a fitz.Rect per span per region. PageLayout parses
+the page once.
+
+texts_in_rects answers every configured region of a page in one call: the
+span boxes sit in one NumPy array and the overlap shares against all
+regions are computed by broadcasting. This is what the unified flow uses.
+Single-region lookups (text_in_rect) bucket the span boxes into a coarse
+grid, so a region only tests the spans in the grid cells it covers; the
+grid is built on the first such lookup, not for every page.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Grid cell size in PDF points; a docket region covers a handful of cells
+CELL_SIZE = 64.0
+
+
+class Span(NamedTuple):
+    """One text span and its bounding box"""
+    text: str
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+
+def overlap_share(span: Span, x0: float, y0: float, x1: float, y1: float) -> float:
+    """Share of the span's area inside the rectangle (0 for empty spans)"""
+    span_area = (span.x1 - span.x0) * (span.y1 - span.y0)
+    if span_area <= 0:
+        return 0.0
+    overlap_width = min(span.x1, x1) - max(span.x0, x0)
+    overlap_height = min(span.y1, y1) - max(span.y0, y0)
+    if overlap_width <= 0 or overlap_height <= 0:
+        return 0.0
+    return overlap_width * overlap_height / span_area
+
+
+class PageLayout:
+    """Spans of one page, with a grid index over their boxes built on demand"""
+
+    def __init__(self, spans: List[Span], cell_size: float = CELL_SIZE):
+        self.spans = spans
+        self.cell_size = cell_size
+        self.boxes = np.array([span[1:] for span in spans], dtype=np.float64).reshape(len(spans), 4)
+        self._grid: Optional[Dict[Tuple[int, int], List[int]]] = None
+
+    def _grid_index(self) -> Dict[Tuple[int, int], List[int]]:
+        if self._grid is None:
+            grid = defaultdict(list)
+            for index, span in enumerate(self.spans):
+                for cell in self._cells(span.x0, span.y0, span.x1, span.y1):
+                    grid[cell].append(index)
+            self._grid = grid
+        return self._grid
+
+    @classmethod
+    def from_page(cls, page, cell_size: float = CELL_SIZE) -> "PageLayout":
+        """Parse the page's text layer once"""
+        spans = []
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", ()):
+                for span in line["spans"]:
+                    if span["text"].strip():
+                        spans.append(Span(span["text"], *span["bbox"]))
+        return cls(spans, cell_size)
+
+    def _cells(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for cell_x in range(int(x0 // size), int(x1 // size) + 1):
+            for cell_y in range(int(y0 // size), int(y1 // size) + 1):
+                yield cell_x, cell_y
+
+    def spans_in_rect(self, rect, min_overlap: float = 0.5) -> List[Span]:
+        """
+        Spans with more than min_overlap of their area inside rect, in page
+        order. rect needs x0, y0, x1, y1 (e.g. a fitz.Rect).
+        """
+        x0, y0, x1, y1 = rect.x0, rect.y0, rect.x1, rect.y1
+        grid = self._grid_index()
+        candidates = set()
+        for cell in self._cells(x0, y0, x1, y1):
+            candidates.update(grid.get(cell, ()))
+        return [self.spans[index] for index in sorted(candidates)
+                if overlap_share(self.spans[index], x0, y0, x1, y1) > min_overlap]
+
+    def text_in_rect(self, rect) -> str:
+        """Text of the spans mostly inside rect, joined with spaces"""
+        return " ".join(span.text for span in self.spans_in_rect(rect)).strip()
+
+    def overlap_shares(self, rects: Sequence) -> np.ndarray:
+        """
+        Share of each span's area inside each rect, shape (regions, spans).
+        rects are fitz.Rects or (x0, y0, x1, y1) sequences.
+        """
+        regions = np.array([(rect.x0, rect.y0, rect.x1, rect.y1) if hasattr(rect, "x0") else tuple(rect)
+                            for rect in rects], dtype=np.float64).reshape(len(rects), 4)
+        spans = self.boxes[np.newaxis, :, :]
+        regions = regions[:, np.newaxis, :]
+        overlap_width = np.minimum(spans[..., 2], regions[..., 2]) - np.maximum(spans[..., 0], regions[..., 0])
+        overlap_height = np.minimum(spans[..., 3], regions[..., 3]) - np.maximum(spans[..., 1], regions[..., 1])
+        overlap_area = np.clip(overlap_width, 0, None) * np.clip(overlap_height, 0, None)
+        span_area = (self.boxes[:, 2] - self.boxes[:, 0]) * (self.boxes[:, 3] - self.boxes[:, 1])
+        # Empty spans never count, as in overlap_share
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(span_area > 0, overlap_area / span_area, 0.0)
+
+    def texts_in_rects(self, rects: Sequence, min_overlap: float = 0.5) -> List[str]:
+        """Text of every rect in one pass, same result as text_in_rect for each"""
+        if not self.spans or not len(rects):
+            return [""] * len(rects)
+        inside = self.overlap_shares(rects) > min_overlap
+        return [" ".join(self.spans[index].text for index in np.flatnonzero(row)).strip()
+                for row in inside]
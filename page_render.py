@@ -0,0 +1,69 @@
+"""
+Page rendering for OCR.
+
+The OCR fallbacks used to render with `page.get_pixmap()`, encode the
+pixmap to PNG with `pix.tobytes("png")` and decode it again with
+`Image.open(io.BytesIO(...))` - a full PNG compress and decompress of
+every page render before Tesseract saw a pixel. The helpers here build
+the PIL image (or NumPy array) from `pix.samples`, the raw pixels (a
+plain bytes copy, no encoding), and render in grayscale, a third of the
+RGB size, which is all Tesseract uses anyway.
+"""
+
+import fitz  # PyMuPDF
+
+# 3x the PDF's 72 DPI, the zoom of the dispatch app's region OCR. The page
+# text extraction of main.py and the sorter keeps its 2x (ocr_zoom=2).
+DEFAULT_OCR_DPI = 216
+
+
+def zoom_to_dpi(zoom: float) -> int:
+    """DPI of a render at this zoom factor"""
+    return int(round(72 * zoom))
+
+
+def render_scale(dpi: int) -> float:
+    """Image pixels per PDF point at this DPI"""
+    return dpi / 72.0
+
+
+def render_pixmap(page, dpi: int = DEFAULT_OCR_DPI, clip=None, grayscale: bool = True):
+    """Render a page (or the clip rectangle of it) without alpha"""
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    return page.get_pixmap(dpi=dpi, clip=clip, colorspace=colorspace, alpha=False)
+
+
+def pixmap_to_image(pix):
+    """PIL image of the pixmap's samples: one bytes copy, no PNG round trip"""
+    from PIL import Image
+
+    if pix.alpha or pix.n not in (1, 3):
+        # CMYK or alpha renders: let PyMuPDF convert to plain RGB first
+        pix = fitz.Pixmap(fitz.csRGB, pix, 0)
+    mode = "L" if pix.n == 1 else "RGB"
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples, "raw", mode, pix.stride, 1)
+
+
+def pixmap_to_array(pix):
+    """NumPy array (height, width, channels) over a bytes copy of the pixmap's samples"""
+    import numpy as np
+
+    samples = np.frombuffer(pix.samples, dtype=np.uint8)
+    rows = samples.reshape(pix.height, pix.stride)
+    return rows[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+
+
+def render_page_image(page, dpi: int = DEFAULT_OCR_DPI, clip=None, grayscale: bool = True):
+    """
+    Render a page (or a clip of it) straight into a PIL image for OCR.
+
+    Args:
+        page: fitz page
+        dpi: Render resolution
+        clip: Optional fitz.Rect in page coordinates
+        grayscale: Render one gray channel instead of RGB
+
+    Returns:
+        PIL image ("L" or "RGB")
+    """
+    return pixmap_to_image(render_pixmap(page, dpi, clip, grayscale))
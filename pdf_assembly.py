@@ -0,0 +1,115 @@
+"""
+Helpers for assembling driver / route PDFs from picking-docket pages.
+
+The assembly loops used to `fitz.open()` and `close()` the source PDF for
+every page they copied, so a 200-page driver file reparsed the same large
+docket PDF 200 times. A SourceDocumentCache keeps source documents open for
+the lifetime of one assembly run, and `append_pages` copies contiguous page
+runs with a single `insert_pdf` call.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# Open source documents kept per assembly run; the oldest is closed first
+DEFAULT_MAX_OPEN_DOCUMENTS = 16
+
+
+class SourceDocumentCache:
+    """
+    LRU cache of open source PDFs, shared by every output file of one run.
+
+    Use as a context manager, or call close() when the run is finished.
+    """
+
+    def __init__(self, max_open: int = DEFAULT_MAX_OPEN_DOCUMENTS):
+        self.max_open = max(1, max_open)
+        self._documents: "OrderedDict[str, fitz.Document]" = OrderedDict()
+        self.opens = 0
+        self.hits = 0
+
+    def get(self, pdf_path) -> fitz.Document:
+        """Return the open document for pdf_path, opening it on first use"""
+        key = str(pdf_path)
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return document
+
+        document = fitz.open(key)
+        self.opens += 1
+        self._documents[key] = document
+        while len(self._documents) > self.max_open:
+            _, evicted = self._documents.popitem(last=False)
+            evicted.close()
+        return document
+
+    def close(self):
+        """Close every cached document"""
+        while self._documents:
+            _, document = self._documents.popitem(last=False)
+            try:
+                document.close()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def page_runs(pages: Iterable[Tuple[str, int]]) -> List[Tuple[str, int, int]]:
+    """
+    Collapse an ordered sequence of (pdf_path, page_num) into runs of
+    consecutive pages from the same file, as (pdf_path, from_page, to_page).
+    Descending runs are kept too (from_page > to_page), which insert_pdf
+    copies in reverse order - the reversed picking PDFs produce those.
+    """
+    runs = []
+    for pdf_path, page_num in pages:
+        if runs:
+            run_path, from_page, to_page = runs[-1]
+            step = to_page - from_page
+            if run_path == pdf_path:
+                if page_num == to_page + 1 and step >= 0:
+                    runs[-1] = (run_path, from_page, page_num)
+                    continue
+                if page_num == to_page - 1 and step <= 0:
+                    runs[-1] = (run_path, from_page, page_num)
+                    continue
+        runs.append((pdf_path, page_num, page_num))
+    return runs
+
+
+def append_pages(out_doc: fitz.Document,
+                 pages: Iterable[Tuple[str, int]],
+                 source_documents: SourceDocumentCache,
+                 on_error: Optional[Callable[[str, Exception], None]] = None) -> int:
+    """
+    Append source pages to out_doc in the given order.
+
+    Args:
+        out_doc: Output document
+        pages: (pdf_path, page_num) pairs, 0-based page numbers
+        source_documents: Cache of open source documents for this run
+        on_error: Called with (pdf_path, exception) for a run that could not
+            be copied; the run is skipped and assembly continues
+
+    Returns:
+        Number of pages added
+    """
+    pages_added = 0
+    for pdf_path, from_page, to_page in page_runs(pages):
+        try:
+            out_doc.insert_pdf(source_documents.get(pdf_path), from_page=from_page, to_page=to_page)
+            pages_added += abs(to_page - from_page) + 1
+        except Exception as e:
+            if on_error:
+                on_error(pdf_path, e)
+    return pages_added
@@ -0,0 +1,284 @@
+"""
+Parallel page text extraction for picking-docket PDFs.
+
+The PDF processors used to open each file and call `page.get_text()` (plus
+the OCR fallback) page by page inside their ProcessingThread, keeping one
+core busy. `extract_pdf_texts` splits the files into (file, page range)
+chunks and spreads them over a process pool; every worker opens its own
+fitz document and sends back compact per-page records, which are put back
+in file/page order so matching and PDF assembly stay deterministic.
+Pages found in the extraction cache are not sent to the workers at all.
+Documents whose text layer is empty or junk (see text_layer) are OCRed
+page by page without trusting get_text().
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import fitz  # PyMuPDF
+
+from extraction_cache import ExtractionCache, FULL_PAGE, file_sha256
+from ocr_service import get_engine
+from page_render import render_page_image, zoom_to_dpi
+from text_layer import TEXT_LAYER_GOOD, document_text_layer
+
+# Fewer pages than this per chunk and the cost of opening the document in
+# the worker outweighs the extraction itself
+MIN_PAGES_PER_CHUNK = 10
+
+# Below this many pages in total a process pool is not worth starting
+MIN_PAGES_FOR_POOL = 40
+
+
+class PageText(NamedTuple):
+    """Text extracted from one page"""
+    page_num: int               # 0-based page index
+    text: str
+    ocr_used: bool = False      # Text came from the OCR fallback
+    ocr_error: Optional[str] = None
+
+
+class PdfText(NamedTuple):
+    """Text of every page of one PDF, or the error that stopped it opening"""
+    pdf_path: str
+    pages: List[PageText]
+    error: Optional[str] = None
+
+
+class ExtractionOptions(NamedTuple):
+    """Settings passed to every worker (must stay picklable)"""
+    ocr_zoom: float = 2.0                       # Render scale for the OCR fallback
+    ocr_psm_modes: Optional[tuple] = None       # Tesseract PSM cascade, None = default call
+    tesseract_cmd: Optional[str] = None         # Tesseract path configured in the parent
+
+
+def _ocr_page(page, options: ExtractionOptions) -> str:
+    """Render a page and OCR it, trying each PSM mode until one returns text"""
+    img = render_page_image(page, dpi=zoom_to_dpi(options.ocr_zoom))
+
+    # The worker's engine stays loaded between pages (see ocr_service)
+    result = get_engine(options.tesseract_cmd).recognize(img, options.ocr_psm_modes or (None,))
+    if result.error:
+        # Every attempt failed (e.g. Tesseract missing): report it and keep it out of the cache
+        raise RuntimeError(result.error)
+    return result.text
+
+
+def _extract_page(page, page_num: int, options: ExtractionOptions,
+                  text_layer: str = TEXT_LAYER_GOOD) -> PageText:
+    """
+    Text layer first, OCR only when the page has no text at all; documents
+    without a good text layer go to OCR directly.
+    """
+    page_text = page.get_text()
+    if text_layer == TEXT_LAYER_GOOD and page_text.strip():
+        return PageText(page_num, page_text)
+
+    try:
+        ocr_text = _ocr_page(page, options)
+    except Exception as ocr_error:
+        # Junk text is still better than nothing, but is not cached
+        return PageText(page_num, page_text if page_text.strip() else "", ocr_error=str(ocr_error))
+
+    if ocr_text.strip():
+        return PageText(page_num, ocr_text, ocr_used=True)
+    return PageText(page_num, page_text)
+
+
+def extract_page_range(pdf_path: str, first_page: int, last_page: int,
+                       options: ExtractionOptions, text_layer: str = TEXT_LAYER_GOOD) -> List[PageText]:
+    """
+    Extract pages first_page..last_page (inclusive) of one PDF.
+
+    This is the unit of work sent to pool workers, so it opens and closes
+    its own document.
+    """
+    document = fitz.open(pdf_path)
+    try:
+        return [_extract_page(document[page_num], page_num, options, text_layer)
+                for page_num in range(first_page, last_page + 1)]
+    finally:
+        document.close()
+
+
+def page_ranges(page_nums: Sequence[int]) -> List[tuple]:
+    """Collapse sorted page numbers into inclusive (first_page, last_page) ranges"""
+    ranges = []
+    for page_num in page_nums:
+        if ranges and ranges[-1][1] == page_num - 1:
+            ranges[-1] = (ranges[-1][0], page_num)
+        else:
+            ranges.append((page_num, page_num))
+    return ranges
+
+
+def plan_chunks(pages_to_extract: Dict[str, Sequence[int]], workers: int) -> List[tuple]:
+    """
+    Split the pages to extract into (pdf_path, first_page, last_page)
+    chunks, aiming for a few chunks per worker so a slow (OCR-heavy) chunk
+    does not leave the other cores idle at the end of the run.
+    """
+    total_pages = sum(len(page_nums) for page_nums in pages_to_extract.values())
+    pages_per_chunk = max(MIN_PAGES_PER_CHUNK, -(-total_pages // max(workers * 4, 1)))
+
+    chunks = []
+    for pdf_path, page_nums in pages_to_extract.items():
+        for first_page, last_page in page_ranges(page_nums):
+            for chunk_first in range(first_page, last_page + 1, pages_per_chunk):
+                chunks.append((pdf_path, chunk_first, min(chunk_first + pages_per_chunk - 1, last_page)))
+    return chunks
+
+
+def extraction_mode(options: ExtractionOptions) -> str:
+    """Extraction cache mode for these options (text layer, then OCR fallback)"""
+    psm_modes = ",".join(str(psm_mode) for psm_mode in options.ocr_psm_modes) if options.ocr_psm_modes else "default"
+    return f"page-text:ocr-zoom={options.ocr_zoom}:gray:psm={psm_modes}"
+
+
+def extract_pdf_texts(pdf_files: Sequence[str],
+                      ocr_zoom: float = 2.0,
+                      ocr_psm_modes: Optional[Sequence[int]] = None,
+                      tesseract_cmd: Optional[str] = None,
+                      max_workers: Optional[int] = None,
+                      progress_callback: Optional[Callable[[str], None]] = None,
+                      cache: Optional[ExtractionCache] = None) -> Dict[str, PdfText]:
+    """
+    Extract the text of every page of every PDF, in parallel where it pays.
+
+    Args:
+        pdf_files: PDF paths, in processing order
+        ocr_zoom: Render scale for pages without a text layer
+        ocr_psm_modes: Tesseract PSM modes to try in order (None = one default call)
+        tesseract_cmd: Tesseract executable, forwarded to the workers
+        max_workers: Worker processes (default: one per core)
+        progress_callback: Called with human-readable progress messages
+        cache: Extraction cache; pages extracted by an earlier run are not extracted again
+
+    Returns:
+        Dict of pdf_path -> PdfText, pages in page order
+    """
+    def report(message):
+        if progress_callback:
+            progress_callback(message)
+
+    options = ExtractionOptions(ocr_zoom, tuple(ocr_psm_modes) if ocr_psm_modes else None, tesseract_cmd)
+    start_time = time.perf_counter()
+
+    # Page counts come from the parent so chunking is known up front;
+    # unreadable files are reported per file, as before
+    results: Dict[str, PdfText] = {}
+    page_counts: Dict[str, int] = {}
+    for pdf_path in pdf_files:
+        try:
+            document = fitz.open(pdf_path)
+            page_counts[pdf_path] = len(document)
+            document.close()
+        except Exception as e:
+            results[pdf_path] = PdfText(pdf_path, [], str(e))
+
+    # Pages cached by an earlier run of any of the apps are taken as they are
+    mode = extraction_mode(options)
+    file_hashes: Dict[str, str] = {}
+    cached_pages: Dict[str, List[PageText]] = {pdf_path: [] for pdf_path in page_counts}
+    pages_to_extract: Dict[str, List[int]] = {}
+    for pdf_path, page_count in page_counts.items():
+        cached = {}
+        if cache is not None:
+            try:
+                file_hashes[pdf_path] = file_sha256(pdf_path)
+                cached = cache.get_pages(file_hashes[pdf_path], mode)
+            except OSError:
+                pass
+        cached_pages[pdf_path] = [PageText(page_num, entry.text, entry.ocr_used)
+                                  for page_num, entry in cached.items() if page_num < page_count]
+        pages_to_extract[pdf_path] = [page_num for page_num in range(page_count) if page_num not in cached]
+
+    # Decide once per document whether its text layer can be trusted
+    text_layers: Dict[str, str] = {}
+    for pdf_path, page_nums in pages_to_extract.items():
+        if not page_nums:
+            continue
+        try:
+            document = fitz.open(pdf_path)
+            try:
+                text_layers[pdf_path] = document_text_layer(document, file_hashes.get(pdf_path), cache)
+            finally:
+                document.close()
+        except Exception:
+            text_layers[pdf_path] = TEXT_LAYER_GOOD
+        if text_layers[pdf_path] != TEXT_LAYER_GOOD:
+            report(f"🔎 {os.path.basename(pdf_path)}: text layer is {text_layers[pdf_path]} - OCRing every page")
+
+    cached_count = sum(len(pages) for pages in cached_pages.values())
+    if cached_count:
+        report(f"♻️ Reusing cached text for {cached_count} pages")
+
+    total_pages = sum(len(page_nums) for page_nums in pages_to_extract.values())
+    workers = max_workers or os.cpu_count() or 1
+    chunks = plan_chunks(pages_to_extract, workers)
+    workers = min(workers, len(chunks))
+
+    pages_by_file: Dict[str, List[PageText]] = {pdf_path: [] for pdf_path in page_counts}
+    errors: Dict[str, str] = {}
+    pages_done = 0
+
+    def collect(chunk, chunk_pages=None, error=None):
+        nonlocal pages_done
+        pdf_path, first_page, last_page = chunk
+        if error is not None:
+            errors.setdefault(pdf_path, error)
+        else:
+            pages_by_file[pdf_path].extend(chunk_pages)
+        pages_done += last_page - first_page + 1
+        elapsed = time.perf_counter() - start_time
+        rate = pages_done / elapsed if elapsed > 0 else 0.0
+        report(f"Extracted text from {pages_done}/{total_pages} pages ({rate:.1f} pages/sec)")
+
+    use_pool = workers > 1 and total_pages >= MIN_PAGES_FOR_POOL
+    if use_pool:
+        report(f"Extracting text from {total_pages} pages with {workers} worker processes...")
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(extract_page_range, *chunk, options, text_layers[chunk[0]]): chunk
+                           for chunk in chunks}
+                for future in as_completed(futures):
+                    try:
+                        collect(futures[future], future.result())
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        collect(futures[future], error=str(e))
+        except Exception as pool_error:
+            # No usable process pool (e.g. a broken worker): start over in this process
+            report(f"⚠️ Parallel extraction unavailable ({pool_error}) - continuing in a single process")
+            pages_by_file = {pdf_path: [] for pdf_path in page_counts}
+            errors.clear()
+            pages_done = 0
+            use_pool = False
+
+    if not use_pool:
+        for chunk in chunks:
+            try:
+                collect(chunk, extract_page_range(*chunk, options, text_layers[chunk[0]]))
+            except Exception as e:
+                collect(chunk, error=str(e))
+
+    # Store what was extracted; pages whose OCR failed are retried next time
+    if cache is not None:
+        cache.put_many((file_hashes[pdf_path], page.page_num, FULL_PAGE, mode, page.text, page.ocr_used)
+                       for pdf_path, pages in pages_by_file.items() if pdf_path in file_hashes
+                       for page in pages if page.ocr_error is None)
+
+    for pdf_path in page_counts:
+        pages = sorted(pages_by_file[pdf_path] + cached_pages[pdf_path], key=lambda page: page.page_num)
+        results[pdf_path] = PdfText(pdf_path, pages, errors.get(pdf_path))
+
+    elapsed = time.perf_counter() - start_time
+    if total_pages and elapsed > 0:
+        report(f"Text extraction finished: {total_pages} pages in {elapsed:.1f}s ({total_pages / elapsed:.1f} pages/sec)")
+
+    # Keep the caller's file order
+    return {pdf_path: results[pdf_path] for pdf_path in pdf_files if pdf_path in results}
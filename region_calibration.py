@@ -0,0 +1,228 @@
+"""
+Anchor-based calibration of the OCR regions per picking-sheet layout.
+
+Region coordinates are fixed in app_data/ocr_config.json. When the ERP
+shifts its layout by a few points the text-layer extraction silently
+returns empty strings and every region falls back to slow OCR. The
+calibrator finds anchor strings ("Total Items Delivered:", the order
+number label) with `page.search_for` and moves each region by the shift
+of the anchor nearest to it vertically, so header and footer regions
+follow their own anchors.
+
+Anchor reference positions are learned from the first document whose
+anchors lie inside their configured regions. Offsets are stored per
+layout fingerprint (producer, page size, rotation and fonts - all cheap
+to read) in app_data/region_calibration.json. A document with a known
+fingerprint only checks one anchor with a search clipped to the spot it
+is expected at; the full-page search runs when that check fails, i.e.
+when the ERP moved the layout without changing anything else.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+from app_paths import app_data_dir
+
+# Shifts smaller than this (in points) are rendering noise, not a layout change
+MIN_SHIFT = 0.5
+
+# Pages searched for anchors before a document is left uncalibrated
+MAX_SEARCH_PAGES = 3
+
+
+class Anchor(NamedTuple):
+    """A fixed label printed inside one of the regions"""
+    text: str
+    region_name: str
+
+
+DEFAULT_ANCHORS = (
+    Anchor("Total Items Delivered:", "Region 4"),
+    Anchor("Our Order No", "Region 2"),
+)
+
+
+class CalibrationResult(NamedTuple):
+    """Regions for one document and how they were obtained"""
+    regions: List[dict]                         # Copies of the region dicts with shifted coordinates
+    offsets: Dict[str, Tuple[float, float]]     # Region name -> (dx, dy) applied
+    fingerprint: Optional[str]
+    from_cache: bool = False
+
+    @property
+    def shifted(self) -> bool:
+        return any(dx or dy for dx, dy in self.offsets.values())
+
+
+def regions_key(regions: Sequence[dict]) -> str:
+    """Identity of a region configuration: learned references belong to it"""
+    coordinates = sorted((region['name'], tuple(region['coordinates'])) for region in regions)
+    return hashlib.sha1(repr(coordinates).encode("utf-8")).hexdigest()[:16]
+
+
+def layout_fingerprint(document, page) -> str:
+    """Cheap layout identity: producer, page geometry and the fonts the page uses"""
+    metadata = document.metadata or {}
+    # Subset prefixes ("ABCDEF+Arial") change from file to file
+    fonts = sorted({font[3].split("+")[-1] for font in page.get_fonts()})
+    parts = [metadata.get("producer") or "", metadata.get("creator") or "",
+             f"{page.rect.width:.0f}x{page.rect.height:.0f}", str(page.rotation)] + fonts
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _inside(anchor_rect, coordinates) -> bool:
+    x0, y0, x1, y1 = coordinates
+    return (anchor_rect.x0 >= x0 and anchor_rect.y0 >= y0
+            and anchor_rect.x1 <= x1 and anchor_rect.y1 <= y1)
+
+
+class RegionCalibrator:
+    """Shifts the configured regions to each document's layout"""
+
+    def __init__(self, store_path=None, anchors: Sequence[Anchor] = DEFAULT_ANCHORS):
+        self.store_path = Path(store_path) if store_path else app_data_dir() / "region_calibration.json"
+        self.anchors = tuple(anchors)
+        self.searches = 0
+        self.cache_hits = 0
+        self.checks = 0
+        self._lock = threading.Lock()
+        self._store = {"references": {}, "offsets": {}}
+        try:
+            if self.store_path.exists():
+                with open(self.store_path, 'r') as f:
+                    stored = json.load(f)
+                self._store["references"].update(stored.get("references", {}))
+                self._store["offsets"].update(stored.get("offsets", {}))
+        except (OSError, ValueError) as e:
+            print(f"Error loading region calibration: {e}")
+
+    def _save(self):
+        try:
+            with open(self.store_path, 'w') as f:
+                json.dump(self._store, f, indent=2)
+        except OSError as e:
+            print(f"Error saving region calibration: {e}")
+
+    def find_anchors(self, document) -> Tuple[Optional[int], Dict[str, tuple]]:
+        """(page number, anchor text -> found rect) on the first page with any anchor"""
+        for page_num in range(min(MAX_SEARCH_PAGES, len(document))):
+            page = document[page_num]
+            found = {}
+            for anchor in self.anchors:
+                hits = page.search_for(anchor.text)
+                if hits:
+                    found[anchor.text] = hits[0]
+            if found:
+                return page_num, found
+        return None, {}
+
+    def calibrate(self, document, regions: Sequence[dict]) -> CalibrationResult:
+        """
+        Regions for one open fitz document.
+
+        Args:
+            document: fitz document
+            regions: Configured region dicts ('name', 'coordinates', ...)
+
+        Returns:
+            CalibrationResult; regions are unchanged when no anchor is found
+        """
+        regions = list(regions)
+        if not len(document):
+            return CalibrationResult(regions, {}, None)
+
+        config_key = regions_key(regions)
+        fingerprint = layout_fingerprint(document, document[0])
+        offsets_key = f"{config_key}:{fingerprint}"
+
+        with self._lock:
+            cached = self._store["offsets"].get(offsets_key)
+        if cached is not None and self._check_passes(document, cached.get("check")):
+            self.cache_hits += 1
+            offsets = {name: tuple(offset) for name, offset in cached["offsets"].items()}
+            return CalibrationResult(self._shift(regions, offsets), offsets, fingerprint, from_cache=True)
+
+        self.searches += 1
+        page_num, found = self.find_anchors(document)
+        if not found:
+            # Nothing to go on (e.g. an image-only document): not cached, the next one may have anchors
+            return CalibrationResult(regions, {}, fingerprint)
+
+        with self._lock:
+            references = self._store["references"].setdefault(config_key, {})
+            regions_by_name = {region['name']: region for region in regions}
+            # Learn where anchors sit while they are still inside their configured regions
+            for anchor in self.anchors:
+                anchor_rect = found.get(anchor.text)
+                region = regions_by_name.get(anchor.region_name)
+                if anchor.text not in references and anchor_rect is not None and region is not None \
+                        and _inside(anchor_rect, region['coordinates']):
+                    references[anchor.text] = [anchor_rect.x0, anchor_rect.y0]
+
+            deltas = {}
+            for anchor_text, (ref_x, ref_y) in references.items():
+                anchor_rect = found.get(anchor_text)
+                if anchor_rect is not None:
+                    deltas[anchor_text] = (ref_y, anchor_rect.x0 - ref_x, anchor_rect.y0 - ref_y)
+
+            offsets = {}
+            for region in regions:
+                offsets[region['name']] = self._nearest_offset(region, deltas)
+            # The first anchor found is what later documents with this fingerprint are checked against
+            anchor_text, anchor_rect = next(iter(found.items()))
+            check = [page_num, anchor_text, anchor_rect.x0, anchor_rect.y0, anchor_rect.x1, anchor_rect.y1]
+            self._store["offsets"][offsets_key] = {"offsets": offsets, "check": check}
+            self._save()
+        return CalibrationResult(self._shift(regions, offsets), offsets, fingerprint)
+
+    def _check_passes(self, document, check) -> bool:
+        """The cached anchor is still where it was when the offsets were stored"""
+        if not check or check[0] >= len(document):
+            return False
+        page_num, anchor_text, x0, y0, x1, y1 = check
+        self.checks += 1
+        clip = fitz.Rect(x0, y0, x1, y1) + (-MIN_SHIFT, -MIN_SHIFT, MIN_SHIFT, MIN_SHIFT)
+        # Clipped searches also report hits that only overlap the clip, so compare positions
+        return any(abs(hit.x0 - x0) < MIN_SHIFT and abs(hit.y0 - y0) < MIN_SHIFT
+                   for hit in document[page_num].search_for(anchor_text, clip=clip))
+
+    @staticmethod
+    def _nearest_offset(region, deltas) -> Tuple[float, float]:
+        """Shift of the anchor closest to the region's vertical centre"""
+        if not deltas:
+            return (0.0, 0.0)
+        _, y0, _, y1 = region['coordinates']
+        centre = (y0 + y1) / 2
+        _, dx, dy = min(deltas.values(), key=lambda delta: abs(delta[0] - centre))
+        dx = round(dx, 2) if abs(dx) >= MIN_SHIFT else 0.0
+        dy = round(dy, 2) if abs(dy) >= MIN_SHIFT else 0.0
+        return (dx, dy)
+
+    @staticmethod
+    def _shift(regions: Sequence[dict], offsets: Dict[str, Sequence[float]]) -> List[dict]:
+        shifted = []
+        for region in regions:
+            dx, dy = offsets.get(region['name'], (0.0, 0.0))
+            if dx or dy:
+                x0, y0, x1, y1 = region['coordinates']
+                region = dict(region, coordinates=[x0 + dx, y0 + dy, x1 + dx, y1 + dy])
+            shifted.append(region)
+        return shifted
+
+
+_default_calibrator: Optional[RegionCalibrator] = None
+_default_calibrator_lock = threading.Lock()
+
+
+def default_region_calibrator() -> RegionCalibrator:
+    """The app-wide calibrator backed by app_data/region_calibration.json"""
+    global _default_calibrator
+    with _default_calibrator_lock:
+        if _default_calibrator is None:
+            _default_calibrator = RegionCalibrator()
+        return _default_calibrator
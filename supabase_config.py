@@ -1,8 +1,19 @@
 import os
 import uuid
-from supabase import create_client, Client
-from datetime import datetime
-from typing import List, Dict, Optional
+import importlib.util
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Dict, Optional
+
+# The supabase package is imported when the client is first needed; importers
+# still get an ImportError up front when it is missing
+if importlib.util.find_spec("supabase") is None:
+    raise ImportError("No module named 'supabase'")
+
+from bulk_writer import BulkWriteResult, dedupe_records, write_in_chunks
+from event_outbox import (IDEMPOTENCY_COLUMN, IDEMPOTENCY_KEY_COLUMN, KEY_COLUMNS, OutboxFlusher,
+                          default_event_outbox, is_network_error, is_update, update_key, update_on)
 
 # Hardcoded Supabase credentials (for development only)
 SUPABASE_URL = "https://doftypeumwgvirppcuim.supabase.co"  # Replace with your actual URL
@@ -11,12 +22,221 @@ SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJ
 # Note: Replace the above with your actual Supabase credentials
 # You can find these in your Supabase project settings
 
-# Create Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# The client is created on first use, not at import: importing the supabase
+# package and building the client cost every app start, even for users who
+# only sort PDFs
+_client = None
+_client_lock = threading.Lock()
+client_seconds: Optional[float] = None
 
 def get_supabase_client():
-    """Get the configured Supabase client"""
-    return supabase
+    """Get the configured Supabase client, creating it on first use (thread-safe)"""
+    global _client, client_seconds
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                started = time.perf_counter()
+                from supabase import create_client
+                _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+                client_seconds = time.perf_counter() - started
+    return _client
+
+def __getattr__(name: str):
+    # supabase_config.supabase keeps working for older callers
+    if name == 'supabase':
+        return get_supabase_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def warm_up_supabase(on_done: Optional[Callable[[bool, float, str], None]] = None) -> threading.Thread:
+    """
+    Create the client and open its HTTPS connection on a background thread,
+    so the first upload or lookup does not pay for it
+    
+    Call it after the main window is shown. Without network the warm-up
+    fails quietly and the app keeps working offline.
+    
+    Args:
+        on_done: Called on the worker thread with (connected, seconds, message)
+    
+    Returns:
+        threading.Thread: The started daemon thread
+    """
+    def warm_up():
+        started = time.perf_counter()
+        try:
+            client = get_supabase_client()
+            # Cheapest real request: opens the pooled TLS connection
+            client.table('dispatch_orders').select('ordernumber').limit(1).execute()
+            connected, message = True, "connected"
+        except Exception as e:
+            connected, message = False, f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - started
+        if connected:
+            print(f"🌐 Supabase ready in {seconds * 1000:.0f} ms (client {client_seconds * 1000:.0f} ms)")
+        else:
+            print(f"⚠️ Supabase not reachable after {seconds * 1000:.0f} ms - working offline ({message})")
+        if on_done:
+            on_done(connected, seconds, message)
+    
+    thread = threading.Thread(target=warm_up, name="supabase-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def bulk_write(table_name: str, records: List[Dict], on_conflict: Optional[str] = None, **options) -> BulkWriteResult:
+    """
+    Insert (or upsert on the on_conflict column) records in chunks, a few
+    chunks at a time, retrying only the chunks that failed
+    
+    All chunks go through the shared client and reuse its HTTP connection
+    pool. Options are passed on to bulk_writer.write_in_chunks.
+    
+    Args:
+        table_name: Table to write to
+        records: Rows to write
+        on_conflict: Upsert on this column instead of inserting
+    
+    Returns:
+        BulkWriteResult with rows written, failed rows and rows/sec
+    """
+    def send_chunk(chunk: List[Dict]):
+        table = get_supabase_client().table(table_name)
+        if on_conflict:
+            table.upsert(chunk, on_conflict=on_conflict).execute()
+        else:
+            table.insert(chunk).execute()
+    
+    result = write_in_chunks(send_chunk, records, label=table_name, **options)
+    print(f"📤 {table_name}: {result.summary()}")
+    return result
+
+# Tables supabase_schema.sql defines with a UUID primary key: a client-side id is their idempotency key
+UUID_ID_TABLES = frozenset({
+    'dispatch.generated_barcodes', 'dispatch.order_details', 'dispatch.scan_history', 'dispatch.pick_lists',
+    'dispatch_orders', 'crate_verification',
+})
+
+def idempotency_column(table_name: str) -> str:
+    """Column holding a table's idempotency key: the UUID id, or the idempotency_key column added for the others"""
+    return IDEMPOTENCY_COLUMN if table_name in UUID_ID_TABLES else IDEMPOTENCY_KEY_COLUMN
+
+def write_or_queue(table_name: str, records: List[Dict], on_conflict: Optional[str] = None, **options) -> BulkWriteResult:
+    """
+    bulk_write, with the rows that still failed parked in the event outbox;
+    the outbox flusher sends them once Supabase is reachable again
+    
+    With the default on_conflict every row gets a client-side UUID in the
+    table's idempotency column first, so a chunk resent after a lost
+    response is not written twice.
+    
+    Returns:
+        BulkWriteResult of the direct write; rows_queued of the
+        failed_records wait in the outbox
+    """
+    on_conflict = on_conflict or idempotency_column(table_name)
+    if on_conflict in KEY_COLUMNS:
+        for record in records:
+            record.setdefault(on_conflict, str(uuid.uuid4()))
+    result = bulk_write(table_name, records, on_conflict=on_conflict, **options)
+    if result.failed_records:
+        keys = None
+        if on_conflict in KEY_COLUMNS:
+            keys = [record[on_conflict] for record in result.failed_records]
+        if queue_rows(table_name, result.failed_records, on_conflict, keys):
+            print(f"📥 {table_name}: {result.rows_failed} rows queued in the outbox - they are sent when Supabase is reachable")
+            result = result._replace(rows_queued=result.rows_failed)
+    return result
+
+def report_write(table_name: str, result: BulkWriteResult) -> bool:
+    """
+    Print how many rows of a write_or_queue call were written, queued and failed
+    
+    Returns:
+        bool: True if every row was written now
+    """
+    if result.ok:
+        print(f"✅ {table_name}: {result.rows_written} rows written")
+    else:
+        print(f"⚠️ {table_name}: {result.rows_written} rows written, {result.rows_failed} failed "
+              f"({result.rows_queued} queued in the outbox, {result.rows_failed - result.rows_queued} not queued)")
+    return result.ok
+
+# ================================
+# EVENT OUTBOX
+# ================================
+
+_outbox_flusher: Optional[OutboxFlusher] = None
+_outbox_flusher_lock = threading.Lock()
+
+def send_outbox_rows(table_name: str, records: List[Dict], on_conflict: str):
+    """Write one batch of outbox rows; raises on failure so the flusher retries"""
+    client = get_supabase_client()
+    if is_update(on_conflict):
+        # Updates keyed on a column, e.g. a barcode status change
+        key = update_key(on_conflict)
+        for record in records:
+            values = {column: value for column, value in record.items() if column != key}
+            client.table(table_name).update(values).eq(key, record[key]).execute()
+    else:
+        # Resent rows are skipped, not written twice
+        client.table(table_name).upsert(records, on_conflict=on_conflict,
+                                        ignore_duplicates=on_conflict in KEY_COLUMNS).execute()
+
+def is_transient_error(error: Exception) -> bool:
+    """True when Supabase was not reached, so the rows themselves are not at fault"""
+    if is_network_error(error):
+        return True
+    try:
+        # Already loaded with the supabase client; raises TransportError for connect/read failures and timeouts
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, httpx.TransportError)
+
+def queue_rows(table_name: str, records: List[Dict], on_conflict: Optional[str] = None,
+               idempotency_keys: Optional[List[str]] = None) -> bool:
+    """
+    Commit rows to the local outbox instead of writing them over the network
+    
+    Args:
+        table_name: Supabase table
+        records: Rows to write
+        on_conflict: Upsert conflict column or update_on(column); defaults to the table's idempotency column
+        idempotency_keys: Keys for the rows (new UUIDs by default)
+    
+    Returns:
+        bool: True if queued; False if the outbox is unavailable and the rows were written directly
+    """
+    on_conflict = on_conflict or idempotency_column(table_name)
+    outbox = default_event_outbox()
+    if outbox is None:
+        records = [dict(record) for record in records]
+        if on_conflict in KEY_COLUMNS:
+            for record in records:
+                record.setdefault(on_conflict, str(uuid.uuid4()))
+        send_outbox_rows(table_name, records, on_conflict)
+        return False
+    outbox.enqueue_many(table_name, records, on_conflict, idempotency_keys)
+    return True
+
+def outbox_depth() -> int:
+    """Rows waiting in the outbox"""
+    outbox = default_event_outbox()
+    return outbox.depth() if outbox is not None else 0
+
+def outbox_dead_count() -> int:
+    """Rows the outbox gave up on after repeated rejections"""
+    outbox = default_event_outbox()
+    return outbox.dead_count() if outbox is not None else 0
+
+def start_outbox_flusher() -> Optional[OutboxFlusher]:
+    """Start (once) the background thread that sends queued rows to Supabase"""
+    global _outbox_flusher
+    with _outbox_flusher_lock:
+        outbox = default_event_outbox()
+        if _outbox_flusher is None and outbox is not None:
+            _outbox_flusher = OutboxFlusher(outbox, send_outbox_rows, is_transient=is_transient_error).start()
+            print(f"📤 Outbox flusher started, {outbox.depth()} rows waiting")
+        return _outbox_flusher
 
 # ================================
 # BARCODE MANAGEMENT FUNCTIONS
@@ -134,11 +354,13 @@ def save_generated_barcodes(barcodes_data: List[Dict]) -> bool:
                             print(f"   ❌ Field error: {str(field_error)}")
                     return False
         
-        # Insert all records at once
-        result = supabase.table('dispatch.generated_barcodes').upsert(records, on_conflict='order_id').execute()
+        # A night can stamp the same order twice; one upsert cannot touch a row twice
+        unique_records = dedupe_records(records, 'order_id')
+        if len(unique_records) < len(records):
+            print(f"📋 Dropped {len(records) - len(unique_records)} duplicate order IDs")
         
-        print(f"✅ Successfully saved {len(records)} barcodes to Supabase")
-        return True
+        result = write_or_queue('dispatch.generated_barcodes', unique_records, on_conflict='order_id')
+        return report_write('dispatch.generated_barcodes', result)
         
     except Exception as e:
         print(f"❌ Error saving barcodes to Supabase: {e}")
@@ -154,7 +376,7 @@ def save_generated_barcodes(barcodes_data: List[Dict]) -> bool:
 def get_barcode_info(order_id: str) -> Optional[Dict]:
     """Get barcode information for a specific order ID"""
     try:
-        result = supabase.table('dispatch.generated_barcodes').select("*").eq('order_id', order_id).execute()
+        result = get_supabase_client().table('dispatch.generated_barcodes').select("*").eq('order_id', order_id).execute()
         
         if result.data:
             return result.data[0]
@@ -165,12 +387,13 @@ def get_barcode_info(order_id: str) -> Optional[Dict]:
         return None
 
 def update_barcode_status(order_id: str, status: str) -> bool:
-    """Update the status of a barcode (generated, scanned, picked, completed)"""
+    """Update the status of a barcode (generated, scanned, picked, completed); queued in the outbox"""
     try:
-        result = supabase.table('dispatch.generated_barcodes').update({
+        queue_rows('dispatch.generated_barcodes', [{
+            'order_id': order_id,
             'status': status,
             'updated_at': datetime.now().isoformat()
-        }).eq('order_id', order_id).execute()
+        }], on_conflict=update_on('order_id'))
         
         return True
         
@@ -183,13 +406,14 @@ def record_barcode_scan(order_id: str, scanned_by: str = None, scanner_device: s
     try:
         scan_record = {
             'order_id': order_id,
+            'scanned_at': datetime.now().isoformat(),  # Scan time, not the time the outbox sends it
             'scanned_by': scanned_by,
             'scanner_device': scanner_device,
             'location': location
         }
         
-        # Insert scan record
-        result = supabase.table('dispatch.scan_history').insert(scan_record).execute()
+        # Commit the scan locally; the outbox flusher sends it
+        queue_rows('dispatch.scan_history', [scan_record])
         
         # Update barcode status to 'scanned'
         update_barcode_status(order_id, 'scanned')
@@ -201,6 +425,63 @@ def record_barcode_scan(order_id: str, scanned_by: str = None, scanner_device: s
         print(f"❌ Error recording scan: {e}")
         return False
 
+# ================================
+# ORDER LOOKUP FUNCTIONS
+# ================================
+
+# Columns the scanning station shows for an order, plus the id the preload pages by
+ORDER_LOOKUP_COLUMNS = "id, ordernumber, sitename, route, customer_type, created_at, dispatchcode"
+
+# PostgREST returns at most this many rows per request
+PAGE_ROWS = 1000
+
+def fetch_order(order_number: str, columns: str = ORDER_LOOKUP_COLUMNS) -> Optional[Dict]:
+    """One dispatch_orders row for an order number (stored upper case), or None"""
+    result = get_supabase_client().table('dispatch_orders').select(columns).eq(
+        'ordernumber', order_number.upper()).limit(1).execute()
+    return result.data[0] if result.data else None
+
+def fetch_recent_orders(hours: float, columns: str = ORDER_LOOKUP_COLUMNS) -> List[Dict]:
+    """dispatch_orders rows created in the last hours, newest first, fetched page by page (keyset)"""
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+    rows = []
+    while True:
+        after = (rows[-1]['created_at'], rows[-1]['id']) if rows else None
+        page = fetch_orders_page(after, PAGE_ROWS, columns, since=since)
+        rows.extend(page)
+        if len(page) < PAGE_ROWS:
+            return rows
+
+# Columns of the Order Management table, plus the id that breaks created_at ties for paging
+ORDER_TABLE_COLUMNS = "id, ordernumber, customer_type, created_at, sitename, route, pdf_file_name"
+
+def fetch_orders_page(after: Optional[tuple] = None, page_rows: int = 200,
+                      columns: str = ORDER_TABLE_COLUMNS, since: Optional[str] = None) -> List[Dict]:
+    """
+    One page of dispatch_orders, newest first, by keyset pagination
+    
+    Rows of one upload share their created_at, so pages are ordered by
+    (created_at, id) and continue strictly after the previous page's last
+    row. Unlike an offset, the cost of a page does not grow with its depth.
+    
+    Args:
+        after: (created_at, id) of the last row of the previous page, None for the first page
+        page_rows: Rows per page
+        columns: Columns to select (must include created_at and id)
+        since: Only rows created at or after this ISO timestamp
+    
+    Returns:
+        List[Dict]: Up to page_rows rows
+    """
+    query = get_supabase_client().table('dispatch_orders').select(columns)
+    if since:
+        query = query.gte('created_at', since)
+    if after:
+        created_at, row_id = after
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})')
+    result = query.order('created_at', desc=True).order('id', desc=True).limit(page_rows).execute()
+    return result.data or []
+
 # ================================
 # PICK LIST MANAGEMENT FUNCTIONS
 # ================================
@@ -262,7 +543,7 @@ def upload_pick_list_from_excel(excel_data: List[Dict], excel_file_name: str) ->
             return False
         
         # Insert all records
-        result = supabase.table('pick_lists').insert(records).execute()
+        result = get_supabase_client().table('pick_lists').insert(records).execute()
         
         print(f"✅ Successfully uploaded {len(records)} pick list items from {excel_file_name}")
         
@@ -286,7 +567,7 @@ def upload_pick_list_from_excel(excel_data: List[Dict], excel_file_name: str) ->
 def get_pick_list_for_order(order_id: str) -> List[Dict]:
     """Get all items that need to be picked for a specific order"""
     try:
-        result = supabase.table('pick_lists').select("*").eq('order_id', order_id).order('pick_sequence').execute()
+        result = get_supabase_client().table('pick_lists').select("*").eq('order_id', order_id).order('pick_sequence').execute()
         
         return result.data if result.data else []
         
@@ -304,7 +585,7 @@ def update_pick_item_status(order_id: str, item_code: str, quantity_picked: int,
             'status': 'picked'
         }
         
-        result = supabase.table('pick_lists').update(update_data).eq('order_id', order_id).eq('item_code', item_code).execute()
+        result = get_supabase_client().table('pick_lists').update(update_data).eq('order_id', order_id).eq('item_code', item_code).execute()
         
         return True
         
@@ -315,7 +596,7 @@ def update_pick_item_status(order_id: str, item_code: str, quantity_picked: int,
 def get_barcode_scan_history(order_id: str) -> List[Dict]:
     """Get scan history for a specific order"""
     try:
-        result = supabase.table('dispatch.scan_history').select("*").eq('order_id', order_id).order('scanned_at', desc=True).execute()
+        result = get_supabase_client().table('dispatch.scan_history').select("*").eq('order_id', order_id).order('scanned_at', desc=True).execute()
         
         return result.data if result.data else []
         
@@ -503,14 +784,22 @@ def upload_store_orders_from_excel(excel_data: List[Dict], excel_file_name: str,
         print(f"📋 Uploading {len(records)} records to dispatch_orders table...")
         
         try:
-            # Try to insert into dispatch_orders table
-            result = supabase.table('dispatch_orders').insert(records).execute()
-            print(f"✅ Successfully uploaded {len(records)} dispatch order items from {excel_file_name}")
-            print(f"🔢 Excel row order preserved using sequence numbers 1-{len(records)}")
+            # Chunks land in any order; excel_row_sequence keeps the Excel order.
+            # Rows that cannot be written now wait in the outbox
+            result = write_or_queue('dispatch_orders', records)
             
             # Upload to crate_verification table
             print(f"📋 Uploading crate verification data...")
-            upload_crate_verification_data(records, excel_file_name, created_at_override)
+            crates_written = upload_crate_verification_data(records, excel_file_name, created_at_override)
+            
+            if not report_write('dispatch_orders', result):
+                print(f"❌ Upload of {excel_file_name} incomplete: {result.rows_failed} of {len(records)} dispatch order items not written")
+                return False
+            if not crates_written:
+                print(f"❌ Upload of {excel_file_name} incomplete: crate verification data not written")
+                return False
+            print(f"✅ Successfully uploaded {len(records)} dispatch order items from {excel_file_name}")
+            print(f"🔢 Excel row order preserved using sequence numbers 1-{len(records)}")
             
         except Exception as db_error:
             print(f"❌ Database upload error: {str(db_error)}")
@@ -605,9 +894,10 @@ def upload_crate_verification_data(dispatch_records: List[Dict], excel_file_name
         
         print(f"📋 Uploading {len(crate_verification_records)} crate verification records...")
         
-        # Upload to crate_verification table
-        result = supabase.table('crate_verification').insert(crate_verification_records).execute()
-        print(f"✅ Successfully uploaded {len(crate_verification_records)} crate verification records")
+        # Upload to crate_verification table (queued when Supabase is not reachable)
+        result = write_or_queue('crate_verification', crate_verification_records)
+        if not report_write('crate_verification', result):
+            return False
         
         # Show summary
         print("📋 Crate verification records uploaded:")
@@ -854,7 +1144,12 @@ def upload_order_updates_from_excel(excel_data: List[Dict], excel_file_name: str
         print(f"📋 Uploading {len(records)} records to dispatch_orders_update table...")
         
         try:
-            result = supabase.table('dispatch_orders_update').insert(records).execute()
+            # Chunks land in any order; excel_row_sequence keeps the Excel order.
+            # Rows that cannot be written now wait in the outbox
+            result = write_or_queue('dispatch_orders_update', records)
+            if not report_write('dispatch_orders_update', result):
+                print(f"❌ Upload of {excel_file_name} incomplete: {result.rows_failed} of {len(records)} order update items not written")
+                return False
             print(f"✅ Successfully uploaded {len(records)} order update items from {excel_file_name}")
             print(f"🔢 Excel row order preserved using sequence numbers 1-{len(records)}")
         except Exception as db_error:
@@ -902,7 +1197,7 @@ def upload_order_updates_from_excel(excel_data: List[Dict], excel_file_name: str
 def insert_delivery_data(table_name: str, data: dict):
     """Insert data into a Supabase table"""
     try:
-        result = supabase.table(table_name).insert(data).execute()
+        result = get_supabase_client().table(table_name).insert(data).execute()
         return result
     except Exception as e:
         print(f"Error inserting data: {e}")
@@ -911,7 +1206,7 @@ def insert_delivery_data(table_name: str, data: dict):
 def get_delivery_data(table_name: str, filters: dict = None):
     """Get data from a Supabase table with optional filters"""
     try:
-        query = supabase.table(table_name).select("*")
+        query = get_supabase_client().table(table_name).select("*")
         
         if filters:
             for key, value in filters.items():
@@ -926,7 +1221,7 @@ def get_delivery_data(table_name: str, filters: dict = None):
 def update_delivery_data(table_name: str, data: dict, filters: dict):
     """Update data in a Supabase table"""
     try:
-        query = supabase.table(table_name).update(data)
+        query = get_supabase_client().table(table_name).update(data)
         
         for key, value in filters.items():
             query = query.eq(key, value)
@@ -940,7 +1235,7 @@ def update_delivery_data(table_name: str, data: dict, filters: dict):
 def delete_delivery_data(table_name: str, filters: dict):
     """Delete data from a Supabase table"""
     try:
-        query = supabase.table(table_name).delete()
+        query = get_supabase_client().table(table_name).delete()
         
         for key, value in filters.items():
             query = query.eq(key, value)
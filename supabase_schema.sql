@@ -128,3 +128,12 @@ ALTER TABLE dispatch.scan_history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE dispatch.pick_lists ENABLE ROW LEVEL SECURITY;
 ALTER TABLE dispatch_orders ENABLE ROW LEVEL SECURITY;
 ALTER TABLE crate_verification ENABLE ROW LEVEL SECURITY;
+
+-- Idempotency keys for tables without a client-settable UUID primary key
+-- (print_history and dispatch_orders_update are created outside this file).
+-- The apps set a UUID here and upsert on it, so rows resent from the
+-- local outbox after a lost response are written once.
+ALTER TABLE IF EXISTS print_history ADD COLUMN IF NOT EXISTS idempotency_key UUID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_print_history_idempotency_key ON print_history(idempotency_key);
+ALTER TABLE IF EXISTS dispatch_orders_update ADD COLUMN IF NOT EXISTS idempotency_key UUID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dispatch_orders_update_idempotency_key ON dispatch_orders_update(idempotency_key);
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the on-disk barcode cache and cached barcode templates
+"""
+
+import os
+import tempfile
+import time
+
+from barcode_cache import BarcodeCache
+from barcode_stamping import BarcodeTemplates, code128_pattern
+
+
+def test_cache_hits_and_keys():
+    """Entries are keyed by order ID, symbology and size"""
+    print("Testing barcode cache keys...")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = BarcodeCache(cache_dir)
+        cache.put("SO-1001", "code128", "200dpi", "png", b"first")
+
+        assert cache.get("SO-1001", "code128", "200dpi", "png") == b"first"
+        assert cache.get("SO-1001", "code128", "300dpi", "png") is None
+        assert cache.get("SO-1002", "code128", "200dpi", "png") is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        # A second cache over the same folder sees the stored entry
+        assert BarcodeCache(cache_dir).get_or_create("SO-1001", "code128", "200dpi", "png",
+                                                     lambda: b"rendered again") == b"first"
+    print("✓ Barcode cache keys work")
+
+
+def test_lru_eviction():
+    """The least recently used entries go first when the cache is full"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = BarcodeCache(cache_dir, max_bytes=3000)
+        for i, order_id in enumerate(["A1", "A2", "A3"]):
+            cache.put(order_id, "code128", "1x", "pdf", b"x" * 900)
+            # Spread modification times so the LRU order is unambiguous
+            path = cache.path_for(order_id, "code128", "1x", "pdf")
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+        cache.get("A1", "code128", "1x", "pdf")   # A1 is now the most recent
+        cache.put("A4", "code128", "1x", "pdf", b"x" * 900)
+
+        remaining = [order_id for order_id in ["A1", "A2", "A3", "A4"]
+                     if cache.path_for(order_id, "code128", "1x", "pdf").exists()]
+        print(f"Entries kept after eviction: {remaining}")
+        assert remaining == ["A1", "A3", "A4"]
+    print("✓ LRU eviction works")
+
+
+def test_size_accounting():
+    """Overwritten entries and temporary files do not count towards the size limit"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = BarcodeCache(cache_dir)
+        for _ in range(3):
+            cache.put("SO-1001", "code128", "1x", "pdf", b"x" * 900)
+        assert cache._total_bytes == 900
+
+        # Leftovers of an interrupted write: a fresh one is skipped, a stale one deleted
+        folder = cache.path_for("SO-1001", "code128", "1x", "pdf").parent
+        fresh, stale = folder / "fresh.tmp", folder / "stale.tmp"
+        fresh.write_bytes(b"x" * 500)
+        stale.write_bytes(b"x" * 500)
+        os.utime(stale, (time.time() - 2 * 60 * 60, time.time() - 2 * 60 * 60))
+        reopened = BarcodeCache(cache_dir)
+        assert reopened._total_bytes == 900
+        assert fresh.exists() and not stale.exists()
+    print("✓ Cache size accounting works")
+
+
+def test_cached_templates_match_drawn():
+    """Barcode pages from the cache are the same as freshly drawn ones"""
+    patterns = {order_id: code128_pattern(order_id) for order_id in ["SO-1001", "AA061B4Y"]}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        drawn = BarcodeTemplates(patterns)
+        for _ in range(2):  # Cold, then warm cache
+            cache = BarcodeCache(cache_dir)
+            cached = BarcodeTemplates(patterns, cache)
+            for order_id in patterns:
+                drawn_page = drawn.document[drawn.page_number(order_id)]
+                cached_page = cached.document[cached.page_number(order_id)]
+                assert cached_page.rect == drawn_page.rect
+                assert cached_page.get_text() == drawn_page.get_text()
+            cached.close()
+        assert cache.hits == len(patterns)
+        drawn.close()
+    print("✓ Cached barcode templates work")
+
+
+if __name__ == "__main__":
+    test_cache_hits_and_keys()
+    test_lru_eviction()
+    test_size_accounting()
+    test_cached_templates_match_drawn()
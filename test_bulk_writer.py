@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script to verify chunked, retrying bulk writes
+"""
+
+import threading
+
+from bulk_writer import chunk_records, dedupe_records, write_in_chunks
+
+
+def make_rows(count):
+    return [{'ordernumber': f"SO-{index:07d}", 'itemcode': f"ITEM{index % 40:03d}",
+             'excel_row_sequence': index + 1} for index in range(count)]
+
+
+def test_chunking_and_dedupe():
+    """Chunks respect row and size limits and keep the order; duplicates keep the last row"""
+    print("Testing bulk write chunking...")
+    print("=" * 50)
+
+    rows = make_rows(1234)
+    chunks = chunk_records(rows, max_rows=500)
+    assert [len(chunk) for chunk in chunks] == [500, 500, 234]
+    assert [row for chunk in chunks for row in chunk] == rows
+
+    small_chunks = chunk_records(rows, max_rows=500, max_bytes=4096)
+    assert all(len(chunk) < 100 for chunk in small_chunks)
+    assert [row for chunk in small_chunks for row in chunk] == rows
+    assert chunk_records([], max_rows=10) == []
+
+    barcodes = [{'order_id': 'A', 'page_number': 1}, {'order_id': 'B', 'page_number': 2},
+                {'order_id': 'A', 'page_number': 3}]
+    assert dedupe_records(barcodes, 'order_id') == [{'order_id': 'A', 'page_number': 3},
+                                                    {'order_id': 'B', 'page_number': 2}]
+    print("✓ Records are chunked and deduplicated")
+
+
+def test_only_failed_chunks_are_retried():
+    """A flaky chunk is sent again, the others once; a broken chunk fails alone"""
+    rows = make_rows(2000)
+    sent = []
+    attempts = {}
+    lock = threading.Lock()
+
+    def send_chunk(chunk):
+        first = chunk[0]['excel_row_sequence']
+        with lock:
+            attempts[first] = attempts.get(first, 0) + 1
+            count = attempts[first]
+        if first == 501 and count < 3:
+            raise TimeoutError("statement timeout")
+        if first == 1501:
+            raise ValueError("JSON could not be generated")
+        with lock:
+            sent.extend(chunk)
+
+    delays = []
+    result = write_in_chunks(send_chunk, rows, max_rows=500, workers=3, retries=3,
+                             backoff=0.5, label="dispatch_orders", sleep=delays.append)
+    print(result.summary())
+    assert attempts == {1: 1, 501: 3, 1001: 1, 1501: 4}
+    assert delays == [0.5, 1.0, 2.0]
+    assert result.chunks == 4 and result.retries == 5
+    assert result.rows_written == 1500 and result.rows_failed == 500
+    assert not result.ok and "JSON could not be generated" in result.errors[0]
+    assert sorted(row['excel_row_sequence'] for row in sent) == list(range(1, 1501))
+    assert result.written_records == rows[:1500]
+    assert result.failed_records == rows[1500:]
+    assert result.rows_per_second > 0
+    print("✓ Only failed chunks are retried")
+
+
+if __name__ == "__main__":
+    test_chunking_and_dedupe()
+    test_only_failed_chunks_are_retried()
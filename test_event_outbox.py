@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the event outbox and its background flusher
+"""
+
+import os
+import tempfile
+import time
+
+from event_outbox import IDEMPOTENCY_COLUMN, IDEMPOTENCY_KEY_COLUMN, MAX_ATTEMPTS, EventOutbox, OutboxFlusher, update_on
+
+
+def test_rows_wait_until_sent():
+    """Queued rows survive a reopen, get idempotency keys and back off while offline"""
+    print("Testing event outbox...")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "event_outbox.sqlite3")
+        outbox = EventOutbox(db_path)
+        start = time.perf_counter()
+        key = outbox.enqueue('print_history', {'order_number': 'SO-0001234', 'crate_quantity': 3},
+                             on_conflict=IDEMPOTENCY_KEY_COLUMN)
+        print(f"Enqueue took {(time.perf_counter() - start) * 1e6:.0f} µs")
+        outbox.enqueue('print_history', {'order_number': 'SO-0001234'}, on_conflict=IDEMPOTENCY_KEY_COLUMN,
+                       idempotency_key=key)
+        outbox.enqueue('dispatch.generated_barcodes', {'order_id': 'SO-0001234', 'status': 'scanned'},
+                       on_conflict=update_on('order_id'))
+        outbox.close()
+
+        outbox = EventOutbox(db_path)
+        assert outbox.depth() == 2
+        rows = outbox.due()
+        assert rows[0].record == {'order_number': 'SO-0001234', 'crate_quantity': 3, IDEMPOTENCY_KEY_COLUMN: key}
+        assert IDEMPOTENCY_COLUMN not in rows[0].record and IDEMPOTENCY_KEY_COLUMN not in rows[1].record
+
+        online = False
+        sent = []
+
+        def send_rows(table, records, on_conflict):
+            if not online:
+                raise ConnectionError("Wi-Fi down")
+            sent.append((table, on_conflict, records))
+
+        flusher = OutboxFlusher(outbox, send_rows)
+        assert flusher.flush_once() == 0
+        assert outbox.depth() == 2 and outbox.due() == []
+        assert len(outbox.due(now=time.time() + 3)) == 2
+
+        online = True
+        outbox._connection.execute("UPDATE outbox SET next_attempt_at = 0")
+        assert flusher.flush_once() == 2
+        assert outbox.depth() == 0
+        assert [(table, on_conflict) for table, on_conflict, _ in sent] == [
+            ('print_history', IDEMPOTENCY_KEY_COLUMN), ('dispatch.generated_barcodes', 'update:order_id')]
+        outbox.close()
+    print("✓ Rows are kept until the flusher sends them")
+
+
+def test_flusher_thread_batches():
+    """The background flusher wakes up on enqueue and sends rows in batches"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outbox = EventOutbox(os.path.join(temp_dir, "event_outbox.sqlite3"))
+        batches = []
+        flusher = OutboxFlusher(outbox, lambda table, records, on_conflict: batches.append(len(records)),
+                                interval=10, batch_rows=100)
+        flusher.start()
+        outbox.enqueue_many('dispatch_orders', [{'ordernumber': f"SO-{index}"} for index in range(250)])
+        deadline = time.time() + 5
+        while outbox.depth() and time.time() < deadline:
+            time.sleep(0.01)
+        flusher.stop()
+        assert outbox.depth() == 0
+        assert sum(batches) == 250 and max(batches) <= 100
+        outbox.close()
+    print("✓ Background flusher drains the outbox")
+
+
+def test_rejected_row_is_parked():
+    """A row the server refuses is isolated from its batch and parked after MAX_ATTEMPTS rejections"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outbox = EventOutbox(os.path.join(temp_dir, "event_outbox.sqlite3"))
+        outbox.enqueue_many('scan_history', [{'order_number': f"SO-{index}"} for index in range(5)])
+        sent = []
+
+        def send_rows(table, records, on_conflict):
+            if any(record['order_number'] == 'SO-2' for record in records):
+                raise ValueError("violates check constraint")
+            sent.extend(record['order_number'] for record in records)
+
+        flusher = OutboxFlusher(outbox, send_rows)
+        assert flusher.flush_once() == 4
+        assert sent == ['SO-0', 'SO-1', 'SO-3', 'SO-4']
+        assert outbox.depth() == 1 and outbox.dead_count() == 0
+
+        for _ in range(MAX_ATTEMPTS - 1):
+            outbox._connection.execute("UPDATE outbox SET next_attempt_at = 0")
+            assert flusher.flush_once() == 0
+        assert outbox.depth() == 0 and outbox.dead_count() == 1
+        outbox._connection.execute("UPDATE outbox SET next_attempt_at = 0")
+        assert outbox.due() == []
+        outbox.close()
+    print("✓ Rejected rows no longer block their table")
+
+
+if __name__ == "__main__":
+    test_rows_wait_until_sent()
+    test_flusher_thread_batches()
+    test_rejected_row_is_parked()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that page text is reused from the extraction cache
+"""
+
+import os
+import tempfile
+
+import fitz  # PyMuPDF
+
+from extraction_cache import ExtractionCache, FULL_PAGE, clip_key, file_sha256
+from pdf_text_extraction import extract_pdf_texts, extraction_mode, ExtractionOptions
+
+
+def make_pdf(path, page_count):
+    document = fitz.open()
+    for page_num in range(page_count):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Our Order No: SO-{page_num:04d}")
+    document.save(path)
+    document.close()
+
+
+def test_rerun_uses_cache():
+    """A second run returns the same pages without extracting them again"""
+    print("Testing extraction cache reruns...")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, "dockets.pdf")
+        make_pdf(pdf_path, 12)
+        cache = ExtractionCache(os.path.join(temp_dir, "cache.sqlite3"))
+
+        first = extract_pdf_texts([pdf_path], max_workers=1, cache=cache)[pdf_path]
+        assert cache.hits == 0
+
+        messages = []
+        second = extract_pdf_texts([pdf_path], max_workers=1, cache=cache,
+                                   progress_callback=messages.append)[pdf_path]
+        print(f"Cache hits on rerun: {cache.hits}")
+        assert cache.hits == 12
+        assert [page.text for page in second.pages] == [page.text for page in first.pages]
+        assert [page.page_num for page in second.pages] == list(range(12))
+        assert not any("Extracted text from" in message for message in messages)
+
+        # Other extraction settings are cached separately
+        other_mode = extraction_mode(ExtractionOptions(ocr_zoom=3.0))
+        assert cache.get_pages(file_sha256(pdf_path), other_mode) == {}
+        cache.close()
+    print("✓ Reruns reuse cached page text")
+
+
+def test_partial_cache():
+    """Only the pages missing from the cache are extracted"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, "dockets.pdf")
+        make_pdf(pdf_path, 5)
+        cache = ExtractionCache(os.path.join(temp_dir, "cache.sqlite3"))
+        mode = extraction_mode(ExtractionOptions())
+        cache.put(file_sha256(pdf_path), 2, FULL_PAGE, mode, "cached page text")
+
+        pages = extract_pdf_texts([pdf_path], max_workers=1, cache=cache)[pdf_path].pages
+        assert [page.page_num for page in pages] == [0, 1, 2, 3, 4]
+        assert pages[2].text == "cached page text"
+        assert "SO-0003" in pages[3].text
+
+        # Region entries are keyed by their clip rectangle
+        cache.put(file_sha256(pdf_path), 0, clip_key(fitz.Rect(0, 0, 100, 50)), "text", "region")
+        assert cache.get(file_sha256(pdf_path), 0, clip_key((0, 0, 100, 50)), "text").text == "region"
+        assert cache.get(file_sha256(pdf_path), 0, clip_key((0, 0, 100, 60)), "text") is None
+        cache.close()
+    print("✓ Partially cached documents work")
+
+
+if __name__ == "__main__":
+    test_rerun_uses_cache()
+    test_partial_cache()
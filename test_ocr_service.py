@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script to verify page-level OCR word lookup and OCR statistics
+"""
+
+import json
+import os
+import tempfile
+
+from ocr_service import OcrResult, OcrWord, PageWords, TesseractEngine, mean_confidence, scale_words, words_from_json, words_in_rect, words_text, words_to_json
+from ocr_strategy import OcrStats, strategy_for
+
+
+class Rect:
+    def __init__(self, x0, y0, x1, y1):
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+
+
+def page_words():
+    """Words of a 3x page render: an order number line and a two-line address"""
+    return [
+        OcrWord("Our", 95.0, 1296, 132, 1380, 180, 0),
+        OcrWord("Order", 95.0, 1400, 132, 1530, 180, 0),
+        OcrWord("SO-0001234", 91.0, 1550, 132, 1770, 180, 0),
+        OcrWord("Main", 90.0, 90, 220, 200, 260, 1),
+        OcrWord("Street", 90.0, 215, 220, 360, 260, 1),
+        OcrWord("Dublin", 88.0, 90, 270, 240, 310, 2),
+    ]
+
+
+def test_region_lookup():
+    """Regions get the words mostly inside them, line by line"""
+    print("Testing region lookup in page OCR words...")
+    print("=" * 50)
+
+    words = scale_words(page_words(), 3.0)
+    assert words[0].x0 == 432 and words[0].y1 == 60
+
+    order_region = Rect(432, 44, 591, 65)
+    assert words_text(words_in_rect(words, order_region)) == "Our Order SO-0001234"
+
+    address_region = Rect(28, 72, 328, 110)
+    print(f"Address region: {words_text(words_in_rect(words, address_region))!r}")
+    assert words_text(words_in_rect(words, address_region)) == "Main Street\nDublin"
+
+    # Words less than half inside the region are left out, like text-layer spans
+    assert words_text(words_in_rect(words, Rect(28, 72, 90, 110))) == "Main\nDublin"
+    print("✓ Regions are answered from the word boxes")
+
+
+def test_cached_page_words():
+    """Cached word boxes answer regions without rendering the page"""
+    words = scale_words(page_words(), 3.0)
+    cached = PageWords(None, None, words=words_from_json(words_to_json(words)))
+    assert cached.from_cache and cached.started
+
+    result = cached.region_result(Rect(432, 44, 591, 65)).result()
+    assert result.text == "Our Order SO-0001234"
+    assert result.error is None
+    assert result.confidence == mean_confidence(words[:3]) == (95 + 95 + 91) / 3
+
+    # A render failure surfaces as the region future's exception
+    def broken_render():
+        raise RuntimeError("render failed")
+
+    failing = PageWords(None, broken_render)
+    assert not failing.started
+    assert isinstance(failing.region_result(Rect(0, 0, 10, 10)).exception(), RuntimeError)
+    print("✓ Cached word boxes are reused")
+
+
+class ScriptedEngine(TesseractEngine):
+    """Engine answering each PSM mode with canned words instead of Tesseract"""
+
+    def __init__(self, words_by_psm):
+        self.words_by_psm = words_by_psm
+        self.calls = []
+
+    def image_to_words(self, image, psm_mode=3):
+        self.calls.append(psm_mode)
+        return self.words_by_psm.get(psm_mode, [])
+
+
+def test_confidence_cascade():
+    """Low confidence words retry the next PSM mode, a blank region does not"""
+    blurry = [OcrWord("SO-1", 40.0, 0, 0, 10, 10, 0)]
+    sharp = [OcrWord("SO-1234", 92.0, 0, 0, 10, 10, 0)]
+    engine = ScriptedEngine({7: blurry, 6: sharp})
+    result = engine.recognize_confident(None, [7, 6, 3], 60.0)
+    assert (result.text, result.psm_mode, result.attempts) == ("SO-1234", 6, 2)
+
+    engine = ScriptedEngine({})
+    result = engine.recognize_confident(None, [7, 6, 3], 60.0)
+    assert engine.calls == [7]
+    assert (result.text, result.confidence, result.attempts) == ("", None, 1)
+    print("✓ Empty regions end the PSM cascade")
+
+
+def test_ocr_stats():
+    """Per-region statistics add up across runs"""
+    stats = OcrStats()
+    stats.record_text_layer('Region 2')
+    stats.record_ocr('Region 2', OcrResult("SO-1", 7, confidence=40.0, attempts=2, seconds=0.5),
+                     strategy_for('Region 2').min_confidence, retried=True)
+    stats.record_ocr('Region 2', None)
+    region_stats = stats.regions['Region 2']
+    assert (region_stats.regions, region_stats.ocr_hits, region_stats.low_confidence) == (3, 1, 1)
+    print(stats.summary_lines()[0])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stats_path = os.path.join(temp_dir, "ocr_stats.json")
+        stats.save(stats_path)
+        stats.save(stats_path)
+        with open(stats_path) as f:
+            totals = json.load(f)
+        assert totals['Region 2']['tesseract_runs'] == 4
+        assert totals['Region 2']['ocr_seconds'] == 1.0
+    print("✓ OCR statistics are recorded per region")
+
+
+if __name__ == "__main__":
+    test_region_lookup()
+    test_cached_page_words()
+    test_confidence_cascade()
+    test_ocr_stats()
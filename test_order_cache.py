@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the scanner order cache and latency histogram
+"""
+
+from order_cache import LatencyHistogram, OrderLookupCache, normalize_order_number
+
+
+def make_cache(ttl=900.0):
+    database = {
+        'SO-0001234': {'ordernumber': 'SO-0001234', 'sitename': 'Sunny Side Cafe', 'route': 'Dublin002'},
+        'SO-0005678': {'ordernumber': 'SO-0005678', 'sitename': 'Harbour Deli', 'route': 'Cork001'},
+    }
+    fetched = []
+
+    def load_orders():
+        # One row per order item, newest first
+        return [dict(database['SO-0001234'], itemcode='A'), dict(database['SO-0001234'], itemcode='B')]
+
+    def fetch_order(order_number):
+        fetched.append(order_number)
+        return database.get(order_number)
+
+    return OrderLookupCache(load_orders, fetch_order, ttl=ttl), database, fetched
+
+
+def test_preloaded_orders_skip_the_database():
+    """Preloaded orders are served from memory; misses go to the database once"""
+    print("Testing order cache...")
+    print("=" * 50)
+
+    cache, database, fetched = make_cache()
+    assert cache.refresh() == 1
+    assert normalize_order_number(" so-000 1234\n") == "SO-0001234"
+
+    row, source = cache.get(" so-0001234")
+    assert source == 'cache' and row['itemcode'] == 'A' and fetched == []
+    # Callers may change their copy
+    row['ordernumber'] = 'changed'
+    assert cache.get('SO-0001234')[0]['ordernumber'] == 'SO-0001234'
+
+    assert cache.get(' so-000 5678') == (database['SO-0005678'], 'database')
+    assert cache.get('SO-0005678')[1] == 'cache'
+    assert cache.get('SO-9999999') == (None, 'database')
+    assert fetched == ['SO-0005678', 'SO-9999999']
+    assert cache.hits == 3 and cache.misses == 2
+    print("✓ Preloaded orders skip the database")
+
+
+def test_expired_entries_and_offline():
+    """Expired entries are fetched again, and served stale when the database is unreachable"""
+    cache, database, fetched = make_cache(ttl=0.0)
+    cache.refresh()
+    assert cache.get('SO-0001234')[1] == 'database'
+
+    def offline(order_number):
+        raise ConnectionError("Wi-Fi down")
+
+    cache.fetch_order = offline
+    row, source = cache.get('SO-0001234')
+    assert source == 'stale' and row['sitename'] == 'Sunny Side Cafe'
+    try:
+        cache.get('SO-0005678')
+        assert False, "unknown orders cannot be answered offline"
+    except ConnectionError:
+        pass
+    print("✓ Expired entries are refreshed, stale ones serve offline scans")
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for milliseconds in [2, 3, 4, 8, 40, 180, 420, 3000]:
+        histogram.record(milliseconds)
+    assert histogram.counts == [3, 1, 0, 1, 0, 1, 1, 0, 0, 1]
+    assert histogram.percentile(0.5) == 40
+    lines = histogram.summary_lines()
+    print("\n".join(lines))
+    assert lines[-1].startswith("p50 40 ms") and "8 scans" in lines[-1]
+    assert LatencyHistogram().summary_lines() == ["no samples"]
+    print("✓ Latencies are bucketed")
+
+
+if __name__ == "__main__":
+    test_preloaded_orders_skip_the_database()
+    test_expired_entries_and_offline()
+    test_latency_histogram()
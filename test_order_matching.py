@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared order-ID matcher used by the PDF processors
+"""
+
+import re
+
+from order_matching import (
+    OrderMatcher, TokenOrderIndex, OcrConfusionIndex, EditDistanceIndex, canonical_ocr_form, match_page_order
+)
+
+
+def test_exact_matching():
+    """Order IDs are found case-insensitively, with the old loop's priority"""
+    print("Testing exact order ID matching...")
+    print("=" * 50)
+
+    matcher = OrderMatcher(["SO-1001", "so-1002", "SO-10", ""])
+    page_text = "Picking Docket\nOur Order No: so-1002\nRef SO-1001\n"
+
+    matches = matcher.find_all(page_text)
+    for match in matches:
+        print(f"  - {match.order_id} at {match.start}-{match.end}")
+
+    assert [m.order_id for m in matches] == ["SO-10", "so-1002", "SO-10", "SO-1001"]
+    assert page_text.upper()[matches[1].start:matches[1].end] == "SO-1002"
+
+    # The old loop returned the first order in the order set found on the page
+    assert matcher.first_match(page_text) == "SO-1001"
+    assert matcher.find_order_ids(page_text) == ["SO-1001", "so-1002", "SO-10"]
+    print("✓ Exact matching works")
+
+
+def test_no_match():
+    """Pages without any known order ID return nothing"""
+    matcher = OrderMatcher(["ABC123"])
+    assert matcher.first_match("Order ABC12 and BC123") is None
+    assert matcher.first_match("") is None
+    # An empty order set never matches, even on empty pages
+    assert OrderMatcher([""]).first_match("anything") is None
+    print("✓ Non-matching pages return no order")
+
+
+def test_overlapping_ids():
+    """Order IDs that share prefixes and suffixes are all reported"""
+    matcher = OrderMatcher(["ABAB", "BAB", "ABC"])
+    found = matcher.find_order_ids("xxABABCxx")
+    print(f"Overlapping IDs found: {found}")
+    assert found == ["ABAB", "BAB", "ABC"]
+    print("✓ Overlapping order IDs work")
+
+
+def test_word_boundary_matching():
+    """Token index gives the same answers as the old per-order regex search"""
+    print("\n" + "=" * 50)
+    print("Testing word boundary order ID matching...")
+
+    order_ids = ["SO-1001", "ABC123", "12/345", "so-10"]
+    index = TokenOrderIndex(order_ids)
+    page_text = "Our Order No: so-1001, ref abc123x 12/345\nSO-10012 SO-10."
+
+    matches = index.find_all(page_text)
+    for match in matches:
+        print(f"  - {match.order_id} at {match.start}-{match.end}")
+
+    expected = [order_id for order_id in order_ids
+                if re.search(r'\b' + re.escape(order_id) + r'\b', page_text, re.IGNORECASE)]
+    assert index.find_order_ids(page_text) == expected == ["SO-1001", "12/345", "so-10"]
+    assert [page_text.upper()[m.start:m.end] for m in matches] == ["SO-1001", "12/345", "SO-10"]
+    print("✓ Word boundary matching works")
+
+
+def test_ambiguous_page():
+    """Pages with two order IDs report both, in order-set priority"""
+    index = TokenOrderIndex(["B200", "A100"])
+    found = index.find_order_ids("Order A100 merged with B200")
+    print(f"Ambiguous page order IDs: {found}")
+    assert found == ["B200", "A100"]
+    assert index.first_match("Order A100 merged with B200") == "B200"
+    print("✓ Ambiguous pages are reported")
+
+
+def test_page_without_order_id():
+    """A page with no order ID is not filed under the previous page's order"""
+    order_ids = ["SO-1001", "SO-1002"]
+    matcher, index = OrderMatcher(order_ids), TokenOrderIndex(order_ids)
+    pages = ["Our Order No: SO-1001", "Delivery note - continued", "Ref:so-1002"]
+    found = [match_page_order(page, matcher, index).order_id for page in pages]
+    print(f"Orders per page: {found}")
+    assert found == ["SO-1001", None, "SO-1002"]
+    assert match_page_order(pages[2], matcher, index).exact
+    print("✓ Pages without an order ID stay unmatched")
+
+
+def test_ocr_confusions():
+    """OCR-confused page tokens find the order through the canonical form"""
+    print("\n" + "=" * 50)
+    print("Testing OCR confusion matching...")
+
+    index = OcrConfusionIndex(["SO-1001", "AA061B4Y"])
+    page_text = "Our 0rder N0: 5O-l0O1\nRef AAO6|84Y"
+
+    for match in index.find_all(page_text):
+        print(f"  - {match.order_id} as '{page_text.upper()[match.start:match.end]}'")
+
+    assert canonical_ocr_form("5O-l0O1") == canonical_ocr_form("SO-1001")
+    assert index.find_order_ids(page_text) == ["SO-1001", "AA061B4Y"]
+    best = index.best_match(page_text)
+    assert page_text.upper()[best.start:best.end] == "5O-L0O1"
+    # Still word-bounded: the ID must not run into neighbouring characters
+    assert index.first_match("5O-l0O12") is None
+    # Only digit/letter confusions: letters that differ stay different
+    assert canonical_ocr_form("AP12") != canonical_ocr_form("AR12")
+    # ...and so do digits: neighbouring order numbers still resolve
+    assert canonical_ocr_form("SO-1006") != canonical_ocr_form("SO-1009")
+    for neighbours in (OcrConfusionIndex(["SO-1006", "SO-1009"]), EditDistanceIndex(["SO-1006", "SO-1009"])):
+        match, order_ids = neighbours.unique_match("Order SO-l006")
+        assert match.order_id == "SO-1006" and order_ids == ["SO-1006"]
+    # Two orders on the page: no single OCR match to take
+    assert index.unique_match(page_text) == (None, ["SO-1001", "AA061B4Y"])
+    match, order_ids = index.unique_match("Our 0rder N0: 5O-l0O1")
+    assert match.order_id == "SO-1001" and order_ids == ["SO-1001"]
+    print("✓ OCR confusion matching works")
+
+
+def test_edit_distance_matching():
+    """Dropped and extra characters are matched within the allowed distance"""
+    print("\n" + "=" * 50)
+    print("Testing edit distance matching...")
+
+    index = EditDistanceIndex(["SO-1001", "AA061B4Y", "AA061B4Z", "AB12"])
+    page_text = "Our Order No:SO-10O1X, ref AA061B4 and AB1"
+
+    for match in index.ranked_matches(page_text):
+        print(f"  - {match.order_id}: {match.distance} edit(s), {match.confidence:.0%} confidence")
+
+    ranked = index.ranked_matches(page_text)
+    # SO-10O1X is one extra character (O/0 is a free OCR confusion)
+    assert ("SO-1001", 1) in [(m.order_id, m.distance) for m in ranked]
+    # AA061B4 is one edit from both AA061B4Y and AA061B4Z: priority breaks the tie
+    tied = [m.order_id for m in ranked if m.distance == 1 and m.order_id.startswith("AA")]
+    assert tied == ["AA061B4Y", "AA061B4Z"]
+    # ...which unique_match reports instead of picking one
+    assert index.unique_match("ref AA061B4") == (None, ["AA061B4Y", "AA061B4Z"])
+    match, _ = index.unique_match("Our Order No:SO-10O1X")
+    assert (match.order_id, match.distance) == ("SO-1001", 1)
+    # Four-character IDs allow one edit at most, so AB1 still matches AB12...
+    assert "AB12" in index.find_order_ids(page_text)
+    # ...but two edits away does not
+    assert index.find_order_ids("ref A1") == []
+    print("✓ Edit distance matching works")
+
+
+if __name__ == "__main__":
+    test_exact_matching()
+    test_no_match()
+    test_overlapping_ids()
+    test_word_boundary_matching()
+    test_ambiguous_page()
+    test_page_without_order_id()
+    test_ocr_confusions()
+    test_edit_distance_matching()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script to verify region text from the indexed and vectorized page layout
+"""
+
+import fitz  # PyMuPDF
+
+from page_layout import PageLayout
+
+REGIONS = [
+    [387, 765, 590, 795],
+    [432, 44, 591, 65],
+    [23, 47, 326, 73],
+    [28, 772, 183, 799],
+    [28, 72, 328, 92],
+]
+
+
+def text_per_region_old(page, rect):
+    """The per-region get_text("dict") scan the unified flow used before"""
+    extracted_text = ""
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", ()):
+            for span in line["spans"]:
+                span_rect = fitz.Rect(span["bbox"])
+                if span_rect.intersects(rect):
+                    if (span_rect & rect).get_area() / span_rect.get_area() > 0.5:
+                        if span["text"].strip():
+                            extracted_text += span["text"] + " "
+    return extracted_text.strip()
+
+
+def make_docket_page(document):
+    page = document.new_page()
+    page.insert_text((440, 58), "Our Order No: SO-0001234", fontsize=10)
+    page.insert_text((30, 62), "Sunny Side Cafe", fontsize=12)
+    page.insert_text((30, 86), "Unit 4, Main Street, Dublin", fontsize=10)
+    page.insert_text((30, 790), "Total Items Delivered: 12", fontsize=10)
+    page.insert_text((395, 785), "Route: Dublin002", fontsize=10)
+    # A span running past the order number region and the page edge
+    page.insert_text((560, 58), "EDGE-TEXT", fontsize=10)
+    for line in range(30):
+        page.insert_text((40, 120 + line * 20), f"Item {line:04d}   x{line % 5 + 1}", fontsize=9)
+    return page
+
+
+def test_layout_matches_per_region_scan():
+    """Every region gets the same text as the old per-region scan"""
+    print("Testing indexed page layout...")
+    print("=" * 50)
+
+    document = fitz.open()
+    page = make_docket_page(document)
+    layout = PageLayout.from_page(page)
+
+    for coordinates in REGIONS:
+        rect = fitz.Rect(coordinates)
+        expected = text_per_region_old(page, rect)
+        print(f"{coordinates}: '{layout.text_in_rect(rect)}'")
+        assert layout.text_in_rect(rect) == expected
+
+    assert layout.text_in_rect(fitz.Rect(432, 44, 591, 65)).startswith("Our Order No: SO-0001234")
+    assert layout.text_in_rect(fitz.Rect(0, 0, 10, 10)) == ""
+    document.close()
+    print("✓ Region text matches the per-region scan")
+
+
+def test_batch_regions_match():
+    """All regions in one vectorized call give the same text as one query per region"""
+    document = fitz.open()
+    page = make_docket_page(document)
+    layout = PageLayout.from_page(page)
+
+    rects = [fitz.Rect(coordinates) for coordinates in REGIONS]
+    # Overlapping, empty-handed and off-page regions too
+    rects += [fitz.Rect(0, 0, 595, 842), fitz.Rect(300, 300, 301, 301), fitz.Rect(-50, -50, -10, -10)]
+    batch = layout.texts_in_rects(rects)
+    assert batch == [text_per_region_old(page, rect) for rect in rects]
+    # The batch path never needs the grid index
+    assert layout._grid is None
+    assert batch[:5] == [layout.text_in_rect(rect) for rect in rects[:5]]
+    assert PageLayout([]).texts_in_rects(rects) == [""] * len(rects)
+    document.close()
+    print("✓ Batch region text matches")
+
+
+if __name__ == "__main__":
+    test_layout_matches_per_region_scan()
+    test_batch_regions_match()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script to verify anchor-based region calibration
+"""
+
+import os
+import tempfile
+
+import fitz  # PyMuPDF
+
+from page_layout import PageLayout
+from region_calibration import RegionCalibrator
+
+REGIONS = [
+    {'name': 'Region 1', 'color': 'red', 'coordinates': [387, 765, 590, 795]},
+    {'name': 'Region 2', 'color': 'blue', 'coordinates': [432, 44, 591, 65]},
+    {'name': 'Region 3', 'color': 'green', 'coordinates': [23, 47, 326, 73]},
+    {'name': 'Region 4', 'color': 'orange', 'coordinates': [28, 772, 183, 799]},
+]
+
+
+def make_docket(header_shift=0.0, footer_shift=0.0):
+    """One docket page; the ERP moved the header and footer down by the given points"""
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((440, 58 + header_shift), "Our Order No: SO-0001234", fontsize=10)
+    page.insert_text((30, 62 + header_shift), "Sunny Side Cafe", fontsize=12)
+    page.insert_text((30, 790 + footer_shift), "Total Items Delivered: 12", fontsize=10)
+    page.insert_text((395, 785 + footer_shift), "Route: Dublin002", fontsize=10)
+    return document
+
+
+def region_texts(document, regions):
+    layout = PageLayout.from_page(document[0])
+    return {region['name']: layout.text_in_rect(fitz.Rect(region['coordinates'])) for region in regions}
+
+
+def test_regions_follow_anchors():
+    """Header and footer regions each follow their own anchor"""
+    print("Testing region calibration...")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        calibrator = RegionCalibrator(os.path.join(temp_dir, "region_calibration.json"))
+
+        # The configured layout teaches the anchor positions and needs no shift
+        baseline = make_docket()
+        result = calibrator.calibrate(baseline, REGIONS)
+        assert not result.shifted
+        assert result.regions == REGIONS
+        expected = region_texts(baseline, REGIONS)
+
+        shifted = make_docket(header_shift=14, footer_shift=-12)
+        assert region_texts(shifted, REGIONS)['Region 2'] == ""
+        result = calibrator.calibrate(shifted, REGIONS)
+        print(f"Offsets: {result.offsets}")
+        assert result.shifted and not result.from_cache
+        assert result.offsets['Region 2'] == (0.0, 14.0)
+        assert result.offsets['Region 3'] == (0.0, 14.0)
+        assert result.offsets['Region 4'] == (0.0, -12.0)
+        assert region_texts(shifted, result.regions) == expected
+        assert REGIONS[1]['coordinates'] == [432, 44, 591, 65]
+        baseline.close()
+        shifted.close()
+    print("✓ Regions follow the anchors")
+
+
+def test_offsets_cached_per_fingerprint():
+    """Documents with a known layout are calibrated without searching, also after a restart"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store_path = os.path.join(temp_dir, "region_calibration.json")
+        calibrator = RegionCalibrator(store_path)
+        document = make_docket()
+        calibrator.calibrate(document, REGIONS)
+        assert calibrator.searches == 1
+
+        result = calibrator.calibrate(document, REGIONS)
+        assert result.from_cache and calibrator.searches == 1 and calibrator.checks == 1
+
+        # Same fingerprint, moved layout: the clipped check fails and the anchors are searched again
+        moved = make_docket(header_shift=6, footer_shift=6)
+        result = calibrator.calibrate(moved, REGIONS)
+        assert not result.from_cache and calibrator.searches == 2
+        assert result.offsets['Region 1'] == (0.0, 6.0)
+        assert calibrator.calibrate(moved, REGIONS).from_cache
+        moved.close()
+
+        restarted = RegionCalibrator(store_path)
+        assert restarted.calibrate(make_docket(header_shift=6, footer_shift=6), REGIONS).from_cache
+        assert restarted.searches == 0
+
+        # Documents without anchors are left alone and not cached
+        blank = fitz.open()
+        blank.new_page(width=300, height=300)
+        result = calibrator.calibrate(blank, REGIONS)
+        assert result.regions == REGIONS and not result.from_cache
+        assert not calibrator.calibrate(blank, REGIONS).from_cache
+        blank.close()
+        document.close()
+    print("✓ Offsets are cached per layout fingerprint")
+
+
+if __name__ == "__main__":
+    test_regions_follow_anchors()
+    test_offsets_cached_per_fingerprint()
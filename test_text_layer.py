@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script to verify document-level text-layer classification
+"""
+
+import os
+import tempfile
+
+import fitz  # PyMuPDF
+
+from extraction_cache import ExtractionCache, file_sha256
+from text_layer import (CLASSIFIER, TEXT_LAYER_EMPTY, TEXT_LAYER_GARBAGE, TEXT_LAYER_GOOD,
+                        classify_document, classify_text, document_text_layer, sample_page_numbers)
+
+
+def test_classify_text():
+    """Docket text is good, unmapped glyphs are garbage, near-blank pages are empty"""
+    print("Testing text-layer classification...")
+    print("=" * 50)
+
+    assert classify_text("Our Order No: SO-0001234\nTotal Items Delivered: 12") == TEXT_LAYER_GOOD
+    assert classify_text("  \n 1 \n") == TEXT_LAYER_EMPTY
+    # Fonts without a ToUnicode map come out as control and private-use characters
+    assert classify_text("\x03\x11\x0f \x12\x05��\x07\x08") == TEXT_LAYER_GARBAGE
+    assert classify_text("#$%&'()*+,-./:;<=>?@[]^_{|}~") == TEXT_LAYER_GARBAGE
+
+    assert sample_page_numbers(3) == [0, 1, 2]
+    assert sample_page_numbers(101) == [0, 25, 50, 75, 100]
+    print("✓ Page text is classified")
+
+
+def test_document_verdict_is_persisted():
+    """Documents are sampled once; the verdict comes from the cache afterwards"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, "dockets.pdf")
+        document = fitz.open()
+        for page_num in range(8):
+            page = document.new_page()
+            if page_num % 4 == 0:
+                page.insert_text((72, 72), f"Our Order No: SO-{page_num:04d}")
+        document.save(pdf_path)
+
+        verdict, page_verdicts = classify_document(document)
+        print(f"Sampled page verdicts: {page_verdicts}")
+        assert verdict == TEXT_LAYER_GOOD
+
+        cache = ExtractionCache(os.path.join(temp_dir, "cache.sqlite3"))
+        file_hash = file_sha256(pdf_path)
+        assert document_text_layer(document, file_hash, cache) == TEXT_LAYER_GOOD
+        assert cache.get_verdict(file_hash, CLASSIFIER) == TEXT_LAYER_GOOD
+
+        # A stored verdict wins over sampling
+        cache.put_verdict(file_hash, CLASSIFIER, TEXT_LAYER_GARBAGE)
+        assert document_text_layer(document, file_hash, cache) == TEXT_LAYER_GARBAGE
+        cache.close()
+        document.close()
+
+        blank = fitz.open()
+        blank.new_page()
+        assert classify_document(blank)[0] == TEXT_LAYER_EMPTY
+        blank.close()
+    print("✓ Document verdicts are stored per file hash")
+
+
+if __name__ == "__main__":
+    test_classify_text()
+    test_document_verdict_is_persisted()
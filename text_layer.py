@@ -0,0 +1,96 @@
+"""
+Document-level text-layer classification.
+
+The processors decided on OCR page by page with `if not page_text.strip()`.
+PDFs printed with broken fonts (no ToUnicode map) return junk text instead
+of nothing, so OCR was skipped and every order then failed slowly through
+the fuzzy matcher. classify_document samples a few pages and calls the
+whole document's text layer good, empty or garbage, so empty and garbage
+documents go straight to OCR. Verdicts are stored in the extraction cache
+per document hash.
+"""
+
+import unicodedata
+from typing import List, Optional, Tuple
+
+from extraction_cache import ExtractionCache
+
+TEXT_LAYER_GOOD = "good"
+TEXT_LAYER_EMPTY = "empty"
+TEXT_LAYER_GARBAGE = "garbage"
+
+# Bump when the rules below change so stored verdicts are not reused
+CLASSIFIER = "text-layer-v1"
+
+# Pages sampled per document, spread from first to last
+SAMPLE_PAGES = 5
+
+# A page with fewer non-space characters than this has no usable text layer
+MIN_PAGE_CHARS = 8
+
+# Share of printable characters, and of letters/digits, below which text is junk
+MIN_PRINTABLE_SHARE = 0.9
+MIN_ALNUM_SHARE = 0.5
+
+
+def sample_page_numbers(page_count: int, samples: int = SAMPLE_PAGES) -> List[int]:
+    """Up to samples page numbers spread evenly over the document"""
+    if page_count <= samples:
+        return list(range(page_count))
+    return sorted({round(i * (page_count - 1) / (samples - 1)) for i in range(samples)})
+
+
+def classify_text(text: str) -> str:
+    """Verdict for the text layer of one page"""
+    chars = [ch for ch in text if not ch.isspace()]
+    if len(chars) < MIN_PAGE_CHARS:
+        return TEXT_LAYER_EMPTY
+
+    printable = 0
+    alnum = 0
+    for ch in chars:
+        category = unicodedata.category(ch)
+        # Control, unassigned and private-use characters, and U+FFFD, are what unmapped glyphs turn into
+        if category[0] in "LNPS" and ch != "\ufffd":
+            printable += 1
+        if ch.isalnum():
+            alnum += 1
+    if printable / len(chars) < MIN_PRINTABLE_SHARE or alnum / len(chars) < MIN_ALNUM_SHARE:
+        return TEXT_LAYER_GARBAGE
+    return TEXT_LAYER_GOOD
+
+
+def classify_document(document) -> Tuple[str, List[str]]:
+    """
+    Sample pages of an open fitz document and classify its text layer.
+
+    A document with any good sampled page stays on the text layer (pages
+    without text still fall back to OCR one by one) unless junk pages
+    outnumber the good ones.
+
+    Returns:
+        (verdict, page verdicts of the sampled pages)
+    """
+    page_verdicts = [classify_text(document[page_num].get_text())
+                     for page_num in sample_page_numbers(len(document))]
+    good = page_verdicts.count(TEXT_LAYER_GOOD)
+    garbage = page_verdicts.count(TEXT_LAYER_GARBAGE)
+    if good and good >= garbage:
+        return TEXT_LAYER_GOOD, page_verdicts
+    if garbage:
+        return TEXT_LAYER_GARBAGE, page_verdicts
+    return TEXT_LAYER_EMPTY, page_verdicts
+
+
+def document_text_layer(document, file_hash: Optional[str] = None,
+                        cache: Optional[ExtractionCache] = None) -> str:
+    """Text-layer verdict of a document, from the cache when it was classified before"""
+    if cache is not None and file_hash:
+        verdict = cache.get_verdict(file_hash, CLASSIFIER)
+        if verdict is not None:
+            return verdict
+
+    verdict, _ = classify_document(document)
+    if cache is not None and file_hash:
+        cache.put_verdict(file_hash, CLASSIFIER, verdict)
+    return verdict